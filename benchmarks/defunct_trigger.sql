@@ -0,0 +1,137 @@
+-- benchmark for the defunct_person_defuncts_all_roles trigger (see core.sql)
+--
+-- grows the persons table in steps, and after every step times single-row
+-- updates of persons: one which changes an email address (the trigger has
+-- nothing to do), and one which marks a person as defunct (the trigger
+-- cascades to that person's roles and logins).  with a row-scoped trigger
+-- both latencies stay flat as the table grows.
+--
+-- every added person is a student, an instructor and an employee of the
+-- first institution, each with a login, and every tenth one is defunct
+-- already.  run it against a scratch install of the demo data, it leaves
+-- the added rows behind:
+-- $ mysql -u root -p < defunct_trigger.sql
+
+USE `schooldb`;
+
+DROP PROCEDURE IF EXISTS benchmark_grow_persons;
+DROP PROCEDURE IF EXISTS benchmark_time_updates;
+
+CREATE TEMPORARY TABLE benchmark_defunct_trigger_results (
+       `persons` INT UNSIGNED NOT NULL,
+       `updates` INT UNSIGNED NOT NULL,
+       `email_update_us` DECIMAL(12,1) NOT NULL,
+       `defunct_update_us` DECIMAL(12,1) NOT NULL
+);
+
+DELIMITER $$
+
+-- adds `n` persons, with all their roles and logins, in one transaction
+CREATE PROCEDURE benchmark_grow_persons(IN n INT)
+BEGIN
+
+DECLARE i INT DEFAULT 0;
+DECLARE defunct BOOLEAN;
+DECLARE nation INT UNSIGNED;
+DECLARE state INT UNSIGNED;
+DECLARE institution INT UNSIGNED;
+DECLARE person INT UNSIGNED;
+DECLARE role_id INT UNSIGNED;
+
+SELECT MIN(nations_id) INTO nation FROM nations;
+SELECT MIN(states_id) INTO state FROM states;
+SELECT MIN(institutions_id) INTO institution FROM institutions;
+
+START TRANSACTION;
+
+WHILE i < n DO
+      SET defunct = (i % 10 = 0);
+
+      INSERT INTO persons (persons_legal_name, persons_nations_id_fk,
+      `persons_state-issued_id_states_id_fk`, persons_personal_email,
+      persons_is_defunct)
+      VALUES ('Benchmark Person', nation, state, 'benchmark@localhost',
+      defunct);
+      SET person = LAST_INSERT_ID();
+
+      INSERT INTO students (students_persons_id_fk,
+      students_institutions_id_fk, students_is_defunct)
+      VALUES (person, institution, defunct);
+      SET role_id = LAST_INSERT_ID();
+      INSERT INTO `student-logins` VALUES (role_id, institution,
+      CONCAT('s', role_id), defunct);
+
+      INSERT INTO instructors (instructors_persons_id_fk,
+      instructors_institutions_id_fk, instructors_is_defunct)
+      VALUES (person, institution, defunct);
+      SET role_id = LAST_INSERT_ID();
+      INSERT INTO `instructor-logins` VALUES (role_id, institution,
+      CONCAT('i', role_id), defunct);
+
+      INSERT INTO employees (employees_persons_id_fk,
+      employees_institutions_id_fk, employees_is_defunct)
+      VALUES (person, institution, defunct);
+      SET role_id = LAST_INSERT_ID();
+      INSERT INTO `employee-logins` VALUES (role_id, institution,
+      CONCAT('e', role_id), defunct);
+
+      SET i = i + 1;
+END WHILE;
+
+COMMIT;
+
+END;$$
+
+-- times `repeats` pairs of single-row updates on the newest persons which
+-- are not defunct yet, and records the mean latencies in microseconds
+CREATE PROCEDURE benchmark_time_updates(IN repeats INT)
+BEGIN
+
+DECLARE i INT DEFAULT 0;
+DECLARE person INT UNSIGNED;
+DECLARE started DATETIME(6);
+DECLARE email_us BIGINT DEFAULT 0;
+DECLARE defunct_us BIGINT DEFAULT 0;
+
+WHILE i < repeats DO
+      SELECT persons_id INTO person FROM persons
+      WHERE persons_is_defunct = FALSE
+      ORDER BY persons_id DESC LIMIT 1;
+
+      SET started = SYSDATE(6);
+      UPDATE persons SET persons_personal_email = 'benchmark@127.0.0.1'
+      WHERE persons_id = person;
+      SET email_us = email_us
+      + TIMESTAMPDIFF(MICROSECOND, started, SYSDATE(6));
+
+      SET started = SYSDATE(6);
+      UPDATE persons SET persons_is_defunct = TRUE
+      WHERE persons_id = person;
+      SET defunct_us = defunct_us
+      + TIMESTAMPDIFF(MICROSECOND, started, SYSDATE(6));
+
+      SET i = i + 1;
+END WHILE;
+
+INSERT INTO benchmark_defunct_trigger_results
+SELECT COUNT(*), repeats, email_us / repeats, defunct_us / repeats
+FROM persons;
+
+END;$$
+
+DELIMITER ;
+
+CALL benchmark_grow_persons(1000);
+CALL benchmark_time_updates(100);
+CALL benchmark_grow_persons(9000);
+CALL benchmark_time_updates(100);
+CALL benchmark_grow_persons(90000);
+CALL benchmark_time_updates(100);
+
+SELECT persons AS 'Persons', updates AS 'Updates',
+email_update_us AS 'Email Update (us)',
+defunct_update_us AS 'Defunct Update (us)'
+FROM benchmark_defunct_trigger_results;
+
+DROP PROCEDURE benchmark_grow_persons;
+DROP PROCEDURE benchmark_time_updates;
@@ -20,7 +20,9 @@ CREATE TABLE `nations` (
        `nations_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
        `nations_name` VARCHAR(128) NOT NULL,
        `nations_code` VARCHAR(2) NOT NULL,
-       PRIMARY KEY (`nations_id`)
+       PRIMARY KEY (`nations_id`),
+       -- the generator looks nations up by their code
+       UNIQUE KEY `nations_code_unique` (`nations_code`)
 );
 
 -- intermediate between the nation and the cityzip_pair.
@@ -32,6 +34,8 @@ CREATE TABLE `states` (
        `states_code` VARCHAR(2) NOT NULL,
        `states_nations_id_fk` INT UNSIGNED NOT NULL,
        PRIMARY KEY (`states_id`),
+       -- state codes only have to be unique within their nation
+       KEY `states_code_index` (`states_code`),
        FOREIGN KEY (`states_nations_id_fk`) REFERENCES nations(`nations_id`)
 );
 
@@ -45,6 +49,8 @@ CREATE TABLE `cityzip_pairs` (
        `cityzip_pairs_zipext` VARCHAR(5),
        `cityzip_pairs_states_id_fk` INT UNSIGNED NOT NULL,
        PRIMARY KEY(`cityzip_pairs_id`),
+       KEY `cityzip_pairs_city_zipcore_index`
+       (`cityzip_pairs_city`, `cityzip_pairs_zipcore`),
        FOREIGN KEY (`cityzip_pairs_states_id_fk`) REFERENCES states(`states_id`)
 );
 
@@ -60,6 +66,7 @@ CREATE TABLE `addresses` (
        -- the next column is TRUE if the address no longer exists
        `addresses_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`addresses_id`),
+       KEY `addresses_line_1_index` (`addresses_line_1`),
        FOREIGN KEY (`addresses_cityzip_pairs_fk`)
        REFERENCES cityzip_pairs(`cityzip_pairs_id`)
 );
@@ -80,6 +87,7 @@ CREATE TABLE `institutions` (
        -- if the next column is TRUE, then the institution is shut down.
        `institutions_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`institutions_id`),
+       UNIQUE KEY `institutions_alt_name_unique` (`institutions_alt_name`),
        FOREIGN KEY (`institutions_operating_state_fk`)
        REFERENCES states(`states_id`),
        FOREIGN KEY (`institutions_mailing_fk`)
@@ -94,6 +102,8 @@ CREATE TABLE `semesters` (
        `semesters_finish` DATETIME NOT NULL,
        `semesters_institutions_id_fk` INT UNSIGNED NOT NULL,
        PRIMARY KEY (`semesters_id`),
+       UNIQUE KEY `semesters_name_unique`
+       (`semesters_institutions_id_fk`, `semesters_name`),
        FOREIGN KEY (`semesters_institutions_id_fk`)
        REFERENCES institutions(`institutions_id`)
 );
@@ -119,6 +129,8 @@ CREATE TABLE `persons` (
        -- the next column is TRUE if the person's identity should be disabled.
        `persons_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`persons_id`),
+       -- legal names are not unique, but they are how persons are looked up
+       KEY `persons_legal_name_index` (`persons_legal_name`),
        FOREIGN KEY (`persons_nations_id_fk`) REFERENCES nations(`nations_id`),
        FOREIGN KEY (`persons_state-issued_id_states_id_fk`)
        REFERENCES states(`states_id`),
@@ -136,6 +148,9 @@ CREATE TABLE `students` (
        -- the next column is TRUE if the student is disabled from the system
        `students_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`students_id`),
+       -- a person is a student of an institution once
+       UNIQUE KEY `students_persons_unique`
+       (`students_persons_id_fk`, `students_institutions_id_fk`),
        FOREIGN KEY (`students_persons_id_fk`) REFERENCES persons(`persons_id`),
        FOREIGN KEY (`students_institutions_id_fk`)
        REFERENCES institutions(`institutions_id`)
@@ -150,6 +165,8 @@ CREATE TABLE `instructors` (
        -- the next column is TRUE if the instructor is disabled from the system
        `instructors_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`instructors_id`),
+       UNIQUE KEY `instructors_persons_unique`
+       (`instructors_persons_id_fk`, `instructors_institutions_id_fk`),
        FOREIGN KEY (`instructors_persons_id_fk`)
        REFERENCES persons(`persons_id`),
        FOREIGN KEY (`instructors_institutions_id_fk`)
@@ -164,6 +181,8 @@ CREATE TABLE `employees` (
        -- the next column is TRUE if the employee is disabled from the system
        `employees_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`employees_id`),
+       UNIQUE KEY `employees_persons_unique`
+       (`employees_persons_id_fk`, `employees_institutions_id_fk`),
        FOREIGN KEY (`employees_persons_id_fk`)
        REFERENCES persons(`persons_id`),
        FOREIGN KEY (`employees_institutions_id_fk`)
@@ -220,6 +239,8 @@ CREATE TABLE `departments` (
        -- the next column is TRUE if the department is closed or disabled
        `depts_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`depts_id`),
+       UNIQUE KEY `depts_title_unique`
+       (`depts_institutions_id_fk`, `depts_title`),
        FOREIGN KEY (`depts_chairperson_instructors_fk`)
        REFERENCES instructors(`instructors_id`),
        FOREIGN KEY (`depts_institutions_id_fk`)
@@ -246,6 +267,8 @@ CREATE TABLE `courses` (
        -- if the next column is TRUE then no new course section enrollments
        `courses_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`courses_id`),
+       UNIQUE KEY `courses_number_unique`
+       (`courses_depts_id_fk`, `courses_number`),
        FOREIGN KEY (`courses_depts_id_fk`) REFERENCES departments(`depts_id`)
 );
 
@@ -279,6 +302,8 @@ CREATE TABLE `tracks` (
        -- if the next column is false, then no new students for the track
        `tracks_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`tracks_id`),
+       UNIQUE KEY `tracks_title_unique`
+       (`tracks_institutions_id_fk`, `tracks_title`),
        FOREIGN KEY (`tracks_institutions_id_fk`)
        REFERENCES institutions(`institutions_id`)
 );
@@ -321,6 +346,7 @@ CREATE TABLE `locations` (
        -- next column is TRUE if no new courses may be scheduled here 
        `locations_is_defunct` BOOLEAN NOT NULL,
        PRIMARY KEY (`locations_id`),
+       KEY `locations_title_index` (`locations_title`),
        FOREIGN KEY (`locations_addresses_id_fk`)
        REFERENCES addresses(`addresses_id`),
        FOREIGN KEY (`locations_parent_locations_id_fk`)
@@ -344,7 +370,35 @@ CREATE TABLE `schedules` (
        `schedules_semesters_id_fk` INT UNSIGNED NOT NULL,
        -- if the next column is NULL, then the meeting place is maybe virtual
        `schedules_locations_id_fk` INT UNSIGNED,
+       -- the next three columns are computed from the three above, for
+       -- finding overlapping schedules: the days as a bitmask (1 is Sunday,
+       -- 2 Monday, ..., 64 Saturday; NULL if not periodic), and the hours
+       -- as minutes since midnight
+       `schedules_dow_mask` TINYINT UNSIGNED AS (
+       (SUBSTRING(`schedules_dow`, 1, 1) NOT IN ('', '-')) +
+       (SUBSTRING(`schedules_dow`, 2, 1) NOT IN ('', '-')) * 2 +
+       (SUBSTRING(`schedules_dow`, 3, 1) NOT IN ('', '-')) * 4 +
+       (SUBSTRING(`schedules_dow`, 4, 1) NOT IN ('', '-')) * 8 +
+       (SUBSTRING(`schedules_dow`, 5, 1) NOT IN ('', '-')) * 16 +
+       (SUBSTRING(`schedules_dow`, 6, 1) NOT IN ('', '-')) * 32 +
+       (SUBSTRING(`schedules_dow`, 7, 1) NOT IN ('', '-')) * 64) STORED,
+       `schedules_start_minute` SMALLINT UNSIGNED AS (
+       SUBSTRING(`schedules_start_24hr`, 1, 2) * 60 +
+       SUBSTRING(`schedules_start_24hr`, 3, 2)) STORED,
+       `schedules_end_minute` SMALLINT UNSIGNED AS (
+       SUBSTRING(`schedules_end_24hr`, 1, 2) * 60 +
+       SUBSTRING(`schedules_end_24hr`, 3, 2)) STORED,
        PRIMARY KEY (`schedules_id`),
+       -- the same hours repeat every semester
+       KEY `schedules_hours_index`
+       (`schedules_start_24hr`, `schedules_end_24hr`),
+       -- the meetings of a semester, or of a location, in the order of time
+       KEY `schedules_semesters_minutes_index`
+       (`schedules_semesters_id_fk`, `schedules_start_minute`,
+       `schedules_end_minute`),
+       KEY `schedules_locations_minutes_index`
+       (`schedules_locations_id_fk`, `schedules_start_minute`,
+       `schedules_end_minute`),
        FOREIGN KEY (`schedules_semesters_id_fk`)
        REFERENCES semesters(`semesters_id`),
        FOREIGN KEY (`schedules_locations_id_fk`)
@@ -358,14 +412,25 @@ CREATE TABLE `schedules` (
 CREATE TABLE `tasks` (
        `tasks_id` INT UNSIGNED NOT NULL AUTO_INCREMENT,
        `tasks_title` VARCHAR(128) NOT NULL,
-       `tasks_summary` LONGTEXT,
-       -- the test/project to be interpreted and completed by the student 
-       `tasks_content_blob` BLOB,
-       -- the test/project to be interpreted and completed by the student
-       `tasks_content_clob` LONGTEXT,
        `tasks_max_points_towards_gpa` DECIMAL(6,2) NOT NULL,
        `tasks_points_count_towards_gpa` BOOLEAN NOT NULL,
-       PRIMARY KEY (`tasks_id`)
+       PRIMARY KEY (`tasks_id`),
+       KEY `tasks_title_index` (`tasks_title`)
+);
+
+-- the large contents of a task live apart from the task itself, so that the
+-- grade reports joining tasks only read its narrow row.  at most one row per
+-- task, and tasks without any contents have none.
+CREATE TABLE `tasks-attachments` (
+       `tasks-attachments_tasks_id_fk` INT UNSIGNED NOT NULL,
+       `tasks-attachments_summary` LONGTEXT,
+       -- the test/project to be interpreted and completed by the student
+       `tasks-attachments_content_blob` BLOB,
+       -- the test/project to be interpreted and completed by the student
+       `tasks-attachments_content_clob` LONGTEXT,
+       PRIMARY KEY (`tasks-attachments_tasks_id_fk`),
+       FOREIGN KEY (`tasks-attachments_tasks_id_fk`)
+       REFERENCES tasks(`tasks_id`)
 );
 
 -- once you have a passing grade for each task associated with a course,
@@ -376,6 +441,10 @@ CREATE TABLE `courses-tasks` (
        `courses-tasks_courses_id_fk` INT UNSIGNED NOT NULL,
        `courses-tasks_points_coefficient` DECIMAL(4,2) NOT NULL,
        PRIMARY KEY (`courses-tasks_id`),
+       -- the coefficient of a task in a course, for the gpa ledger
+       KEY `courses_tasks_coefficient_index`
+       (`courses-tasks_courses_id_fk`, `courses-tasks_tasks_id_fk`,
+       `courses-tasks_points_coefficient`),
        FOREIGN KEY (`courses-tasks_tasks_id_fk`)
        REFERENCES tasks(`tasks_id`),
        FOREIGN KEY (`courses-tasks_courses_id_fk`)
@@ -393,6 +462,15 @@ CREATE TABLE `enrollments` (
        `enrollments_courses_id_fk` INT UNSIGNED NOT NULL,
        `enrollments_is_auditing` BOOLEAN NOT NULL,
        PRIMARY KEY (`enrollments_id`),
+       -- a student enrolls in a schedule once.  the second index covers
+       -- counting the enrollments of every instructor and student pair
+       UNIQUE KEY `enrollments_schedules_unique`
+       (`enrollments_students_id_fk`, `enrollments_schedules_id_fk`),
+       KEY `enrollments_pairs_index`
+       (`enrollments_instructors_id_fk`, `enrollments_students_id_fk`),
+       -- the courses a student took, for the prerequisites checks
+       KEY `enrollments_students_courses_index`
+       (`enrollments_students_id_fk`, `enrollments_courses_id_fk`),
        FOREIGN KEY (`enrollments_schedules_id_fk`)
        REFERENCES schedules(`schedules_id`),
        FOREIGN KEY (`enrollments_instructors_id_fk`)
@@ -410,22 +488,40 @@ CREATE TABLE `grades` (
        `grades_enrollments_id_fk` INT UNSIGNED NOT NULL,
        -- need to divide this by the 'tasks_max_points_towards_gpa' in 'tasks'
        `grades_points_towards_gpa` DECIMAL(6,2) NOT NULL,
-       `grades_instructors_comments` LONGTEXT,
-       `grades_students_comments` LONGTEXT,
-       -- the next two columns are the instructor's grading/feedback of the work
-       `grades_instructors_attachment_blob` BLOB,
-       `grades_instructors_attachment_clob` LONGTEXT,
-       `grades_students_attachment_blob` BLOB, -- the student submission
-       `grades_students_attachment_clob` LONGTEXT, -- the student submission
        `grades_tasks_id_fk` INT UNSIGNED NOT NULL,
        `grades_date_created` DATETIME NOT NULL,
        `grades_date_last_updated` DATETIME,
        PRIMARY KEY (`grades_id`),
+       -- a task is graded once per enrollment.  the second index covers
+       -- summing up the points of the grades of a task
+       UNIQUE KEY `grades_tasks_unique`
+       (`grades_enrollments_id_fk`, `grades_tasks_id_fk`),
+       KEY `grades_tasks_points_index`
+       (`grades_tasks_id_fk`, `grades_enrollments_id_fk`,
+       `grades_points_towards_gpa`),
        FOREIGN KEY (`grades_enrollments_id_fk`)
        REFERENCES enrollments(`enrollments_id`),
        FOREIGN KEY (`grades_tasks_id_fk`) REFERENCES tasks(`tasks_id`)
 );
 
+-- the comments and submissions of a grade, kept apart like the contents of
+-- tasks, so the grade rows stay narrow and fixed-width for the reports.
+-- at most one row per grade, and grades without any have none.
+CREATE TABLE `grades-attachments` (
+       `grades-attachments_grades_id_fk` INT UNSIGNED NOT NULL,
+       `grades-attachments_instructors_comments` LONGTEXT,
+       `grades-attachments_students_comments` LONGTEXT,
+       -- the next two columns are the instructor's grading/feedback
+       `grades-attachments_instructors_attachment_blob` BLOB,
+       `grades-attachments_instructors_attachment_clob` LONGTEXT,
+       -- the next two columns are the student submission
+       `grades-attachments_students_attachment_blob` BLOB,
+       `grades-attachments_students_attachment_clob` LONGTEXT,
+       PRIMARY KEY (`grades-attachments_grades_id_fk`),
+       FOREIGN KEY (`grades-attachments_grades_id_fk`)
+       REFERENCES grades(`grades_id`)
+);
+
 -- this could be for custom tutoring hours, graduation ceremonies,
 -- or other events which do not have graded tasks or should be considered
 -- an enrollment or part of a track.
@@ -445,11 +541,908 @@ CREATE TABLE `services` (
        REFERENCES schedules(`schedules_id`)
 );
 
+-- running sums of the grades assigned by each instructor, and of the grades
+-- in each course, kept current by the triggers below.  the reporting views
+-- read these instead of joining every grade with its enrollment and task.
+-- the points are the 'grades_points_towards_gpa' of the grades, and the
+-- max points the 'tasks_max_points_towards_gpa' of their tasks.
+CREATE TABLE `instructors-grades-sums` (
+       `instructors-grades-sums_instructors_id_fk` INT UNSIGNED NOT NULL,
+       `instructors-grades-sums_grades_count` INT NOT NULL,
+       `instructors-grades-sums_points` DECIMAL(16,2) NOT NULL,
+       `instructors-grades-sums_max_points` DECIMAL(16,2) NOT NULL,
+       PRIMARY KEY (`instructors-grades-sums_instructors_id_fk`),
+       FOREIGN KEY (`instructors-grades-sums_instructors_id_fk`)
+       REFERENCES instructors(`instructors_id`)
+);
+
+CREATE TABLE `courses-grades-sums` (
+       `courses-grades-sums_courses_id_fk` INT UNSIGNED NOT NULL,
+       `courses-grades-sums_grades_count` INT NOT NULL,
+       `courses-grades-sums_points` DECIMAL(16,2) NOT NULL,
+       `courses-grades-sums_max_points` DECIMAL(16,2) NOT NULL,
+       PRIMARY KEY (`courses-grades-sums_courses_id_fk`),
+       FOREIGN KEY (`courses-grades-sums_courses_id_fk`)
+       REFERENCES courses(`courses_id`)
+);
+
+-- the transitive closure of the prerequisites, kept current by the triggers
+-- below, so that checking whether a student may enroll in a course, or how
+-- far along a student is on a track, is an indexed lookup instead of a walk
+-- over `courses-prerequisites` and `tracks-prerequisites`.
+--
+-- `courses-equivalents` pairs every course with every course it is
+-- equivalent to, directly or through other equivalencies (both ways, but
+-- never with itself).
+CREATE TABLE `courses-equivalents` (
+       `courses-equivalents_courses_id_fk` INT UNSIGNED NOT NULL,
+       `courses-equivalents_equivalent_courses_id_fk` INT UNSIGNED NOT NULL,
+       PRIMARY KEY (`courses-equivalents_courses_id_fk`,
+       `courses-equivalents_equivalent_courses_id_fk`),
+       FOREIGN KEY (`courses-equivalents_courses_id_fk`)
+       REFERENCES courses(`courses_id`),
+       FOREIGN KEY (`courses-equivalents_equivalent_courses_id_fk`)
+       REFERENCES courses(`courses_id`)
+);
+
+-- every course a course requires, directly (depth 1) or through the courses
+-- it requires (the depth is then the length of the shortest chain), once
+-- for every course which satisfies the requirement: the required course
+-- itself, and its equivalents.  optional prerequisites are left out,
+-- because only one of them has to be completed (but they may not form a
+-- cycle either, see check_courses_prerequisite).
+CREATE TABLE `courses-closure` (
+       `courses-closure_courses_id_fk` INT UNSIGNED NOT NULL,
+       `courses-closure_requires_courses_id_fk` INT UNSIGNED NOT NULL,
+       `courses-closure_satisfied_by_courses_id_fk` INT UNSIGNED NOT NULL,
+       `courses-closure_depth` INT UNSIGNED NOT NULL,
+       PRIMARY KEY (`courses-closure_courses_id_fk`,
+       `courses-closure_requires_courses_id_fk`,
+       `courses-closure_satisfied_by_courses_id_fk`),
+       FOREIGN KEY (`courses-closure_courses_id_fk`)
+       REFERENCES courses(`courses_id`),
+       FOREIGN KEY (`courses-closure_requires_courses_id_fk`)
+       REFERENCES courses(`courses_id`),
+       FOREIGN KEY (`courses-closure_satisfied_by_courses_id_fk`)
+       REFERENCES courses(`courses_id`)
+);
+
+-- the same for tracks: every course a track requires, directly, through the
+-- tracks it requires, or as a prerequisite of those courses
+CREATE TABLE `tracks-closure` (
+       `tracks-closure_tracks_id_fk` INT UNSIGNED NOT NULL,
+       `tracks-closure_requires_courses_id_fk` INT UNSIGNED NOT NULL,
+       `tracks-closure_satisfied_by_courses_id_fk` INT UNSIGNED NOT NULL,
+       `tracks-closure_depth` INT UNSIGNED NOT NULL,
+       PRIMARY KEY (`tracks-closure_tracks_id_fk`,
+       `tracks-closure_requires_courses_id_fk`,
+       `tracks-closure_satisfied_by_courses_id_fk`),
+       FOREIGN KEY (`tracks-closure_tracks_id_fk`)
+       REFERENCES tracks(`tracks_id`),
+       FOREIGN KEY (`tracks-closure_requires_courses_id_fk`)
+       REFERENCES courses(`courses_id`),
+       FOREIGN KEY (`tracks-closure_satisfied_by_courses_id_fk`)
+       REFERENCES courses(`courses_id`)
+);
+
+-- the gpa ledger, kept current by the triggers below, so that transcripts
+-- and the dean's list read one row per student and semester instead of
+-- joining every grade with its task, course and enrollment.
+--
+-- the points of the grades of each enrollment which count towards the gpa
+-- ('tasks_points_count_towards_gpa'), each multiplied by the
+-- 'courses-tasks_points_coefficient' of its task in the course of the
+-- enrollment (1 when the task is not linked to the course), and the max
+-- points of their tasks, multiplied the same way.
+CREATE TABLE `enrollments-gpa-sums` (
+       `enrollments-gpa-sums_enrollments_id_fk` INT UNSIGNED NOT NULL,
+       `enrollments-gpa-sums_points` DECIMAL(16,4) NOT NULL,
+       `enrollments-gpa-sums_max_points` DECIMAL(16,4) NOT NULL,
+       PRIMARY KEY (`enrollments-gpa-sums_enrollments_id_fk`),
+       FOREIGN KEY (`enrollments-gpa-sums_enrollments_id_fk`)
+       REFERENCES enrollments(`enrollments_id`)
+);
+
+-- the enrollments of each student in each semester, audited ones left out:
+-- the sums above multiplied by the credit hours of their course, the credit
+-- hours attempted, and the credit hours earned, by the enrollments which
+-- pass (see gpa_earns_credit).  the gpa of the semester is then
+-- gpa_from_points of the weighted points and the weighted max points.
+CREATE TABLE `students-gpa-ledger` (
+       `students-gpa-ledger_students_id_fk` INT UNSIGNED NOT NULL,
+       `students-gpa-ledger_semesters_id_fk` INT UNSIGNED NOT NULL,
+       `students-gpa-ledger_weighted_points` DECIMAL(20,5) NOT NULL,
+       `students-gpa-ledger_weighted_max_points` DECIMAL(20,5) NOT NULL,
+       `students-gpa-ledger_attempted_credit_hours` DECIMAL(6,1) NOT NULL,
+       `students-gpa-ledger_earned_credit_hours` DECIMAL(6,1) NOT NULL,
+       PRIMARY KEY (`students-gpa-ledger_students_id_fk`,
+       `students-gpa-ledger_semesters_id_fk`),
+       FOREIGN KEY (`students-gpa-ledger_students_id_fk`)
+       REFERENCES students(`students_id`),
+       FOREIGN KEY (`students-gpa-ledger_semesters_id_fk`)
+       REFERENCES semesters(`semesters_id`)
+);
+
 -- ***** end table creation
 -- ****************************
+-- ***** begin procedure creation
+
+DELIMITER $$
+
+-- adds to the grades sums of one instructor and one course, use negative
+-- numbers to subtract
+CREATE PROCEDURE add_to_grades_sums(IN instructor INT UNSIGNED,
+IN course INT UNSIGNED, IN grades_count INT, IN points DECIMAL(16,2),
+IN max_points DECIMAL(16,2))
+BEGIN
+
+INSERT INTO `instructors-grades-sums`
+VALUES (instructor, grades_count, points, max_points)
+ON DUPLICATE KEY UPDATE
+`instructors-grades-sums_grades_count` =
+`instructors-grades-sums_grades_count` + grades_count,
+`instructors-grades-sums_points` = `instructors-grades-sums_points` + points,
+`instructors-grades-sums_max_points` =
+`instructors-grades-sums_max_points` + max_points;
+
+INSERT INTO `courses-grades-sums`
+VALUES (course, grades_count, points, max_points)
+ON DUPLICATE KEY UPDATE
+`courses-grades-sums_grades_count` =
+`courses-grades-sums_grades_count` + grades_count,
+`courses-grades-sums_points` = `courses-grades-sums_points` + points,
+`courses-grades-sums_max_points` =
+`courses-grades-sums_max_points` + max_points;
+
+END;$$
+
+-- adds one grade to (direction 1), or removes it from (direction -1),
+-- the sums of the instructor and the course of its enrollment
+CREATE PROCEDURE add_grade_to_grades_sums(IN enrollment INT UNSIGNED,
+IN task INT UNSIGNED, IN points DECIMAL(6,2), IN direction INT)
+BEGIN
+
+DECLARE instructor INT UNSIGNED;
+DECLARE course INT UNSIGNED;
+DECLARE max_points DECIMAL(6,2);
+
+SELECT enrollments_instructors_id_fk, enrollments_courses_id_fk
+INTO instructor, course
+FROM enrollments WHERE enrollments_id = enrollment;
+
+SELECT tasks_max_points_towards_gpa INTO max_points
+FROM tasks WHERE tasks_id = task;
+
+CALL add_to_grades_sums(instructor, course, direction,
+direction * points, direction * max_points);
+
+END;$$
+
+-- recomputes the grades sums from scratch, for example after loading grades
+-- with the triggers bypassed
+CREATE PROCEDURE rebuild_grades_sums()
+BEGIN
+
+DELETE FROM `instructors-grades-sums`;
+DELETE FROM `courses-grades-sums`;
+
+INSERT INTO `instructors-grades-sums`
+SELECT enrollments.enrollments_instructors_id_fk, count(*),
+sum(grades.grades_points_towards_gpa),
+sum(tasks.tasks_max_points_towards_gpa)
+FROM grades, enrollments, tasks
+WHERE grades.grades_enrollments_id_fk = enrollments.enrollments_id
+AND grades.grades_tasks_id_fk = tasks.tasks_id
+GROUP BY enrollments.enrollments_instructors_id_fk;
+
+INSERT INTO `courses-grades-sums`
+SELECT enrollments.enrollments_courses_id_fk, count(*),
+sum(grades.grades_points_towards_gpa),
+sum(tasks.tasks_max_points_towards_gpa)
+FROM grades, enrollments, tasks
+WHERE grades.grades_enrollments_id_fk = enrollments.enrollments_id
+AND grades.grades_tasks_id_fk = tasks.tasks_id
+GROUP BY enrollments.enrollments_courses_id_fk;
+
+END;$$
+
+-- the grade scale, in one place for the triggers, rebuild_gpa_ledger and
+-- the views: an enrollment earns its credit hours with at least 60% of its
+-- max points, and the gpa is the share of the max points on a 4.0 scale.
+-- after changing them, CALL rebuild_gpa_ledger() for the credit hours.
+CREATE FUNCTION gpa_earns_credit(points DECIMAL(20,5),
+max_points DECIMAL(20,5))
+RETURNS BOOLEAN DETERMINISTIC NO SQL
+RETURN max_points > 0 AND points >= 0.6 * max_points;$$
+
+CREATE FUNCTION gpa_from_points(points DECIMAL(20,5),
+max_points DECIMAL(20,5))
+RETURNS DECIMAL(20,10) DETERMINISTIC NO SQL
+RETURN 4.0 * points / nullif(max_points, 0);$$
+
+-- adds the credit hours and the gpa sums of one enrollment to the ledger
+-- of its student and semester (direction 1), or removes them (direction
+-- -1).  audited enrollments are not in the ledger.
+CREATE PROCEDURE add_enrollment_to_gpa_ledger(IN student INT UNSIGNED,
+IN schedule INT UNSIGNED, IN course INT UNSIGNED, IN is_auditing BOOLEAN,
+IN points DECIMAL(16,4), IN max_points DECIMAL(16,4), IN direction INT)
+BEGIN
+
+DECLARE semester INT UNSIGNED;
+DECLARE credit_hours DECIMAL(2,1);
+DECLARE earned_credit_hours DECIMAL(2,1) DEFAULT 0;
+
+IF NOT is_auditing THEN
+
+SELECT schedules_semesters_id_fk INTO semester
+FROM schedules WHERE schedules_id = schedule;
+
+SELECT courses_credit_hours INTO credit_hours
+FROM courses WHERE courses_id = course;
+
+IF gpa_earns_credit(points, max_points) THEN
+SET earned_credit_hours = credit_hours;
+END IF;
+
+INSERT INTO `students-gpa-ledger`
+VALUES (student, semester, direction * credit_hours * points,
+direction * credit_hours * max_points, direction * credit_hours,
+direction * earned_credit_hours)
+ON DUPLICATE KEY UPDATE
+`students-gpa-ledger_weighted_points` =
+`students-gpa-ledger_weighted_points` + direction * credit_hours * points,
+`students-gpa-ledger_weighted_max_points` =
+`students-gpa-ledger_weighted_max_points` +
+direction * credit_hours * max_points,
+`students-gpa-ledger_attempted_credit_hours` =
+`students-gpa-ledger_attempted_credit_hours` + direction * credit_hours,
+`students-gpa-ledger_earned_credit_hours` =
+`students-gpa-ledger_earned_credit_hours` + direction * earned_credit_hours;
+
+END IF;
+
+END;$$
+
+-- sets the gpa sums of one enrollment from old_points and old_max_points
+-- to new_points and new_max_points, and moves its ledger entry along.
+-- NULL old sums mean the enrollment has no sums yet (it was loaded with the
+-- triggers bypassed), and so no ledger entry either: both are added.
+CREATE PROCEDURE move_enrollment_gpa_sums(IN enrollment INT UNSIGNED,
+IN old_points DECIMAL(16,4), IN old_max_points DECIMAL(16,4),
+IN new_points DECIMAL(16,4), IN new_max_points DECIMAL(16,4))
+BEGIN
+
+DECLARE student INT UNSIGNED;
+DECLARE schedule INT UNSIGNED;
+DECLARE course INT UNSIGNED;
+DECLARE is_auditing BOOLEAN;
+
+SELECT enrollments_students_id_fk, enrollments_schedules_id_fk,
+enrollments_courses_id_fk, enrollments_is_auditing
+INTO student, schedule, course, is_auditing
+FROM enrollments WHERE enrollments_id = enrollment;
+
+IF old_points IS NULL THEN
+INSERT INTO `enrollments-gpa-sums`
+VALUES (enrollment, new_points, new_max_points);
+CALL add_enrollment_to_gpa_ledger(student, schedule, course, is_auditing,
+new_points, new_max_points, 1);
+ELSEIF new_points <> old_points OR new_max_points <> old_max_points THEN
+UPDATE `enrollments-gpa-sums`
+SET `enrollments-gpa-sums_points` = new_points,
+`enrollments-gpa-sums_max_points` = new_max_points
+WHERE `enrollments-gpa-sums_enrollments_id_fk` = enrollment;
+CALL add_enrollment_to_gpa_ledger(student, schedule, course, is_auditing,
+old_points, old_max_points, -1);
+CALL add_enrollment_to_gpa_ledger(student, schedule, course, is_auditing,
+new_points, new_max_points, 1);
+END IF;
+
+END;$$
+
+-- recomputes the gpa sums of one enrollment from all of its grades, after
+-- the coefficients or the max points of their tasks changed.  an enrollment
+-- has a handful of grades, reached through `grades_tasks_unique`.
+CREATE PROCEDURE refresh_enrollment_gpa_sums(IN enrollment INT UNSIGNED)
+BEGIN
+
+DECLARE course INT UNSIGNED;
+DECLARE old_points DECIMAL(16,4);
+DECLARE old_max_points DECIMAL(16,4);
+DECLARE new_points DECIMAL(16,4);
+DECLARE new_max_points DECIMAL(16,4);
+
+SELECT enrollments_courses_id_fk INTO course
+FROM enrollments WHERE enrollments_id = enrollment;
+
+SELECT `enrollments-gpa-sums_points`, `enrollments-gpa-sums_max_points`
+INTO old_points, old_max_points
+FROM `enrollments-gpa-sums`
+WHERE `enrollments-gpa-sums_enrollments_id_fk` = enrollment;
+
+SELECT coalesce(sum(weighted.coefficient * weighted.points), 0),
+coalesce(sum(weighted.coefficient * weighted.max_points), 0)
+INTO new_points, new_max_points
+FROM (SELECT grades.grades_points_towards_gpa AS points,
+tasks.tasks_max_points_towards_gpa AS max_points,
+coalesce((SELECT max(`courses-tasks_points_coefficient`)
+FROM `courses-tasks`
+WHERE `courses-tasks_courses_id_fk` = course
+AND `courses-tasks_tasks_id_fk` = tasks.tasks_id), 1) AS coefficient
+FROM grades, tasks
+WHERE grades.grades_enrollments_id_fk = enrollment
+AND grades.grades_tasks_id_fk = tasks.tasks_id
+AND tasks.tasks_points_count_towards_gpa) AS weighted;
+
+CALL move_enrollment_gpa_sums(enrollment, old_points, old_max_points,
+new_points, new_max_points);
+
+END;$$
+
+-- adds one grade to (direction 1), or removes it from (direction -1), the
+-- gpa sums of its enrollment, without reading the other grades; only an
+-- enrollment without sums yet is recomputed from all of them
+CREATE PROCEDURE add_grade_to_gpa_sums(IN enrollment INT UNSIGNED,
+IN task INT UNSIGNED, IN points DECIMAL(6,2), IN direction INT)
+BEGIN
+
+DECLARE course INT UNSIGNED;
+DECLARE max_points DECIMAL(6,2);
+DECLARE counts BOOLEAN;
+DECLARE coefficient DECIMAL(4,2);
+DECLARE old_points DECIMAL(16,4);
+DECLARE old_max_points DECIMAL(16,4);
+
+SELECT `enrollments-gpa-sums_points`, `enrollments-gpa-sums_max_points`
+INTO old_points, old_max_points
+FROM `enrollments-gpa-sums`
+WHERE `enrollments-gpa-sums_enrollments_id_fk` = enrollment;
+
+IF old_points IS NULL THEN
+CALL refresh_enrollment_gpa_sums(enrollment);
+ELSE
+
+SELECT enrollments_courses_id_fk INTO course
+FROM enrollments WHERE enrollments_id = enrollment;
+
+SELECT tasks_max_points_towards_gpa, tasks_points_count_towards_gpa
+INTO max_points, counts
+FROM tasks WHERE tasks_id = task;
+
+IF counts THEN
+SELECT coalesce(max(`courses-tasks_points_coefficient`), 1)
+INTO coefficient
+FROM `courses-tasks`
+WHERE `courses-tasks_courses_id_fk` = course
+AND `courses-tasks_tasks_id_fk` = task;
+
+CALL move_enrollment_gpa_sums(enrollment, old_points, old_max_points,
+old_points + direction * coefficient * points,
+old_max_points + direction * coefficient * max_points);
+END IF;
+
+END IF;
+
+END;$$
+
+-- refreshes the gpa sums of the enrollments with a grade for a task, and in
+-- a course unless it is NULL, after the task or its coefficient changed
+CREATE PROCEDURE refresh_task_gpa_sums(IN task INT UNSIGNED,
+IN course INT UNSIGNED)
+BEGIN
+
+DECLARE done BOOLEAN DEFAULT FALSE;
+DECLARE enrollment INT UNSIGNED;
+DECLARE graded CURSOR FOR
+SELECT enrollments.enrollments_id
+FROM grades, enrollments
+WHERE grades.grades_tasks_id_fk = task
+AND grades.grades_enrollments_id_fk = enrollments.enrollments_id
+AND (course IS NULL OR enrollments.enrollments_courses_id_fk = course);
+DECLARE CONTINUE HANDLER FOR NOT FOUND SET done = TRUE;
+
+OPEN graded;
+refresh_loop: LOOP
+FETCH graded INTO enrollment;
+IF done THEN
+LEAVE refresh_loop;
+END IF;
+CALL refresh_enrollment_gpa_sums(enrollment);
+END LOOP;
+CLOSE graded;
+
+END;$$
+
+-- recomputes the gpa sums and the ledger from scratch, for example after
+-- loading grades with the triggers bypassed, or after changing the credit
+-- hours of a course or the semester of a schedule, which the triggers do
+-- not follow
+CREATE PROCEDURE rebuild_gpa_ledger()
+BEGIN
+
+DELETE FROM `students-gpa-ledger`;
+DELETE FROM `enrollments-gpa-sums`;
+
+INSERT INTO `enrollments-gpa-sums`
+SELECT enrollments.enrollments_id,
+coalesce(sum(weighted.coefficient * weighted.points), 0),
+coalesce(sum(weighted.coefficient * weighted.max_points), 0)
+FROM enrollments LEFT JOIN
+(SELECT grades.grades_enrollments_id_fk AS enrollments_id,
+grades.grades_points_towards_gpa AS points,
+tasks.tasks_max_points_towards_gpa AS max_points,
+coalesce((SELECT max(`courses-tasks_points_coefficient`)
+FROM `courses-tasks`
+WHERE `courses-tasks_courses_id_fk` = graded.enrollments_courses_id_fk
+AND `courses-tasks_tasks_id_fk` = tasks.tasks_id), 1) AS coefficient
+FROM grades, tasks, enrollments AS graded
+WHERE grades.grades_tasks_id_fk = tasks.tasks_id
+AND grades.grades_enrollments_id_fk = graded.enrollments_id
+AND tasks.tasks_points_count_towards_gpa) AS weighted
+ON weighted.enrollments_id = enrollments.enrollments_id
+GROUP BY enrollments.enrollments_id;
+
+INSERT INTO `students-gpa-ledger`
+SELECT enrollments.enrollments_students_id_fk,
+schedules.schedules_semesters_id_fk,
+sum(courses.courses_credit_hours * sums.`enrollments-gpa-sums_points`),
+sum(courses.courses_credit_hours * sums.`enrollments-gpa-sums_max_points`),
+sum(courses.courses_credit_hours),
+sum(IF(gpa_earns_credit(sums.`enrollments-gpa-sums_points`,
+sums.`enrollments-gpa-sums_max_points`), courses.courses_credit_hours, 0))
+FROM enrollments, `enrollments-gpa-sums` AS sums, schedules, courses
+WHERE NOT enrollments.enrollments_is_auditing
+AND sums.`enrollments-gpa-sums_enrollments_id_fk` =
+enrollments.enrollments_id
+AND enrollments.enrollments_schedules_id_fk = schedules.schedules_id
+AND enrollments.enrollments_courses_id_fk = courses.courses_id
+GROUP BY enrollments.enrollments_students_id_fk,
+schedules.schedules_semesters_id_fk;
+
+END;$$
+
+-- refuses a prerequisite, required or optional, which would make a course
+-- require itself through a chain of prerequisites of either kind.  the
+-- closure leaves the optional ones out, so the chain is followed here.
+CREATE PROCEDURE check_courses_prerequisite(IN course INT UNSIGNED,
+IN required_course INT UNSIGNED, IN optional_course INT UNSIGNED)
+BEGIN
+
+IF course IN (required_course, optional_course) OR EXISTS (
+WITH RECURSIVE required (courses_id) AS (
+SELECT courses_id FROM courses
+WHERE courses_id IN (required_course, optional_course)
+UNION
+SELECT prerequisites.`courses_requires_courses_id_fk`
+FROM required, `courses-prerequisites` AS prerequisites
+WHERE prerequisites.`courses_id_fk` = required.courses_id
+AND prerequisites.`courses_requires_courses_id_fk` IS NOT NULL
+UNION
+SELECT prerequisites.`courses_optional_courses_id_fk`
+FROM required, `courses-prerequisites` AS prerequisites
+WHERE prerequisites.`courses_id_fk` = required.courses_id
+AND prerequisites.`courses_optional_courses_id_fk` IS NOT NULL)
+SELECT * FROM required WHERE required.courses_id = course) THEN
+SIGNAL SQLSTATE '45000'
+SET MESSAGE_TEXT = 'the courses prerequisites would form a cycle';
+END IF;
+
+END;$$
+
+-- refuses a prerequisite which would make a track require itself
+CREATE PROCEDURE check_tracks_prerequisite(IN track INT UNSIGNED,
+IN required_track INT UNSIGNED)
+BEGIN
+
+IF track = required_track OR EXISTS (
+WITH RECURSIVE required (tracks_id) AS (
+SELECT required_track
+UNION
+SELECT prerequisites.`tracks-prerequisites_requires_tracks_id_fk`
+FROM required, `tracks-prerequisites` AS prerequisites
+WHERE prerequisites.`tracks-prerequisites_tracks_id_fk` = required.tracks_id
+AND prerequisites.`tracks-prerequisites_requires_tracks_id_fk` IS NOT NULL)
+SELECT * FROM required WHERE required.tracks_id = track) THEN
+SIGNAL SQLSTATE '45000'
+SET MESSAGE_TEXT = 'the tracks prerequisites would form a cycle';
+END IF;
+
+END;$$
+
+-- recomputes the equivalents of two courses (the two sides of an
+-- equivalency which was added or removed), or of every course if both are
+-- NULL, along with the courses which satisfy the requirements on them in
+-- the closures
+CREATE PROCEDURE refresh_courses_equivalents(IN course_a INT UNSIGNED,
+IN course_b INT UNSIGNED)
+BEGIN
+
+DECLARE every_course BOOLEAN DEFAULT course_a IS NULL AND course_b IS NULL;
+
+-- first the old equivalents of both courses, and of their equivalents
+IF every_course THEN
+DELETE FROM `courses-equivalents`;
+ELSE
+DELETE equivalents
+FROM `courses-equivalents` AS equivalents, `courses-equivalents` AS old
+WHERE old.`courses-equivalents_courses_id_fk` IN (course_a, course_b)
+AND equivalents.`courses-equivalents_courses_id_fk` =
+old.`courses-equivalents_equivalent_courses_id_fk`;
+DELETE FROM `courses-equivalents`
+WHERE `courses-equivalents_courses_id_fk` IN (course_a, course_b);
+END IF;
+
+-- every course reachable from each seed over the equivalencies, either way
+INSERT INTO `courses-equivalents`
+WITH RECURSIVE reached (seed, courses_id) AS (
+SELECT `courses-equivalencies_a`, `courses-equivalencies_a`
+FROM `courses-equivalencies`
+WHERE every_course OR `courses-equivalencies_a` IN (course_a, course_b)
+UNION
+SELECT `courses-equivalencies_b`, `courses-equivalencies_b`
+FROM `courses-equivalencies`
+WHERE every_course OR `courses-equivalencies_b` IN (course_a, course_b)
+UNION
+SELECT reached.seed, `courses-equivalencies_b`
+FROM reached, `courses-equivalencies`
+WHERE `courses-equivalencies_a` = reached.courses_id
+UNION
+SELECT reached.seed, `courses-equivalencies_a`
+FROM reached, `courses-equivalencies`
+WHERE `courses-equivalencies_b` = reached.courses_id)
+SELECT DISTINCT reached.courses_id, other.courses_id
+FROM reached, reached AS other
+WHERE reached.seed = other.seed AND reached.courses_id <> other.courses_id;
+
+-- then the requirements on those courses are satisfied by the new
+-- equivalents.  the row of the required course itself stays, with its depth
+DELETE FROM `courses-closure`
+WHERE `courses-closure_satisfied_by_courses_id_fk` <>
+`courses-closure_requires_courses_id_fk`
+AND (every_course
+OR `courses-closure_requires_courses_id_fk` IN (course_a, course_b)
+OR `courses-closure_requires_courses_id_fk` IN (
+SELECT `courses-equivalents_equivalent_courses_id_fk`
+FROM `courses-equivalents`
+WHERE `courses-equivalents_courses_id_fk` IN (course_a, course_b)));
+
+INSERT INTO `courses-closure`
+SELECT closure.`courses-closure_courses_id_fk`,
+closure.`courses-closure_requires_courses_id_fk`,
+equivalents.`courses-equivalents_equivalent_courses_id_fk`,
+closure.`courses-closure_depth`
+FROM `courses-closure` AS closure, `courses-equivalents` AS equivalents
+WHERE closure.`courses-closure_satisfied_by_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND equivalents.`courses-equivalents_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND (every_course
+OR closure.`courses-closure_requires_courses_id_fk` IN (course_a, course_b)
+OR closure.`courses-closure_requires_courses_id_fk` IN (
+SELECT `courses-equivalents_equivalent_courses_id_fk`
+FROM `courses-equivalents`
+WHERE `courses-equivalents_courses_id_fk` IN (course_a, course_b)));
+
+DELETE FROM `tracks-closure`
+WHERE `tracks-closure_satisfied_by_courses_id_fk` <>
+`tracks-closure_requires_courses_id_fk`
+AND (every_course
+OR `tracks-closure_requires_courses_id_fk` IN (course_a, course_b)
+OR `tracks-closure_requires_courses_id_fk` IN (
+SELECT `courses-equivalents_equivalent_courses_id_fk`
+FROM `courses-equivalents`
+WHERE `courses-equivalents_courses_id_fk` IN (course_a, course_b)));
+
+INSERT INTO `tracks-closure`
+SELECT closure.`tracks-closure_tracks_id_fk`,
+closure.`tracks-closure_requires_courses_id_fk`,
+equivalents.`courses-equivalents_equivalent_courses_id_fk`,
+closure.`tracks-closure_depth`
+FROM `tracks-closure` AS closure, `courses-equivalents` AS equivalents
+WHERE closure.`tracks-closure_satisfied_by_courses_id_fk` =
+closure.`tracks-closure_requires_courses_id_fk`
+AND equivalents.`courses-equivalents_courses_id_fk` =
+closure.`tracks-closure_requires_courses_id_fk`
+AND (every_course
+OR closure.`tracks-closure_requires_courses_id_fk` IN (course_a, course_b)
+OR closure.`tracks-closure_requires_courses_id_fk` IN (
+SELECT `courses-equivalents_equivalent_courses_id_fk`
+FROM `courses-equivalents`
+WHERE `courses-equivalents_courses_id_fk` IN (course_a, course_b)));
+
+END;$$
+
+-- recomputes the closure of a course and of every course which requires
+-- it, directly or not (or of every course if it is NULL), then of the
+-- tracks which require any of them.  the other courses keep their closure,
+-- nothing they require has changed.  the courses recomputed are found once,
+-- into a temporary table which every statement below joins.
+--
+-- the closure is filled breadth first, one depth at a time, and a pair of
+-- courses already in it is never added again: each pair is reached once,
+-- at the depth of its shortest chain, however many chains lead to it.
+CREATE PROCEDURE refresh_courses_closure(IN course INT UNSIGNED)
+BEGIN
+
+DECLARE current_depth INT UNSIGNED DEFAULT 1;
+DECLARE added INT DEFAULT 0;
+
+DROP TEMPORARY TABLE IF EXISTS `courses-closure-affected`;
+CREATE TEMPORARY TABLE `courses-closure-affected` (
+       `courses_id` INT UNSIGNED NOT NULL,
+       PRIMARY KEY (`courses_id`)
+);
+
+INSERT INTO `courses-closure-affected`
+WITH RECURSIVE affected (courses_id) AS (
+SELECT courses_id FROM courses WHERE course IS NULL OR courses_id = course
+UNION
+SELECT prerequisites.`courses_id_fk`
+FROM affected, `courses-prerequisites` AS prerequisites
+WHERE prerequisites.`courses_requires_courses_id_fk` = affected.courses_id)
+SELECT courses_id FROM affected;
+
+DELETE closure
+FROM `courses-closure` AS closure, `courses-closure-affected` AS affected
+WHERE closure.`courses-closure_courses_id_fk` = affected.courses_id;
+
+INSERT INTO `courses-closure`
+SELECT DISTINCT prerequisites.`courses_id_fk`,
+prerequisites.`courses_requires_courses_id_fk`,
+prerequisites.`courses_requires_courses_id_fk`, 1
+FROM `courses-closure-affected` AS affected,
+`courses-prerequisites` AS prerequisites
+WHERE prerequisites.`courses_id_fk` = affected.courses_id
+AND prerequisites.`courses_requires_courses_id_fk` IS NOT NULL;
+SET added = ROW_COUNT();
+
+WHILE added > 0 DO
+INSERT INTO `courses-closure`
+SELECT DISTINCT closure.`courses-closure_courses_id_fk`,
+prerequisites.`courses_requires_courses_id_fk`,
+prerequisites.`courses_requires_courses_id_fk`, current_depth + 1
+FROM `courses-closure-affected` AS affected, `courses-closure` AS closure,
+`courses-prerequisites` AS prerequisites
+WHERE closure.`courses-closure_courses_id_fk` = affected.courses_id
+AND closure.`courses-closure_satisfied_by_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND closure.`courses-closure_depth` = current_depth
+AND prerequisites.`courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND prerequisites.`courses_requires_courses_id_fk` IS NOT NULL
+AND NOT EXISTS (
+SELECT * FROM `courses-closure` AS reached
+WHERE reached.`courses-closure_courses_id_fk` =
+closure.`courses-closure_courses_id_fk`
+AND reached.`courses-closure_requires_courses_id_fk` =
+prerequisites.`courses_requires_courses_id_fk`);
+SET added = ROW_COUNT();
+SET current_depth = current_depth + 1;
+END WHILE;
+
+-- the equivalents of every required course satisfy it at the same depth
+INSERT INTO `courses-closure`
+SELECT closure.`courses-closure_courses_id_fk`,
+closure.`courses-closure_requires_courses_id_fk`,
+equivalents.`courses-equivalents_equivalent_courses_id_fk`,
+closure.`courses-closure_depth`
+FROM `courses-closure-affected` AS affected, `courses-closure` AS closure,
+`courses-equivalents` AS equivalents
+WHERE closure.`courses-closure_courses_id_fk` = affected.courses_id
+AND closure.`courses-closure_satisfied_by_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND equivalents.`courses-equivalents_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`;
+
+DROP TEMPORARY TABLE `courses-closure-affected`;
+
+CALL refresh_tracks_closure(NULL, course);
+
+END;$$
+
+-- recomputes the closure of a track and of every track which requires it,
+-- directly or not, or of the tracks which require a course, directly or
+-- through another course, or of every track if both are NULL.  like for
+-- the courses, the tracks recomputed go into a temporary table first.
+--
+-- a track requires its own courses, and the courses those require.  it
+-- also requires what the tracks it requires do, one step further.  that
+-- last part is what the tracks being recomputed may lack, so it is added
+-- over and over, each time keeping the shortest depth, until nothing
+-- changes; a track reached by many chains of tracks costs no more than one
+-- reached by a single one.
+CREATE PROCEDURE refresh_tracks_closure(IN track INT UNSIGNED,
+IN course INT UNSIGNED)
+BEGIN
+
+DECLARE changed INT DEFAULT 1;
+
+DROP TEMPORARY TABLE IF EXISTS `tracks-closure-affected`;
+CREATE TEMPORARY TABLE `tracks-closure-affected` (
+       `tracks_id` INT UNSIGNED NOT NULL,
+       PRIMARY KEY (`tracks_id`)
+);
+
+INSERT INTO `tracks-closure-affected`
+WITH RECURSIVE affected (tracks_id) AS (
+SELECT tracks_id FROM tracks
+WHERE (track IS NULL AND course IS NULL) OR tracks_id = track
+UNION
+SELECT prerequisites.`tracks-prerequisites_tracks_id_fk`
+FROM `tracks-prerequisites` AS prerequisites
+WHERE prerequisites.`tracks-prerequisites_requires_courses_id_fk` = course
+UNION
+SELECT prerequisites.`tracks-prerequisites_tracks_id_fk`
+FROM `courses-closure` AS closure, `tracks-prerequisites` AS prerequisites
+WHERE closure.`courses-closure_requires_courses_id_fk` = course
+AND closure.`courses-closure_satisfied_by_courses_id_fk` = course
+AND prerequisites.`tracks-prerequisites_requires_courses_id_fk` =
+closure.`courses-closure_courses_id_fk`
+UNION
+SELECT prerequisites.`tracks-prerequisites_tracks_id_fk`
+FROM affected, `tracks-prerequisites` AS prerequisites
+WHERE prerequisites.`tracks-prerequisites_requires_tracks_id_fk` =
+affected.tracks_id)
+SELECT tracks_id FROM affected;
+
+DELETE closure
+FROM `tracks-closure` AS closure, `tracks-closure-affected` AS affected
+WHERE closure.`tracks-closure_tracks_id_fk` = affected.tracks_id;
+
+-- the own courses of the tracks, then the courses those require
+INSERT INTO `tracks-closure`
+SELECT DISTINCT prerequisites.`tracks-prerequisites_tracks_id_fk`,
+prerequisites.`tracks-prerequisites_requires_courses_id_fk`,
+prerequisites.`tracks-prerequisites_requires_courses_id_fk`, 1
+FROM `tracks-closure-affected` AS affected,
+`tracks-prerequisites` AS prerequisites
+WHERE prerequisites.`tracks-prerequisites_tracks_id_fk` = affected.tracks_id
+AND prerequisites.`tracks-prerequisites_requires_courses_id_fk` IS NOT NULL;
+
+INSERT INTO `tracks-closure`
+SELECT prerequisites.`tracks-prerequisites_tracks_id_fk`,
+closure.`courses-closure_requires_courses_id_fk`,
+closure.`courses-closure_requires_courses_id_fk`,
+min(closure.`courses-closure_depth`) + 1
+FROM `tracks-closure-affected` AS affected,
+`tracks-prerequisites` AS prerequisites, `courses-closure` AS closure
+WHERE prerequisites.`tracks-prerequisites_tracks_id_fk` = affected.tracks_id
+AND closure.`courses-closure_courses_id_fk` =
+prerequisites.`tracks-prerequisites_requires_courses_id_fk`
+AND closure.`courses-closure_satisfied_by_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND NOT EXISTS (
+SELECT * FROM `tracks-closure` AS reached
+WHERE reached.`tracks-closure_tracks_id_fk` =
+prerequisites.`tracks-prerequisites_tracks_id_fk`
+AND reached.`tracks-closure_requires_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`)
+GROUP BY prerequisites.`tracks-prerequisites_tracks_id_fk`,
+closure.`courses-closure_requires_courses_id_fk`;
+
+-- the closures of the tracks which are not recomputed are complete, and
+-- those of the others only lack what their required tracks add
+WHILE changed > 0 DO
+-- shorter chains through the required tracks
+UPDATE `tracks-closure` AS closure, `tracks-prerequisites` AS prerequisites,
+`tracks-closure` AS required, `tracks-closure-affected` AS affected
+SET closure.`tracks-closure_depth` = required.`tracks-closure_depth` + 1
+WHERE closure.`tracks-closure_tracks_id_fk` = affected.tracks_id
+AND closure.`tracks-closure_satisfied_by_courses_id_fk` =
+closure.`tracks-closure_requires_courses_id_fk`
+AND prerequisites.`tracks-prerequisites_tracks_id_fk` =
+closure.`tracks-closure_tracks_id_fk`
+AND required.`tracks-closure_tracks_id_fk` =
+prerequisites.`tracks-prerequisites_requires_tracks_id_fk`
+AND required.`tracks-closure_requires_courses_id_fk` =
+closure.`tracks-closure_requires_courses_id_fk`
+AND required.`tracks-closure_satisfied_by_courses_id_fk` =
+required.`tracks-closure_requires_courses_id_fk`
+AND required.`tracks-closure_depth` + 1 < closure.`tracks-closure_depth`;
+SET changed = ROW_COUNT();
+
+-- and the courses only reached through them
+INSERT INTO `tracks-closure`
+SELECT prerequisites.`tracks-prerequisites_tracks_id_fk`,
+required.`tracks-closure_requires_courses_id_fk`,
+required.`tracks-closure_requires_courses_id_fk`,
+min(required.`tracks-closure_depth`) + 1
+FROM `tracks-closure-affected` AS affected,
+`tracks-prerequisites` AS prerequisites, `tracks-closure` AS required
+WHERE prerequisites.`tracks-prerequisites_tracks_id_fk` = affected.tracks_id
+AND required.`tracks-closure_tracks_id_fk` =
+prerequisites.`tracks-prerequisites_requires_tracks_id_fk`
+AND required.`tracks-closure_satisfied_by_courses_id_fk` =
+required.`tracks-closure_requires_courses_id_fk`
+AND NOT EXISTS (
+SELECT * FROM `tracks-closure` AS reached
+WHERE reached.`tracks-closure_tracks_id_fk` =
+prerequisites.`tracks-prerequisites_tracks_id_fk`
+AND reached.`tracks-closure_requires_courses_id_fk` =
+required.`tracks-closure_requires_courses_id_fk`)
+GROUP BY prerequisites.`tracks-prerequisites_tracks_id_fk`,
+required.`tracks-closure_requires_courses_id_fk`;
+SET changed = changed + ROW_COUNT();
+END WHILE;
+
+-- the equivalents of every required course satisfy it at the same depth
+INSERT INTO `tracks-closure`
+SELECT closure.`tracks-closure_tracks_id_fk`,
+closure.`tracks-closure_requires_courses_id_fk`,
+equivalents.`courses-equivalents_equivalent_courses_id_fk`,
+closure.`tracks-closure_depth`
+FROM `tracks-closure-affected` AS affected, `tracks-closure` AS closure,
+`courses-equivalents` AS equivalents
+WHERE closure.`tracks-closure_tracks_id_fk` = affected.tracks_id
+AND closure.`tracks-closure_satisfied_by_courses_id_fk` =
+closure.`tracks-closure_requires_courses_id_fk`
+AND equivalents.`courses-equivalents_courses_id_fk` =
+closure.`tracks-closure_requires_courses_id_fk`;
+
+DROP TEMPORARY TABLE `tracks-closure-affected`;
+
+END;$$
+
+-- recomputes the equivalents and the closures from scratch, and refuses if
+-- the prerequisites form a cycle (which the triggers would have refused)
+CREATE PROCEDURE rebuild_prerequisites_closure()
+BEGIN
+
+-- the optional prerequisites count as well, like in the triggers
+IF EXISTS (
+WITH RECURSIVE prerequisites (courses_id, requires_courses_id) AS (
+SELECT `courses_id_fk`, `courses_requires_courses_id_fk`
+FROM `courses-prerequisites`
+WHERE `courses_requires_courses_id_fk` IS NOT NULL
+UNION
+SELECT `courses_id_fk`, `courses_optional_courses_id_fk`
+FROM `courses-prerequisites`
+WHERE `courses_optional_courses_id_fk` IS NOT NULL),
+required (courses_id, requires_courses_id) AS (
+SELECT courses_id, requires_courses_id FROM prerequisites
+UNION
+SELECT required.courses_id, prerequisites.requires_courses_id
+FROM required, prerequisites
+WHERE prerequisites.courses_id = required.requires_courses_id)
+SELECT * FROM required WHERE courses_id = requires_courses_id) THEN
+SIGNAL SQLSTATE '45000'
+SET MESSAGE_TEXT = 'the courses prerequisites form a cycle';
+END IF;
+
+IF EXISTS (
+WITH RECURSIVE required (tracks_id, requires_tracks_id) AS (
+SELECT `tracks-prerequisites_tracks_id_fk`,
+`tracks-prerequisites_requires_tracks_id_fk`
+FROM `tracks-prerequisites`
+WHERE `tracks-prerequisites_requires_tracks_id_fk` IS NOT NULL
+UNION
+SELECT required.tracks_id,
+prerequisites.`tracks-prerequisites_requires_tracks_id_fk`
+FROM required, `tracks-prerequisites` AS prerequisites
+WHERE prerequisites.`tracks-prerequisites_tracks_id_fk` =
+required.requires_tracks_id
+AND prerequisites.`tracks-prerequisites_requires_tracks_id_fk` IS NOT NULL)
+SELECT * FROM required WHERE tracks_id = requires_tracks_id) THEN
+SIGNAL SQLSTATE '45000'
+SET MESSAGE_TEXT = 'the tracks prerequisites form a cycle';
+END IF;
+
+CALL refresh_courses_equivalents(NULL, NULL);
+CALL refresh_courses_closure(NULL);
+
+END;$$
+
+DELIMITER ;
+
+-- ***** end procedure creation
+-- ****************************
 -- ***** begin trigger creation
 
 -- if a person is marked as defunct, then all their roles should be, too.
+-- the cascade only runs when the flag flips from FALSE to TRUE, and only
+-- touches the roles and logins of that one person (through the indexes
+-- InnoDB keeps on the foreign keys), so an update costs the same no matter
+-- how large the tables grow.  see benchmarks/defunct_trigger.sql
 
 DELIMITER $$
 
@@ -457,35 +1450,409 @@ CREATE TRIGGER defunct_person_defuncts_all_roles AFTER UPDATE ON persons
 FOR EACH ROW
 BEGIN
 
-UPDATE students, persons SET students.students_is_defunct = TRUE
-WHERE students.students_persons_id_fk = persons.persons_id
-AND persons.persons_is_defunct = TRUE;
+IF NEW.persons_is_defunct AND NOT OLD.persons_is_defunct THEN
 
-UPDATE instructors, persons SET instructors.instructors_is_defunct = TRUE
-WHERE instructors.instructors_persons_id_fk = persons.persons_id
-AND persons.persons_is_defunct = TRUE;
+UPDATE students SET students.students_is_defunct = TRUE
+WHERE students.students_persons_id_fk = NEW.persons_id;
+
+UPDATE instructors SET instructors.instructors_is_defunct = TRUE
+WHERE instructors.instructors_persons_id_fk = NEW.persons_id;
 
-UPDATE employees, persons SET employees.employees_is_defunct = TRUE
-WHERE employees.employees_persons_id_fk = persons.persons_id
-AND persons.persons_is_defunct = TRUE;
+UPDATE employees SET employees.employees_is_defunct = TRUE
+WHERE employees.employees_persons_id_fk = NEW.persons_id;
 
-UPDATE `student-logins`, students, persons
+UPDATE `student-logins`, students
 SET `student-logins`.`student-logins_is_defunct` = TRUE
 WHERE `student-logins_students_id_fk` = students.students_id
-AND students.students_persons_id_fk = persons.persons_id
-AND persons.persons_is_defunct = TRUE;
+AND students.students_persons_id_fk = NEW.persons_id;
 
-UPDATE `instructor-logins`, instructors, persons
+UPDATE `instructor-logins`, instructors
 SET `instructor-logins`.`instructor-logins_is_defunct` = TRUE
 WHERE `instructor-logins_instructors_id` = instructors.instructors_id
-AND instructors.instructors_persons_id_fk = persons.persons_id
-AND persons.persons_is_defunct = TRUE;
+AND instructors.instructors_persons_id_fk = NEW.persons_id;
 
-UPDATE `employee-logins`, employees, persons
+UPDATE `employee-logins`, employees
 SET `employee-logins`.`employee-logins_is_defunct` = TRUE
 WHERE `employee-logins_employees_id_fk` = employees.employees_id
-AND employees.employees_persons_id_fk = persons.persons_id
-AND persons.persons_is_defunct = TRUE;
+AND employees.employees_persons_id_fk = NEW.persons_id;
+
+END IF;
+
+END;$$
+
+DELIMITER ;
+
+-- the next triggers keep `instructors-grades-sums` and
+-- `courses-grades-sums` current.  each one only touches the sums of the
+-- instructors and courses involved.  inserting an enrollment or a task
+-- needs no trigger, because no grade can reference it yet, and neither does
+-- deleting one, because the foreign keys refuse while grades reference it.
+-- they also keep `enrollments-gpa-sums` and `students-gpa-ledger` current,
+-- which do need the enrollments inserted and deleted, and only touch the
+-- enrollments involved and the ledger of their student and semester.
+
+DELIMITER $$
+
+CREATE TRIGGER new_grade_adds_to_grades_sums AFTER INSERT ON grades
+FOR EACH ROW
+BEGIN
+
+CALL add_grade_to_grades_sums(NEW.grades_enrollments_id_fk,
+NEW.grades_tasks_id_fk, NEW.grades_points_towards_gpa, 1);
+CALL add_grade_to_gpa_sums(NEW.grades_enrollments_id_fk,
+NEW.grades_tasks_id_fk, NEW.grades_points_towards_gpa, 1);
+
+END;$$
+
+-- only when the grade moves or its points change, not for its dates
+CREATE TRIGGER changed_grade_moves_grades_sums AFTER UPDATE ON grades
+FOR EACH ROW
+BEGIN
+
+IF NEW.grades_enrollments_id_fk <> OLD.grades_enrollments_id_fk
+OR NEW.grades_tasks_id_fk <> OLD.grades_tasks_id_fk
+OR NEW.grades_points_towards_gpa <> OLD.grades_points_towards_gpa THEN
+
+CALL add_grade_to_grades_sums(OLD.grades_enrollments_id_fk,
+OLD.grades_tasks_id_fk, OLD.grades_points_towards_gpa, -1);
+CALL add_grade_to_grades_sums(NEW.grades_enrollments_id_fk,
+NEW.grades_tasks_id_fk, NEW.grades_points_towards_gpa, 1);
+
+-- an enrollment without sums yet is recomputed once, with the new grade
+IF NEW.grades_enrollments_id_fk = OLD.grades_enrollments_id_fk
+AND NOT EXISTS (SELECT * FROM `enrollments-gpa-sums`
+WHERE `enrollments-gpa-sums_enrollments_id_fk`
+= NEW.grades_enrollments_id_fk) THEN
+CALL refresh_enrollment_gpa_sums(NEW.grades_enrollments_id_fk);
+ELSE
+CALL add_grade_to_gpa_sums(OLD.grades_enrollments_id_fk,
+OLD.grades_tasks_id_fk, OLD.grades_points_towards_gpa, -1);
+CALL add_grade_to_gpa_sums(NEW.grades_enrollments_id_fk,
+NEW.grades_tasks_id_fk, NEW.grades_points_towards_gpa, 1);
+END IF;
+
+END IF;
+
+END;$$
+
+CREATE TRIGGER deleted_grade_subtracts_from_grades_sums AFTER DELETE ON grades
+FOR EACH ROW
+BEGIN
+
+CALL add_grade_to_grades_sums(OLD.grades_enrollments_id_fk,
+OLD.grades_tasks_id_fk, OLD.grades_points_towards_gpa, -1);
+CALL add_grade_to_gpa_sums(OLD.grades_enrollments_id_fk,
+OLD.grades_tasks_id_fk, OLD.grades_points_towards_gpa, -1);
+
+END;$$
+
+CREATE TRIGGER new_enrollment_adds_to_gpa_ledger AFTER INSERT ON enrollments
+FOR EACH ROW
+BEGIN
+
+INSERT INTO `enrollments-gpa-sums` VALUES (NEW.enrollments_id, 0, 0);
+CALL add_enrollment_to_gpa_ledger(NEW.enrollments_students_id_fk,
+NEW.enrollments_schedules_id_fk, NEW.enrollments_courses_id_fk,
+NEW.enrollments_is_auditing, 0, 0, 1);
+
+END;$$
+
+-- moves the grades of an enrollment when its instructor or course changes,
+-- and its ledger entry when its student, schedule, course or auditing does
+CREATE TRIGGER changed_enrollment_moves_grades_sums AFTER UPDATE ON enrollments
+FOR EACH ROW
+BEGIN
+
+DECLARE moved_count INT;
+DECLARE moved_points DECIMAL(16,2);
+DECLARE moved_max_points DECIMAL(16,2);
+DECLARE moved_gpa_points DECIMAL(16,4);
+DECLARE moved_gpa_max_points DECIMAL(16,4);
+
+IF NEW.enrollments_instructors_id_fk <> OLD.enrollments_instructors_id_fk
+OR NEW.enrollments_courses_id_fk <> OLD.enrollments_courses_id_fk THEN
+
+SELECT count(*), sum(grades.grades_points_towards_gpa),
+sum(tasks.tasks_max_points_towards_gpa)
+INTO moved_count, moved_points, moved_max_points
+FROM grades, tasks
+WHERE grades.grades_enrollments_id_fk = NEW.enrollments_id
+AND grades.grades_tasks_id_fk = tasks.tasks_id;
+
+IF moved_count > 0 THEN
+CALL add_to_grades_sums(OLD.enrollments_instructors_id_fk,
+OLD.enrollments_courses_id_fk, -moved_count, -moved_points,
+-moved_max_points);
+CALL add_to_grades_sums(NEW.enrollments_instructors_id_fk,
+NEW.enrollments_courses_id_fk, moved_count, moved_points, moved_max_points);
+END IF;
+
+END IF;
+
+IF NEW.enrollments_students_id_fk <> OLD.enrollments_students_id_fk
+OR NEW.enrollments_schedules_id_fk <> OLD.enrollments_schedules_id_fk
+OR NEW.enrollments_courses_id_fk <> OLD.enrollments_courses_id_fk
+OR NEW.enrollments_is_auditing <> OLD.enrollments_is_auditing THEN
+
+SELECT `enrollments-gpa-sums_points`, `enrollments-gpa-sums_max_points`
+INTO moved_gpa_points, moved_gpa_max_points
+FROM `enrollments-gpa-sums`
+WHERE `enrollments-gpa-sums_enrollments_id_fk` = NEW.enrollments_id;
+
+CALL add_enrollment_to_gpa_ledger(OLD.enrollments_students_id_fk,
+OLD.enrollments_schedules_id_fk, OLD.enrollments_courses_id_fk,
+OLD.enrollments_is_auditing, moved_gpa_points,
+moved_gpa_max_points, -1);
+CALL add_enrollment_to_gpa_ledger(NEW.enrollments_students_id_fk,
+NEW.enrollments_schedules_id_fk, NEW.enrollments_courses_id_fk,
+NEW.enrollments_is_auditing, moved_gpa_points,
+moved_gpa_max_points, 1);
+
+-- the coefficients of the tasks depend on the course
+IF NEW.enrollments_courses_id_fk <> OLD.enrollments_courses_id_fk THEN
+CALL refresh_enrollment_gpa_sums(NEW.enrollments_id);
+END IF;
+
+END IF;
+
+END;$$
+
+-- before the foreign key of `enrollments-gpa-sums` refuses the delete
+CREATE TRIGGER deleted_enrollment_subtracts_from_gpa_ledger
+BEFORE DELETE ON enrollments
+FOR EACH ROW
+BEGIN
+
+DECLARE removed_points DECIMAL(16,4);
+DECLARE removed_max_points DECIMAL(16,4);
+
+SELECT `enrollments-gpa-sums_points`, `enrollments-gpa-sums_max_points`
+INTO removed_points, removed_max_points
+FROM `enrollments-gpa-sums`
+WHERE `enrollments-gpa-sums_enrollments_id_fk` = OLD.enrollments_id;
+
+CALL add_enrollment_to_gpa_ledger(OLD.enrollments_students_id_fk,
+OLD.enrollments_schedules_id_fk, OLD.enrollments_courses_id_fk,
+OLD.enrollments_is_auditing, removed_points, removed_max_points, -1);
+DELETE FROM `enrollments-gpa-sums`
+WHERE `enrollments-gpa-sums_enrollments_id_fk` = OLD.enrollments_id;
+
+END;$$
+
+-- rescales the max points of the grades of a task when the task changes,
+-- and the gpa sums of its grades when they count differently
+CREATE TRIGGER changed_task_rescales_grades_sums AFTER UPDATE ON tasks
+FOR EACH ROW
+BEGIN
+
+IF NEW.tasks_max_points_towards_gpa <> OLD.tasks_max_points_towards_gpa THEN
+
+UPDATE `instructors-grades-sums`,
+(SELECT enrollments.enrollments_instructors_id_fk AS instructors_id,
+count(*) AS grades_count
+FROM grades, enrollments
+WHERE grades.grades_tasks_id_fk = NEW.tasks_id
+AND grades.grades_enrollments_id_fk = enrollments.enrollments_id
+GROUP BY enrollments.enrollments_instructors_id_fk) AS rescaled
+SET `instructors-grades-sums_max_points` =
+`instructors-grades-sums_max_points` + rescaled.grades_count *
+(NEW.tasks_max_points_towards_gpa - OLD.tasks_max_points_towards_gpa)
+WHERE `instructors-grades-sums_instructors_id_fk` = rescaled.instructors_id;
+
+UPDATE `courses-grades-sums`,
+(SELECT enrollments.enrollments_courses_id_fk AS courses_id,
+count(*) AS grades_count
+FROM grades, enrollments
+WHERE grades.grades_tasks_id_fk = NEW.tasks_id
+AND grades.grades_enrollments_id_fk = enrollments.enrollments_id
+GROUP BY enrollments.enrollments_courses_id_fk) AS rescaled
+SET `courses-grades-sums_max_points` =
+`courses-grades-sums_max_points` + rescaled.grades_count *
+(NEW.tasks_max_points_towards_gpa - OLD.tasks_max_points_towards_gpa)
+WHERE `courses-grades-sums_courses_id_fk` = rescaled.courses_id;
+
+END IF;
+
+IF NEW.tasks_max_points_towards_gpa <> OLD.tasks_max_points_towards_gpa
+OR NEW.tasks_points_count_towards_gpa <>
+OLD.tasks_points_count_towards_gpa THEN
+CALL refresh_task_gpa_sums(NEW.tasks_id, NULL);
+END IF;
+
+END;$$
+
+-- the coefficient of a task in a course weighs its grades in the course
+CREATE TRIGGER new_courses_task_refreshes_gpa_sums
+AFTER INSERT ON `courses-tasks`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_task_gpa_sums(NEW.`courses-tasks_tasks_id_fk`,
+NEW.`courses-tasks_courses_id_fk`);
+
+END;$$
+
+CREATE TRIGGER changed_courses_task_refreshes_gpa_sums
+AFTER UPDATE ON `courses-tasks`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_task_gpa_sums(OLD.`courses-tasks_tasks_id_fk`,
+OLD.`courses-tasks_courses_id_fk`);
+CALL refresh_task_gpa_sums(NEW.`courses-tasks_tasks_id_fk`,
+NEW.`courses-tasks_courses_id_fk`);
+
+END;$$
+
+CREATE TRIGGER deleted_courses_task_refreshes_gpa_sums
+AFTER DELETE ON `courses-tasks`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_task_gpa_sums(OLD.`courses-tasks_tasks_id_fk`,
+OLD.`courses-tasks_courses_id_fk`);
+
+END;$$
+
+DELIMITER ;
+
+-- the next triggers keep `courses-equivalents`, `courses-closure` and
+-- `tracks-closure` current, and refuse the prerequisites which would form a
+-- cycle.  each change only recomputes the closures of the courses and
+-- tracks which depend on the changed row.
+
+DELIMITER $$
+
+CREATE TRIGGER new_courses_prerequisite_checks_cycle
+BEFORE INSERT ON `courses-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL check_courses_prerequisite(NEW.`courses_id_fk`,
+NEW.`courses_requires_courses_id_fk`, NEW.`courses_optional_courses_id_fk`);
+
+END;$$
+
+CREATE TRIGGER changed_courses_prerequisite_checks_cycle
+BEFORE UPDATE ON `courses-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL check_courses_prerequisite(NEW.`courses_id_fk`,
+NEW.`courses_requires_courses_id_fk`, NEW.`courses_optional_courses_id_fk`);
+
+END;$$
+
+CREATE TRIGGER new_courses_prerequisite_refreshes_closure
+AFTER INSERT ON `courses-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_courses_closure(NEW.`courses_id_fk`);
+
+END;$$
+
+CREATE TRIGGER changed_courses_prerequisite_refreshes_closure
+AFTER UPDATE ON `courses-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_courses_closure(OLD.`courses_id_fk`);
+IF NEW.`courses_id_fk` <> OLD.`courses_id_fk` THEN
+CALL refresh_courses_closure(NEW.`courses_id_fk`);
+END IF;
+
+END;$$
+
+CREATE TRIGGER deleted_courses_prerequisite_refreshes_closure
+AFTER DELETE ON `courses-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_courses_closure(OLD.`courses_id_fk`);
+
+END;$$
+
+CREATE TRIGGER new_tracks_prerequisite_checks_cycle
+BEFORE INSERT ON `tracks-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL check_tracks_prerequisite(NEW.`tracks-prerequisites_tracks_id_fk`,
+NEW.`tracks-prerequisites_requires_tracks_id_fk`);
+
+END;$$
+
+CREATE TRIGGER changed_tracks_prerequisite_checks_cycle
+BEFORE UPDATE ON `tracks-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL check_tracks_prerequisite(NEW.`tracks-prerequisites_tracks_id_fk`,
+NEW.`tracks-prerequisites_requires_tracks_id_fk`);
+
+END;$$
+
+CREATE TRIGGER new_tracks_prerequisite_refreshes_closure
+AFTER INSERT ON `tracks-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_tracks_closure(NEW.`tracks-prerequisites_tracks_id_fk`, NULL);
+
+END;$$
+
+CREATE TRIGGER changed_tracks_prerequisite_refreshes_closure
+AFTER UPDATE ON `tracks-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_tracks_closure(OLD.`tracks-prerequisites_tracks_id_fk`, NULL);
+IF NEW.`tracks-prerequisites_tracks_id_fk` <>
+OLD.`tracks-prerequisites_tracks_id_fk` THEN
+CALL refresh_tracks_closure(NEW.`tracks-prerequisites_tracks_id_fk`, NULL);
+END IF;
+
+END;$$
+
+CREATE TRIGGER deleted_tracks_prerequisite_refreshes_closure
+AFTER DELETE ON `tracks-prerequisites`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_tracks_closure(OLD.`tracks-prerequisites_tracks_id_fk`, NULL);
+
+END;$$
+
+CREATE TRIGGER new_courses_equivalency_refreshes_equivalents
+AFTER INSERT ON `courses-equivalencies`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_courses_equivalents(NEW.`courses-equivalencies_a`,
+NEW.`courses-equivalencies_b`);
+
+END;$$
+
+CREATE TRIGGER changed_courses_equivalency_refreshes_equivalents
+AFTER UPDATE ON `courses-equivalencies`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_courses_equivalents(OLD.`courses-equivalencies_a`,
+OLD.`courses-equivalencies_b`);
+CALL refresh_courses_equivalents(NEW.`courses-equivalencies_a`,
+NEW.`courses-equivalencies_b`);
+
+END;$$
+
+CREATE TRIGGER deleted_courses_equivalency_refreshes_equivalents
+AFTER DELETE ON `courses-equivalencies`
+FOR EACH ROW
+BEGIN
+
+CALL refresh_courses_equivalents(OLD.`courses-equivalencies_a`,
+OLD.`courses-equivalencies_b`);
 
 END;$$
 
@@ -526,14 +1893,16 @@ ON grades.grades_tasks_id_fk = tasks.tasks_id), persons, institutions
 WHERE instructors.instructors_persons_id_fk = persons.persons_id
 AND instructors.instructors_institutions_id_fk = institutions.institutions_id;
 
+-- reads the running sums, so it costs one row per instructor, not per grade
 CREATE VIEW average_grades_percentage_from_all_instructors AS
 SELECT institutions.institutions_alt_name,
 persons.persons_legal_name,
-((sum(grades_points_towards_gpa) / sum(tasks_max_points_towards_gpa)) * 100) AS
+((sum(`instructors-grades-sums_points`) /
+nullif(sum(`instructors-grades-sums_max_points`), 0)) * 100) AS
 percentage FROM
-(grades_instructors_matrix
-INNER JOIN instructors
-ON grades_instructors_matrix.instructors_id = instructors.instructors_id),
+(instructors
+LEFT JOIN `instructors-grades-sums`
+ON `instructors-grades-sums_instructors_id_fk` = instructors.instructors_id),
 institutions, persons
 WHERE instructors.instructors_persons_id_fk = persons.persons_id
 AND instructors.instructors_institutions_id_fk = institutions.institutions_id
@@ -586,7 +1955,8 @@ AND students.students_id = enrollments.enrollments_students_id_fk
 AND instructors.instructors_id = enrollments.enrollments_instructors_id_fk
 AND x.persons_id = instructors.instructors_persons_id_fk;
 
--- these two views are necessary to do bottega-tasks/04.sql
+-- these views are for bottega-tasks/04.sql, with per-institution and top-N
+-- variants of its report
 
 CREATE VIEW grades_for_all_students_2 AS
 SELECT persons.persons_legal_name, tasks.tasks_title, courses.courses_title,
@@ -600,42 +1970,337 @@ AND enrollments.enrollments_students_id_fk = students.students_id
 AND students.students_persons_id_fk = persons.persons_id
 AND enrollments.enrollments_courses_id_fk = courses.courses_id;
 
-CREATE VIEW courses_average_grades_sorted AS
-SELECT DISTINCT courses_title,
-(SELECT (sum(points) / sum(max_points) * 100)
-FROM grades_for_all_students_2) AS average_percent
-FROM grades_for_all_students_2 order by average_percent asc;
+-- the average grade of every course, from the running sums (one row per
+-- course, not per grade), ranked from the hardest course to the easiest,
+-- overall and within its institution.  courses without grades are left out.
+-- for the N hardest courses, filter on overall_rank <= N.
+CREATE VIEW courses_average_grades_ranked AS
+SELECT institutions.institutions_alt_name, courses.courses_title,
+averages.average_percent,
+RANK() OVER (ORDER BY averages.average_percent) AS overall_rank,
+RANK() OVER (PARTITION BY institutions.institutions_id
+ORDER BY averages.average_percent) AS institution_rank
+FROM
+(SELECT `courses-grades-sums_courses_id_fk` AS courses_id,
+(`courses-grades-sums_points` /
+nullif(`courses-grades-sums_max_points`, 0) * 100) AS average_percent
+FROM `courses-grades-sums`
+WHERE `courses-grades-sums_grades_count` > 0) AS averages,
+courses, departments, institutions
+WHERE averages.courses_id = courses.courses_id
+AND courses.courses_depts_id_fk = departments.depts_id
+AND departments.depts_institutions_id_fk = institutions.institutions_id;
 
--- this one view is for bottega-tasks/05.sql
--- query script for finding which student AND professor have
--- the most courses in common
+CREATE VIEW courses_average_grades_sorted AS
+SELECT courses.courses_title,
+(`courses-grades-sums_points` /
+nullif(`courses-grades-sums_max_points`, 0) * 100) AS average_percent
+FROM `courses-grades-sums`, courses
+WHERE `courses-grades-sums_courses_id_fk` = courses.courses_id
+AND `courses-grades-sums_grades_count` > 0
+ORDER BY average_percent ASC, courses.courses_title;
+
+CREATE VIEW courses_average_grades_by_institution AS
+SELECT institutions_alt_name, courses_title, average_percent,
+institution_rank
+FROM courses_average_grades_ranked
+ORDER BY institutions_alt_name, institution_rank, courses_title;
+
+CREATE VIEW hardest_10_courses AS
+SELECT institutions_alt_name, courses_title, average_percent, overall_rank
+FROM courses_average_grades_ranked
+ORDER BY overall_rank, institutions_alt_name, courses_title LIMIT 10;
+
+-- these views are for bottega-tasks/05.sql, finding which student AND
+-- professor have the most courses in common, with per-institution and top-N
+-- variants of its report
+
+-- the number of enrollments every instructor and student have in common
+-- (for the pairs with any), counted in one pass over enrollments, and ranked
+-- from the most to the fewest, overall and within the institution of the
+-- instructor.  for the top N pairs, filter on overall_rank <= N.
+CREATE VIEW enrollments_pairs_ranked AS
+SELECT institutions.institutions_alt_name,
+instructors_persons.persons_legal_name AS instructors_name,
+students_persons.persons_legal_name AS students_name,
+pairs.matches_count,
+RANK() OVER (ORDER BY pairs.matches_count DESC) AS overall_rank,
+RANK() OVER (PARTITION BY institutions.institutions_id
+ORDER BY pairs.matches_count DESC) AS institution_rank
+FROM
+(SELECT enrollments.enrollments_instructors_id_fk AS instructors_id,
+enrollments.enrollments_students_id_fk AS students_id,
+count(*) AS matches_count
+FROM enrollments
+GROUP BY enrollments.enrollments_instructors_id_fk,
+enrollments.enrollments_students_id_fk) AS pairs,
+instructors, persons AS instructors_persons, institutions,
+students, persons AS students_persons
+WHERE pairs.instructors_id = instructors.instructors_id
+AND instructors.instructors_persons_id_fk = instructors_persons.persons_id
+AND instructors.instructors_institutions_id_fk = institutions.institutions_id
+AND pairs.students_id = students.students_id
+AND students.students_persons_id_fk = students_persons.persons_id;
 
+-- every pair tied for the most courses in common
 CREATE VIEW max_unioned_enrollments AS
-SELECT instructors_legal_names.persons_legal_name AS instructors_name,
-students_legal_names.persons_legal_name AS students_name,
-count1 AS matches_count
-FROM instructors_legal_names, students_legal_names, enrollments
-LEFT JOIN
-(SELECT enrollments.enrollments_students_id_fk,
-enrollments.enrollments_instructors_id_fk,
-count(enrollments.enrollments_students_id_fk)
-AS count1, count(enrollments.enrollments_instructors_id_fk)
-AS count2
+SELECT instructors_name, students_name, matches_count
+FROM enrollments_pairs_ranked
+WHERE overall_rank = 1
+ORDER BY instructors_name, students_name;
+
+CREATE VIEW max_unioned_enrollments_by_institution AS
+SELECT institutions_alt_name, instructors_name, students_name, matches_count
+FROM enrollments_pairs_ranked
+WHERE institution_rank = 1
+ORDER BY institutions_alt_name, instructors_name, students_name;
+
+CREATE VIEW top_10_unioned_enrollments AS
+SELECT institutions_alt_name, instructors_name, students_name, matches_count,
+overall_rank
+FROM enrollments_pairs_ranked
+ORDER BY overall_rank, instructors_name, students_name LIMIT 10;
+
+-- schedule conflicts
+--
+-- every weekly meeting of the schedules, one row per day of the week the
+-- schedule meets on (0 is Sunday, 6 is Saturday).  schedules which are not
+-- periodic have no weekly meetings.
+CREATE VIEW schedules_meetings AS
+SELECT schedules.schedules_id,
+schedules.schedules_semesters_id_fk AS semesters_id,
+schedules.schedules_locations_id_fk AS locations_id,
+days.day, schedules.schedules_start_minute AS start_minute,
+schedules.schedules_end_minute AS end_minute
+FROM schedules,
+(SELECT 0 AS day UNION ALL SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3
+UNION ALL SELECT 4 UNION ALL SELECT 5 UNION ALL SELECT 6) AS days
+WHERE schedules.schedules_dow_mask & (1 << days.day);
+
+-- the next three views list the meetings which overlap an earlier meeting
+-- of the same student, instructor or location, on the same day of the same
+-- semester.  instead of comparing every pair of meetings, they sort the
+-- meetings of each by their start, and compare every start with the latest
+-- end before it (overlaps_until, in minutes since midnight), so they cost
+-- O(n log n).  the meetings of a semester are assumed to run all semester.
+
+-- students are booked by their enrollments and services
+CREATE VIEW students_schedule_conflicts AS
+SELECT persons.persons_legal_name, sweep.students_id, sweep.semesters_id,
+sweep.day, sweep.schedules_id, sweep.start_minute, sweep.end_minute,
+sweep.overlaps_until
+FROM
+(SELECT bookings.students_id, meetings.semesters_id, meetings.day,
+meetings.schedules_id, meetings.start_minute, meetings.end_minute,
+max(meetings.end_minute) OVER (PARTITION BY bookings.students_id,
+meetings.semesters_id, meetings.day
+ORDER BY meetings.start_minute, meetings.schedules_id
+ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS overlaps_until
+FROM
+(SELECT enrollments.enrollments_students_id_fk AS students_id,
+enrollments.enrollments_schedules_id_fk AS schedules_id
+FROM enrollments
+UNION
+SELECT services.services_students_id_fk, services.services_schedules_id_fk
+FROM services
+WHERE services.services_students_id_fk IS NOT NULL) AS bookings,
+schedules_meetings AS meetings
+WHERE bookings.schedules_id = meetings.schedules_id) AS sweep,
+students, persons
+WHERE sweep.start_minute < sweep.overlaps_until
+AND sweep.students_id = students.students_id
+AND students.students_persons_id_fk = persons.persons_id;
+
+-- instructors are booked by every course they teach on a schedule (two
+-- courses on the same schedule are a conflict, too) and by their services
+CREATE VIEW instructors_schedule_conflicts AS
+SELECT persons.persons_legal_name, sweep.instructors_id, sweep.semesters_id,
+sweep.day, sweep.schedules_id, sweep.courses_id, sweep.start_minute,
+sweep.end_minute, sweep.overlaps_until
+FROM
+(SELECT bookings.instructors_id, bookings.courses_id, meetings.semesters_id,
+meetings.day, meetings.schedules_id, meetings.start_minute,
+meetings.end_minute,
+max(meetings.end_minute) OVER (PARTITION BY bookings.instructors_id,
+meetings.semesters_id, meetings.day
+ORDER BY meetings.start_minute, meetings.schedules_id, bookings.courses_id
+ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS overlaps_until
+FROM
+(SELECT enrollments.enrollments_instructors_id_fk AS instructors_id,
+enrollments.enrollments_schedules_id_fk AS schedules_id,
+enrollments.enrollments_courses_id_fk AS courses_id
 FROM enrollments
-GROUP BY
-enrollments.enrollments_instructors_id_fk,
-enrollments.enrollments_students_id_fk) AS counter
-ON
-counter.enrollments_instructors_id_fk=enrollments.enrollments_instructors_id_fk
-AND counter.enrollments_students_id_fk = enrollments.enrollments_students_id_fk
-WHERE
-enrollments.enrollments_instructors_id_fk =
-instructors_legal_names.instructors_id
-AND enrollments.enrollments_students_id_fk =
-students_legal_names.students_id
-GROUP BY count2,count1,instructors_legal_names.persons_legal_name,
-students_legal_names.persons_legal_name
-ORDER BY count1 DESC LIMIT 1;
+UNION
+SELECT services.services_instructors_id_fk,
+services.services_schedules_id_fk, NULL
+FROM services
+WHERE services.services_instructors_id_fk IS NOT NULL) AS bookings,
+schedules_meetings AS meetings
+WHERE bookings.schedules_id = meetings.schedules_id) AS sweep,
+instructors, persons
+WHERE sweep.start_minute < sweep.overlaps_until
+AND sweep.instructors_id = instructors.instructors_id
+AND instructors.instructors_persons_id_fk = persons.persons_id;
+
+CREATE VIEW locations_schedule_conflicts AS
+SELECT locations.locations_title, sweep.locations_id, sweep.semesters_id,
+sweep.day, sweep.schedules_id, sweep.start_minute, sweep.end_minute,
+sweep.overlaps_until
+FROM
+(SELECT meetings.locations_id, meetings.semesters_id, meetings.day,
+meetings.schedules_id, meetings.start_minute, meetings.end_minute,
+max(meetings.end_minute) OVER (PARTITION BY meetings.locations_id,
+meetings.semesters_id, meetings.day
+ORDER BY meetings.start_minute, meetings.schedules_id
+ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING) AS overlaps_until
+FROM schedules_meetings AS meetings
+WHERE meetings.locations_id IS NOT NULL) AS sweep, locations
+WHERE sweep.start_minute < sweep.overlaps_until
+AND sweep.locations_id = locations.locations_id;
+
+-- gpa, from the ledger
+--
+-- the transcript of every student: the gpa and credit hours of each
+-- semester, and cumulated up to it.  read it for one student:
+-- SELECT * FROM students_semesters_gpa WHERE students_id = 1;
+CREATE VIEW students_semesters_gpa AS
+SELECT ledger.`students-gpa-ledger_students_id_fk` AS students_id,
+persons.persons_legal_name, semesters.semesters_id,
+semesters.semesters_name,
+ledger.`students-gpa-ledger_attempted_credit_hours` AS attempted_credit_hours,
+ledger.`students-gpa-ledger_earned_credit_hours` AS earned_credit_hours,
+round(gpa_from_points(ledger.`students-gpa-ledger_weighted_points`,
+ledger.`students-gpa-ledger_weighted_max_points`), 2) AS gpa,
+sum(ledger.`students-gpa-ledger_attempted_credit_hours`)
+OVER cumulated AS cumulative_attempted_credit_hours,
+sum(ledger.`students-gpa-ledger_earned_credit_hours`)
+OVER cumulated AS cumulative_earned_credit_hours,
+round(gpa_from_points(
+sum(ledger.`students-gpa-ledger_weighted_points`) OVER cumulated,
+sum(ledger.`students-gpa-ledger_weighted_max_points`) OVER cumulated), 2)
+AS cumulative_gpa
+FROM `students-gpa-ledger` AS ledger, students, persons, semesters
+WHERE ledger.`students-gpa-ledger_students_id_fk` = students.students_id
+AND students.students_persons_id_fk = persons.persons_id
+AND ledger.`students-gpa-ledger_semesters_id_fk` = semesters.semesters_id
+WINDOW cumulated AS (PARTITION BY ledger.`students-gpa-ledger_students_id_fk`
+ORDER BY semesters.semesters_start, semesters.semesters_id);
+
+-- the gpa and credit hours of every student over all their semesters
+CREATE VIEW students_cumulative_gpa AS
+SELECT ledger.`students-gpa-ledger_students_id_fk` AS students_id,
+persons.persons_legal_name,
+sum(ledger.`students-gpa-ledger_attempted_credit_hours`)
+AS attempted_credit_hours,
+sum(ledger.`students-gpa-ledger_earned_credit_hours`) AS earned_credit_hours,
+round(gpa_from_points(sum(ledger.`students-gpa-ledger_weighted_points`),
+sum(ledger.`students-gpa-ledger_weighted_max_points`)), 2) AS gpa
+FROM `students-gpa-ledger` AS ledger, students, persons
+WHERE ledger.`students-gpa-ledger_students_id_fk` = students.students_id
+AND students.students_persons_id_fk = persons.persons_id
+GROUP BY ledger.`students-gpa-ledger_students_id_fk`,
+persons.persons_legal_name;
+
+-- the dean's list: a semester gpa of at least 3.5, over at least 12 earned
+-- credit hours.  read it for one semester, through the ledger's index on
+-- its semesters:
+-- SELECT * FROM deans_list WHERE semesters_id = 1;
+CREATE VIEW deans_list AS
+SELECT semesters.semesters_id, semesters.semesters_name,
+ledger.`students-gpa-ledger_students_id_fk` AS students_id,
+persons.persons_legal_name,
+round(gpa_from_points(ledger.`students-gpa-ledger_weighted_points`,
+ledger.`students-gpa-ledger_weighted_max_points`), 2) AS gpa,
+ledger.`students-gpa-ledger_earned_credit_hours` AS earned_credit_hours
+FROM `students-gpa-ledger` AS ledger, students, persons, semesters
+WHERE gpa_from_points(ledger.`students-gpa-ledger_weighted_points`,
+ledger.`students-gpa-ledger_weighted_max_points`) >= 3.5
+AND ledger.`students-gpa-ledger_earned_credit_hours` >= 12
+AND ledger.`students-gpa-ledger_students_id_fk` = students.students_id
+AND students.students_persons_id_fk = persons.persons_id
+AND ledger.`students-gpa-ledger_semesters_id_fk` = semesters.semesters_id;
+
+-- prerequisites
+--
+-- the courses each student completed: enrolled in, not audited, and over
+CREATE VIEW students_completed_courses AS
+SELECT enrollments.enrollments_students_id_fk AS students_id,
+enrollments.enrollments_courses_id_fk AS courses_id
+FROM enrollments, schedules
+WHERE NOT enrollments.enrollments_is_auditing
+AND enrollments.enrollments_schedules_id_fk = schedules.schedules_id
+AND schedules.schedules_finish <= NOW();
+
+-- the next three views answer for every student, but are meant to be read
+-- for one student and one course or track, which only takes lookups on the
+-- primary keys of the closures and on the enrollments of the student:
+-- SELECT is_eligible FROM students_courses_eligibility
+-- WHERE students_id = 1 AND courses_id = 2;
+
+-- the courses (or their equivalents) a student has yet to complete before
+-- enrolling in a course
+CREATE VIEW students_missing_prerequisites AS
+SELECT students.students_id,
+closure.`courses-closure_courses_id_fk` AS courses_id,
+closure.`courses-closure_requires_courses_id_fk` AS requires_courses_id,
+closure.`courses-closure_depth` AS depth
+FROM students, `courses-closure` AS closure
+WHERE closure.`courses-closure_satisfied_by_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND NOT EXISTS (
+SELECT * FROM `courses-closure` AS satisfying,
+students_completed_courses AS completed
+WHERE satisfying.`courses-closure_courses_id_fk` =
+closure.`courses-closure_courses_id_fk`
+AND satisfying.`courses-closure_requires_courses_id_fk` =
+closure.`courses-closure_requires_courses_id_fk`
+AND completed.students_id = students.students_id
+AND completed.courses_id =
+satisfying.`courses-closure_satisfied_by_courses_id_fk`);
+
+-- a student may enroll in a course when no required course is missing, and
+-- one of its optional prerequisites (or an equivalent) is completed, if it
+-- has any
+CREATE VIEW students_courses_eligibility AS
+SELECT students.students_id, courses.courses_id,
+NOT EXISTS (
+SELECT * FROM students_missing_prerequisites AS missing
+WHERE missing.students_id = students.students_id
+AND missing.courses_id = courses.courses_id)
+AND (NOT EXISTS (
+SELECT * FROM `courses-prerequisites` AS optional
+WHERE optional.`courses_id_fk` = courses.courses_id
+AND optional.`courses_optional_courses_id_fk` IS NOT NULL)
+OR EXISTS (
+SELECT * FROM `courses-prerequisites` AS optional,
+students_completed_courses AS completed
+WHERE optional.`courses_id_fk` = courses.courses_id
+AND completed.students_id = students.students_id
+AND (completed.courses_id = optional.`courses_optional_courses_id_fk`
+OR EXISTS (
+SELECT * FROM `courses-equivalents` AS equivalents
+WHERE equivalents.`courses-equivalents_courses_id_fk` =
+optional.`courses_optional_courses_id_fk`
+AND equivalents.`courses-equivalents_equivalent_courses_id_fk` =
+completed.courses_id)))) AS is_eligible
+FROM students, courses;
+
+-- how far along each student is on each track: how many courses the track
+-- requires, and how many of them (or their equivalents) the student
+-- completed
+CREATE VIEW students_tracks_progress AS
+SELECT students.students_id,
+closure.`tracks-closure_tracks_id_fk` AS tracks_id,
+count(DISTINCT closure.`tracks-closure_requires_courses_id_fk`)
+AS required_courses,
+count(DISTINCT IF(completed.courses_id IS NULL, NULL,
+closure.`tracks-closure_requires_courses_id_fk`)) AS completed_courses
+FROM students
+JOIN `tracks-closure` AS closure
+LEFT JOIN students_completed_courses AS completed
+ON completed.students_id = students.students_id
+AND completed.courses_id = closure.`tracks-closure_satisfied_by_courses_id_fk`
+GROUP BY students.students_id, closure.`tracks-closure_tracks_id_fk`;
 
 -- ***** end view creation
 -- ****************************
@@ -674,35 +2339,35 @@ INSERT INTO `addresses` (`addresses_line_1`, `addresses_cityzip_pairs_fk`, `addr
 
 INSERT INTO `institutions` (`institutions_legal_name`, `institutions_operating_state_fk`, `institutions_alt_name`, `institutions_mailing_fk`, `institutions_web_url`, `institutions_has_undergraduate_programs`, `institutions_has_postgraduate_programs`, `institutions_is_defunct`) VALUES ('Bloomsburg University Of Pennsylvania', (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'BU', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), 'https://bloomu.edu', true, true, false);
 
-INSERT INTO semesters (`semesters_name`, `semesters_start`, `semesters_finish`, `semesters_institutions_id_fk`) VALUES ('Fall 2021', '2021-09-01 08:00:00', '2021-12-23 21:00:00', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1));
-
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('James Capozzoli', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'manykwh@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Lehigh Dr' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Mike Mol', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'mikethemol@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Lake Dr' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Cindy Carma', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'cindycarma@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Adam Appletosh', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'FL' LIMIT 1), 'adamappletosh@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '3828 W Platt St' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Casey Bro', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'TX' LIMIT 1), 'caseybro@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Nowhere St' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Margret Mi-yetta', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'margretmi@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Cassidy Clever', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'cash@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Yennifer Yaboozle', (SELECT nations_id FROM nations WHERE nations_code = 'PE' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'FL' LIMIT 1), 'yenny@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '5217 Puritan Ave' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Luis Rico', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'FL' LIMIT 1), 'commonname@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '5217 Puritan Ave' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Selina Sikorsky', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'NJ' LIMIT 1), 'helicopter@bearingfailure.com', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Somewhere Pl' LIMIT 1), true);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Diana Deerbourne', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'propolice@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
-INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Amy Ante', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'drante@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
-
-INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), true);
-
-INSERT INTO instructors (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO instructors (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO instructors (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Margret Mi-yetta' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO instructors (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Amy Ante' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-
-INSERT INTO employees (`employees_persons_id_fk`, `employees_institutions_id_fk`, `employees_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Mike Mol' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
-INSERT INTO employees (`employees_persons_id_fk`, `employees_institutions_id_fk`, `employees_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Diana Deerbourne' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `semesters` (`semesters_name`, `semesters_start`, `semesters_finish`, `semesters_institutions_id_fk`) VALUES ('Fall 2021', '2021-09-01 08:00:00', '2021-12-23 21:00:00', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1));
+
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('James Capozzoli', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'manykwh@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Lehigh Dr' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Mike Mol', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'mikethemol@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Lake Dr' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Cindy Carma', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'cindycarma@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Adam Appletosh', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'FL' LIMIT 1), 'adamappletosh@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '3828 W Platt St' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Casey Bro', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'TX' LIMIT 1), 'caseybro@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Nowhere St' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Margret Mi-yetta', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'margretmi@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Cassidy Clever', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'cash@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Yennifer Yaboozle', (SELECT nations_id FROM nations WHERE nations_code = 'PE' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'FL' LIMIT 1), 'yenny@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '5217 Puritan Ave' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Luis Rico', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'FL' LIMIT 1), 'commonname@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '5217 Puritan Ave' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Selina Sikorsky', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'NJ' LIMIT 1), 'helicopter@bearingfailure.com', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 Somewhere Pl' LIMIT 1), true);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Diana Deerbourne', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'propolice@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
+INSERT INTO `persons` (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('Amy Ante', (SELECT nations_id FROM nations WHERE nations_code = 'US' LIMIT 1), (SELECT states_id FROM states WHERE states_code = 'PA' LIMIT 1), 'drante@localhost', (SELECT addresses_id FROM addresses WHERE addresses_line_1 = '1111 University Dr' LIMIT 1), false);
+
+INSERT INTO `students` (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `students` (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `students` (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `students` (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `students` (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `students` (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), true);
+
+INSERT INTO `instructors` (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `instructors` (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `instructors` (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Margret Mi-yetta' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `instructors` (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Amy Ante' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+
+INSERT INTO `employees` (`employees_persons_id_fk`, `employees_institutions_id_fk`, `employees_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Mike Mol' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
+INSERT INTO `employees` (`employees_persons_id_fk`, `employees_institutions_id_fk`, `employees_is_defunct`) VALUES ((SELECT persons_id FROM persons WHERE persons_legal_name = 'Diana Deerbourne' LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), false);
 
 INSERT INTO `instructor-logins` (`instructor-logins_instructors_id`, `instructor-logins_institutions_id_fk`, `instructor-logins_string`, `instructor-logins_is_defunct`) VALUES ((SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), 'ccarma@bu.notreal', false);
 INSERT INTO `instructor-logins` (`instructor-logins_instructors_id`, `instructor-logins_institutions_id_fk`, `instructor-logins_string`, `instructor-logins_is_defunct`) VALUES ((SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), 'cclever@bu.notreal', false);
@@ -719,67 +2384,72 @@ INSERT INTO `student-logins` (`student-logins_students_id_fk`, `student-logins_i
 INSERT INTO `employee-logins` (`employee-logins_employees_id_fk`, `employee-logins_institutions_id_fk`, `employee-logins_string`, `employee-logins_is_defunct`) VALUES ((SELECT employees_id FROM employees WHERE employees_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Mike Mol' LIMIT 1) AND employees_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), 'mikemol@somewhe.re', false);
 INSERT INTO `employee-logins` (`employee-logins_employees_id_fk`, `employee-logins_institutions_id_fk`, `employee-logins_string`, `employee-logins_is_defunct`) VALUES ((SELECT employees_id FROM employees WHERE employees_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Diana Deerbourne' LIMIT 1) AND employees_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), 'dianez@somewhe.re', false);
 
-INSERT INTO departments (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('HRM', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), false);
-INSERT INTO departments (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('COMPSCI', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), false);
-INSERT INTO departments (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('CHEM', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Margret Mi-yetta' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), false);
-
-INSERT INTO courses (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Customer Service 1', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '101', true, true, false);
-INSERT INTO courses (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Customer Service 2', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '201', true, true, false);
-INSERT INTO courses (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Introduction to Java', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '101', true, true, false);
-INSERT INTO courses (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Database Design I', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '110', true, true, false);
-INSERT INTO courses (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Chemistry Lab for Sciences I', 4.0, (SELECT depts_id FROM departments WHERE depts_title = 'CHEM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '110', true, false, false);
-
-INSERT INTO `courses-prerequisites` (`courses_id_fk`, `courses_requires_courses_id_fk`) VALUES ((SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 201 LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1));
-
-INSERT INTO tracks (`tracks_title`, `tracks_institutions_id_fk`, `tracks_is_undergraduate_program`, `tracks_is_postgraduate_program`, `tracks_is_defunct`) VALUES ('HRM TRACK', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), true, true, false);
-INSERT INTO tracks (`tracks_title`, `tracks_institutions_id_fk`, `tracks_is_undergraduate_program`, `tracks_is_postgraduate_program`, `tracks_is_defunct`) VALUES ('Computer Science Bachelors', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), true, true, false);
-
-INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES ((SELECT tracks_id FROM tracks WHERE tracks_title = 'HRM TRACK' AND tracks_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 201 LIMIT 1));
-INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES ((SELECT tracks_id FROM tracks WHERE tracks_title = 'Computer Science Bachelors' AND tracks_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1));
-INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES ((SELECT tracks_id FROM tracks WHERE tracks_title = 'Computer Science Bachelors' AND tracks_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 110 LIMIT 1));
-
-INSERT INTO locations (`locations_title`, `locations_is_defunct`) VALUES ('Building A', false);
-
-INSERT INTO schedules (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('0800', '0950', '-M-W-F-', '2021-09-01 08:00:00', '2021-12-22 09:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
-INSERT INTO schedules (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('1000', '1150', '-M-W-F-', '2021-09-01 10:00:00', '2021-12-22 11:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
-INSERT INTO schedules (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('1300', '1450', '-M-W-F-', '2021-09-01 13:00:00', '2021-12-22 14:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
-INSERT INTO schedules (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('1500', '1650', '-M-W-F-', '2021-09-01 15:00:00', '2021-12-22 16:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
-INSERT INTO schedules (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('0800', '1045', '--T-T--', '2021-09-02 08:00:00', '2021-12-23 10:45:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
-
-INSERT INTO tasks (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('HRM 101 QUIZ 1', 100, true);
-INSERT INTO tasks (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('HRM 201 QUIZ 1', 100, true);
-INSERT INTO tasks (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('COMPSCI 101 QUIZ 1', 100, true);
-
-INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), 1.0);
-INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 201 QUIZ 1' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), 1.0);
-INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), 1.0);
-
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 101 LIMIT 1), false);
-INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '1045' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = 201 LIMIT 1), true);
-
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:33');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:31');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:30');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:32');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:38');
-INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:35');
+INSERT INTO `departments` (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('HRM', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), false);
+INSERT INTO `departments` (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('COMPSCI', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), false);
+INSERT INTO `departments` (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('CHEM', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Margret Mi-yetta' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), false);
+
+INSERT INTO `courses` (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Customer Service 1', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '101', true, true, false);
+INSERT INTO `courses` (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Customer Service 2', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '201', true, true, false);
+INSERT INTO `courses` (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Introduction to Java', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '101', true, true, false);
+INSERT INTO `courses` (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Database Design I', 3.0, (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '110', true, true, false);
+INSERT INTO `courses` (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('Chemistry Lab for Sciences I', 4.0, (SELECT depts_id FROM departments WHERE depts_title = 'CHEM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), '110', true, false, false);
+
+INSERT INTO `courses-prerequisites` (`courses_id_fk`, `courses_requires_courses_id_fk`) VALUES ((SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '201' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1));
+
+INSERT INTO `tracks` (`tracks_title`, `tracks_institutions_id_fk`, `tracks_is_undergraduate_program`, `tracks_is_postgraduate_program`, `tracks_is_defunct`) VALUES ('HRM TRACK', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), true, true, false);
+INSERT INTO `tracks` (`tracks_title`, `tracks_institutions_id_fk`, `tracks_is_undergraduate_program`, `tracks_is_postgraduate_program`, `tracks_is_defunct`) VALUES ('Computer Science Bachelors', (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1), true, true, false);
+
+INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES ((SELECT tracks_id FROM tracks WHERE tracks_title = 'HRM TRACK' AND tracks_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '201' LIMIT 1));
+INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES ((SELECT tracks_id FROM tracks WHERE tracks_title = 'Computer Science Bachelors' AND tracks_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1));
+INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES ((SELECT tracks_id FROM tracks WHERE tracks_title = 'Computer Science Bachelors' AND tracks_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '110' LIMIT 1));
+
+
+INSERT INTO `locations` (`locations_title`, `locations_is_defunct`) VALUES ('Building A', false);
+
+INSERT INTO `schedules` (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('0800', '0950', '-M-W-F-', '2021-09-01 08:00:00', '2021-12-22 09:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
+INSERT INTO `schedules` (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('1000', '1150', '-M-W-F-', '2021-09-01 10:00:00', '2021-12-22 11:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
+INSERT INTO `schedules` (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('1300', '1450', '-M-W-F-', '2021-09-01 13:00:00', '2021-12-22 14:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
+INSERT INTO `schedules` (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('1500', '1650', '-M-W-F-', '2021-09-01 15:00:00', '2021-12-22 16:50:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
+INSERT INTO `schedules` (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('0800', '1045', '--T-T--', '2021-09-02 08:00:00', '2021-12-23 10:45:00', false, (SELECT semesters_id FROM semesters WHERE semesters_name = 'Fall 2021' AND semesters_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1));
+
+INSERT INTO `tasks` (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('HRM 101 QUIZ 1', 100, true);
+INSERT INTO `tasks` (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('HRM 201 QUIZ 1', 100, true);
+INSERT INTO `tasks` (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('COMPSCI 101 QUIZ 1', 100, true);
+
+INSERT INTO `tasks-attachments` (`tasks-attachments_tasks_id_fk`, `tasks-attachments_summary`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), 'Variables, types and your first class.');
+
+INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), 1.0);
+INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 201 QUIZ 1' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), 1.0);
+INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES ((SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), 1.0);
+
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cassidy Clever' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'COMPSCI' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '101' LIMIT 1), false);
+INSERT INTO `enrollments` (`enrollments_students_id_fk`, `enrollments_instructors_id_fk`, `enrollments_schedules_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES ((SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Cindy Carma' LIMIT 1) AND instructors_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1), (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '1045' LIMIT 1), (SELECT courses_id FROM courses WHERE courses_depts_id_fk = (SELECT depts_id FROM departments WHERE depts_title = 'HRM' AND depts_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) AND courses_number = '201' LIMIT 1), true);
+
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '0800' AND schedules_end_24hr = '0950' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'HRM 101 QUIZ 1' LIMIT 1), '2021-09-05 08:00:00', '2021-09-08 21:00:00');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:33');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Yennifer Yaboozle' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:31');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Adam Appletosh' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:30');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Casey Bro' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:32');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Luis Rico' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:38');
+INSERT INTO `grades` (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES ((SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'Selina Sikorsky' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1), 100.00, (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1), '2021-09-05 10:00:00', '2021-09-08 21:09:35');
+
+INSERT INTO `grades-attachments` (`grades-attachments_grades_id_fk`, `grades-attachments_instructors_comments`, `grades-attachments_students_comments`) VALUES ((SELECT grades_id FROM grades WHERE grades_enrollments_id_fk = (SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = (SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '1000' AND schedules_end_24hr = '1150' LIMIT 1) AND enrollments_students_id_fk = (SELECT students_id FROM students WHERE students_persons_id_fk = (SELECT persons_id FROM persons WHERE persons_legal_name = 'James Capozzoli' LIMIT 1) AND students_institutions_id_fk = (SELECT institutions_id FROM institutions WHERE institutions_alt_name = 'BU' LIMIT 1) LIMIT 1) LIMIT 1) AND grades_tasks_id_fk = (SELECT tasks_id FROM tasks WHERE tasks_title = 'COMPSCI 101 QUIZ 1' LIMIT 1) LIMIT 1), 'Great work!', 'Thanks!');
 
 
 
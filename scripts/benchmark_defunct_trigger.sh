@@ -0,0 +1,4 @@
+#!/bin/bash
+cd ../benchmarks
+mysql -u root -p < defunct_trigger.sql
+cd ../scripts
@@ -0,0 +1,4 @@
+#!/bin/bash
+cd ../src
+python3 benchmark_reports.py --output ../benchmarks/results.json "$@"
+cd ../scripts
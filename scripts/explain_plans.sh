@@ -0,0 +1,4 @@
+#!/bin/bash
+cd ../src
+python3 explain_plans.py --dataset 1k "$@"
+cd ../scripts
@@ -0,0 +1,6 @@
+#!/bin/bash
+cd ../src
+python3 filler_generation.py --format tsv --output ../bulk "$@"
+cd ../bulk
+(cat ../src/core.sql load.sql) | mysql --local-infile=1 -u root -p
+cd ../scripts
@@ -0,0 +1,4 @@
+#!/bin/bash
+cd ../src
+python3 filler_generation_load.py --install "$@"
+cd ../scripts
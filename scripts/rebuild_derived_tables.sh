@@ -0,0 +1,4 @@
+#!/bin/bash
+cd ../src
+python3 rebuild_derived_tables.py "$@"
+cd ../scripts
@@ -0,0 +1,4 @@
+#!/bin/bash
+cd ../src
+python3 schedule_conflicts.py "$@"
+cd ../scripts
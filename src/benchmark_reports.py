@@ -0,0 +1,231 @@
+# benchmark and regression check of the five bottega-tasks reports
+#
+# for every dataset, this installs core.sql into a server, loads the data, and runs every bottega-tasks/*.sql query:
+# it times --repeats runs of each one (after a warm-up run), captures its EXPLAIN FORMAT=JSON plan, and compares its
+# rows with the golden output of the dataset.  the results are written as JSON with sorted keys, so that the results
+# of two commits can be diffed, and the exit status is 1 when a report does not match its golden output.
+#
+# the datasets are `demo`, the hand-written templates whose golden output is running-on-my-machine.txt, and the scale
+# tiers of filler_generation_scale.py (1k, 100k, 10m), whose golden outputs are recorded into
+# benchmarks/golden/TIER.json by --update-golden.  the rows are compared as the mysql client prints them, ignoring
+# their order, because most of the views do not sort.
+#
+# this drops and recreates the `schooldb` schema, so run it against a scratch server (see database.py):
+# $ python3 benchmark_reports.py --datasets demo 1k --output ../benchmarks/results.json
+#
+# pass --bulk to load the data with LOAD DATA LOCAL INFILE (see filler_generation_bulk.py) instead of INSERT
+# statements, which the 10m tier really wants; the server needs local_infile enabled for that.
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from database import add_connection_arguments, connect, install_schema, split_script, REPOSITORY_DIRECTORY
+from filler_generation_code import dependency_order, iterate_table, KeyRegistry
+from filler_generation_bulk import write_bulk, load_data_statement, tsv_file_name
+from filler_generation_data import templates
+from filler_generation_scale import scale_tiers, scale_config, scale_templates, DEFAULT_SEED
+
+TASKS_DIRECTORY = os.path.join(REPOSITORY_DIRECTORY, 'bottega-tasks')
+GOLDEN_DIRECTORY = os.path.join(REPOSITORY_DIRECTORY, 'benchmarks', 'golden')
+DEMO_TRANSCRIPT = os.path.join(REPOSITORY_DIRECTORY, 'running-on-my-machine.txt')
+DATASETS = ['demo'] + list(scale_tiers)
+
+
+def normalize_statement(statement):
+    return ' '.join(statement.lower().split()).rstrip(';')
+
+
+# {'01': 'select * from average_grades_assigned_by_instructors', ...}
+def report_queries():
+    queries = {}
+    for file_name in sorted(os.listdir(TASKS_DIRECTORY)):
+        if file_name.endswith('.sql'):
+            with open(os.path.join(TASKS_DIRECTORY, file_name), encoding='utf-8') as task:
+                queries[file_name[:-len('.sql')]] = split_script(task.read())[0]
+    return queries
+
+
+# the tables printed by the mysql client in a transcript, by the statement which printed them
+def parse_transcript(path):
+    outputs = {}
+    output = None
+    with open(path, encoding='utf-8') as transcript:
+        for line in transcript:
+            if line.startswith('mysql> '):
+                output = None
+                statement = line[len('mysql> '):]
+                if not statement.lstrip().startswith('--') and statement.strip():
+                    output = outputs[normalize_statement(statement)] = {'columns': None, 'rows': []}
+            elif output is not None and line.startswith('|'):
+                cells = [cell.strip() for cell in line.strip()[1:-1].split('|')]
+                if output['columns'] is None:
+                    output['columns'] = cells
+                else:
+                    output['rows'].append(cells)
+    return outputs
+
+
+def golden_path(dataset):
+    return os.path.join(GOLDEN_DIRECTORY, dataset + '.json')
+
+
+# {'01': {'columns': [...], 'rows': [[...], ...]}, ...}, or None when nothing has been recorded for the dataset
+def golden_outputs(dataset, queries):
+    if dataset == 'demo':
+        outputs = parse_transcript(DEMO_TRANSCRIPT)
+        return {name: outputs.get(normalize_statement(statement)) for name, statement in queries.items()}
+    if not os.path.exists(golden_path(dataset)):
+        return None
+    with open(golden_path(dataset), encoding='utf-8') as golden:
+        return json.load(golden)
+
+
+# the cell as the mysql client prints it
+def cell(value):
+    if value is None:
+        return 'NULL'
+    if isinstance(value, bytes):
+        return '0x' + value.hex().upper()
+    return str(value)
+
+
+def compare(output, golden):
+    if golden is None:
+        return 'missing'
+    if output['columns'] == golden['columns'] and sorted(output['rows']) == sorted(golden['rows']):
+        return 'match'
+    return 'mismatch'
+
+
+def dataset_templates(dataset, seed):
+    if dataset == 'demo':
+        return templates
+    return scale_templates(scale_config(dataset, seed))
+
+
+def load_dataset(connection, dataset, seed, batch_size, bulk):
+    source = dataset_templates(dataset, seed)
+    started = time.perf_counter()
+    connection.begin()
+    with connection.cursor() as cursor:
+        if bulk:
+            with tempfile.TemporaryDirectory(prefix='schooldb-bulk-') as directory:
+                write_bulk(directory, source, KeyRegistry(natural_keys=dataset == 'demo'))
+                for table in dependency_order():
+                    path = os.path.join(directory, tsv_file_name(table)).replace('\\', '/')
+                    cursor.execute(load_data_statement(table, path))
+        else:
+            # the demo data is loaded like build.sh writes it, the synthetic data with literal keys
+            registry = None
+            if dataset != 'demo':
+                registry = KeyRegistry(natural_keys=False)
+            for table in dependency_order():
+                for statement in iterate_table(table, source.get(table, []), registry, batch_size):
+                    cursor.execute(statement)
+    connection.commit()
+    return time.perf_counter() - started
+
+
+def run_query(cursor, statement):
+    cursor.execute(statement)
+    rows = cursor.fetchall()
+    return {'columns': [column[0] for column in cursor.description],
+            'rows': [[cell(value) for value in row] for row in rows]}
+
+
+def time_query(cursor, statement, repeats):
+    output = run_query(cursor, statement)
+    timings = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        cursor.execute(statement)
+        cursor.fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return output, {
+        'min_ms': round(min(timings), 3),
+        'median_ms': round(statistics.median(timings), 3),
+        'mean_ms': round(statistics.mean(timings), 3),
+        'max_ms': round(max(timings), 3),
+    }
+
+
+def explain(cursor, statement):
+    cursor.execute('EXPLAIN FORMAT=JSON ' + statement)
+    return json.loads(cursor.fetchone()[0])
+
+
+def benchmark_dataset(args, dataset, queries):
+    connection = connect(args, database=None, local_infile=args.bulk)
+    try:
+        install_schema(connection)
+        load_seconds = load_dataset(connection, dataset, args.seed, args.batch_size, args.bulk)
+        golden = golden_outputs(dataset, queries)
+        reports = {}
+        outputs = {}
+        with connection.cursor() as cursor:
+            for name, statement in queries.items():
+                outputs[name], timing = time_query(cursor, statement, args.repeats)
+                reports[name] = {
+                    'query': statement,
+                    'rows': len(outputs[name]['rows']),
+                    'timing': timing,
+                    'explain': explain(cursor, statement),
+                    'golden': compare(outputs[name], None if golden is None else golden.get(name)),
+                }
+                print(dataset, name, reports[name]['golden'], timing['median_ms'], 'ms', file=sys.stderr)
+    finally:
+        connection.close()
+    if args.update_golden and dataset != 'demo':
+        os.makedirs(GOLDEN_DIRECTORY, exist_ok=True)
+        with open(golden_path(dataset), 'w', encoding='utf-8') as golden_file:
+            json.dump(outputs, golden_file, indent=2, sort_keys=True)
+            golden_file.write('\n')
+    return {'load_seconds': round(load_seconds, 3), 'reports': reports}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the bottega-tasks reports against generated datasets')
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=['demo', '1k'], metavar='DATASET',
+                        help='datasets to benchmark, out of ' + ', '.join(DATASETS) + ' (default: demo 1k)')
+    parser.add_argument('--repeats', type=int, default=5,
+                        help='timed runs of each report (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the synthetic data (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='rows per INSERT statement for the synthetic data (default: %(default)s)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='load the data with LOAD DATA LOCAL INFILE')
+    parser.add_argument('--update-golden', action='store_true',
+                        help='record the outputs of the scale tiers as their golden outputs')
+    parser.add_argument('--output', metavar='FILE',
+                        help='write the JSON results to FILE instead of standard output')
+    add_connection_arguments(parser)
+    args = parser.parse_args()
+    if args.repeats < 1:
+        parser.error('--repeats must be at least 1')
+
+    queries = report_queries()
+    results = {'seed': args.seed, 'repeats': args.repeats, 'datasets': {}}
+    for dataset in args.datasets:
+        results['datasets'][dataset] = benchmark_dataset(args, dataset, queries)
+
+    if args.output is None:
+        json.dump(results, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2, sort_keys=True)
+            output.write('\n')
+
+    if any(report['golden'] == 'mismatch'
+           for dataset in results['datasets'].values() for report in dataset['reports'].values()):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
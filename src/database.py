@@ -0,0 +1,90 @@
+# connecting the python tools to a live schooldb
+#
+# the tools which talk to a server (benchmark_reports.py, ...) use PyMySQL, which only they need -- the filler
+# generator itself has no dependencies:
+# $ pip install pymysql
+#
+# every tool takes the same connection arguments (see add_connection_arguments), and prompts for the password when
+# --password is left out, like `mysql -u root -p` does.  any MySQL compatible server will do (MariaDB, ...).
+#
+# split_script cuts a script such as core.sql into single statements, the way the mysql command line client does,
+# so it honors DELIMITER lines (which the trigger definitions need), quotes and -- comments.
+
+import getpass
+import os
+
+try:
+    import pymysql
+except ImportError:
+    pymysql = None
+
+SRC_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+REPOSITORY_DIRECTORY = os.path.dirname(SRC_DIRECTORY)
+CORE_SQL = os.path.join(SRC_DIRECTORY, 'core.sql')
+
+
+def add_connection_arguments(parser):
+    group = parser.add_argument_group('connection')
+    group.add_argument('--host', default='localhost', help='server host (default: %(default)s)')
+    group.add_argument('--port', type=int, default=3306, help='server port (default: %(default)s)')
+    group.add_argument('--user', default='root', help='user name (default: %(default)s)')
+    group.add_argument('--password', help='password, prompted for when left out')
+
+
+def connect(args, database='schooldb', local_infile=False):
+    if pymysql is None:
+        raise SystemExit('this tool needs PyMySQL: pip install pymysql')
+    if args.password is None:
+        args.password = getpass.getpass('Enter password: ')
+    return pymysql.connect(host=args.host, port=args.port, user=args.user, password=args.password,
+                           database=database, charset='utf8mb4', autocommit=True, local_infile=local_infile)
+
+
+def split_script(text):
+    statements = []
+    delimiter = ';'
+    statement = ''
+    quote = None
+    for line in text.splitlines(keepends=True):
+        if quote is None and not statement.strip() and line.strip().upper().startswith('DELIMITER '):
+            delimiter = line.split()[1]
+            continue
+        i = 0
+        while i < len(line):
+            c = line[i]
+            if quote is not None:
+                statement += c
+                if c == '\\' and quote != '`':
+                    statement += line[i + 1:i + 2]
+                    i += 1
+                elif c == quote:
+                    quote = None
+            elif c in '\'"`':
+                quote = c
+                statement += c
+            elif c == '#' or (line.startswith('--', i) and line[i + 2:i + 3] in ('', ' ', '\t', '\r', '\n')):
+                statement += '\n'
+                break
+            elif line.startswith(delimiter, i):
+                if statement.strip():
+                    statements.append(statement.strip())
+                statement = ''
+                i += len(delimiter) - 1
+            else:
+                statement += c
+            i += 1
+    if statement.strip():
+        statements.append(statement.strip())
+    return statements
+
+
+def run_script(connection, text):
+    with connection.cursor() as cursor:
+        for statement in split_script(text):
+            cursor.execute(statement)
+
+
+# drops and recreates the schema from core.sql
+def install_schema(connection):
+    with open(CORE_SQL, encoding='utf-8') as core:
+        run_script(connection, core.read())
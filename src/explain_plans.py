@@ -0,0 +1,128 @@
+# query plan regression check
+#
+# runs EXPLAIN on every view of the schema and on every natural key lookup of the generator (the nested SELECT
+# statements of the get_*_id functions, one per table, as they appear in the hand-written templates), and fails when
+# any of them falls back to a full table scan (access type ALL):
+#
+# - a lookup may not scan any table, it runs once for every generated row.
+# - a view may scan the first table of each of its SELECT blocks, which is the table it enumerates (students_legal_names
+#   has to read every student), but every table joined to it has to be reached through an index.
+# - a view which is only meant to be read for a given key (students_courses_eligibility, ...) is checked like a lookup,
+#   as it is read: filtered on that key (see VIEW_LOOKUPS).
+#
+# plans depend on the table statistics, so check against a realistic amount of data: with --dataset, the schema is
+# installed from core.sql and the dataset is loaded first (like benchmark_reports.py does, and with the same warning:
+# this drops the `schooldb` schema), otherwise the current `schooldb` is checked as it is.
+# $ python3 explain_plans.py --dataset 1k
+
+import argparse
+import sys
+
+from database import add_connection_arguments, connect, install_schema
+from benchmark_reports import load_dataset, DATASETS
+from filler_generation_code import KeyReference
+from filler_generation_data import templates
+from filler_generation_scale import DEFAULT_SEED
+
+
+# the views which are read for a given student and course or track, and how
+VIEW_LOOKUPS = {
+    'students_missing_prerequisites': 'students_id = 1 AND courses_id = 1',
+    'students_courses_eligibility': 'students_id = 1 AND courses_id = 1',
+    'students_tracks_progress': 'students_id = 1 AND tracks_id = 1',
+}
+
+
+# {table: 'SELECT ..._id FROM ... LIMIT 1'}, the first lookup of every table found in the templates
+def generator_lookups():
+    lookups = {}
+
+    def visit(value):
+        if isinstance(value, KeyReference):
+            lookups.setdefault(value.table, value[1:-1])
+            for part in value.key:
+                visit(part)
+
+    for t in templates.values():
+        for x in t:
+            for value in x:
+                visit(value)
+    return lookups
+
+
+def view_names(cursor):
+    cursor.execute("SELECT table_name FROM information_schema.views WHERE table_schema = DATABASE() "
+                   "ORDER BY table_name")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def analyze_tables(cursor):
+    cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_schema = DATABASE() "
+                   "AND table_type = 'BASE TABLE'")
+    names = [row[0] for row in cursor.fetchall()]
+    cursor.execute("ANALYZE TABLE " + ", ".join('`' + name + '`' for name in names))
+    cursor.fetchall()
+
+
+def explain(cursor, statement):
+    cursor.execute('EXPLAIN ' + statement)
+    columns = [column[0].lower() for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+# the tables of the plan read with a full scan.  materialized derived tables (`<derived2>`, ...) do not count.
+def full_scans(plan, first_table_allowed):
+    scans = []
+    blocks = set()
+    for row in plan:
+        first = row['id'] not in blocks
+        blocks.add(row['id'])
+        if row['type'] != 'ALL' or (row['table'] or '').startswith('<'):
+            continue
+        if first and first_table_allowed:
+            continue
+        scans.append(row['table'])
+    return scans
+
+
+def main():
+    parser = argparse.ArgumentParser(description='fail if a view or a generator lookup needs a full table scan')
+    parser.add_argument('--dataset', choices=DATASETS,
+                        help='install the schema and load this dataset first: ' + ', '.join(DATASETS))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the synthetic data (default: %(default)s)')
+    add_connection_arguments(parser)
+    args = parser.parse_args()
+
+    connection = connect(args, database=None if args.dataset else 'schooldb')
+    failures = 0
+    try:
+        if args.dataset is not None:
+            install_schema(connection)
+            load_dataset(connection, args.dataset, args.seed, 1000, False)
+        with connection.cursor() as cursor:
+            analyze_tables(cursor)
+            checks = []
+            for name in view_names(cursor):
+                if name in VIEW_LOOKUPS:
+                    checks.append(('view ' + name, 'SELECT * FROM `' + name + '` WHERE ' + VIEW_LOOKUPS[name], False))
+                else:
+                    checks.append(('view ' + name, 'SELECT * FROM `' + name + '`', True))
+            checks += [('lookup ' + table, lookup, False) for table, lookup in sorted(generator_lookups().items())]
+            for name, statement, first_table_allowed in checks:
+                scans = full_scans(explain(cursor, statement), first_table_allowed)
+                if scans:
+                    failures += 1
+                    print('FULL SCAN', name + ':', ', '.join(scans))
+                else:
+                    print('ok', name)
+    finally:
+        connection.close()
+
+    if failures:
+        print(failures, 'of the plans fall back to a full table scan', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,41 +10,121 @@
 # run as such in modern shell to generate the filler script, from the source directory:
 # $ (cat init.sql && python filler-generation.py) | mysql -u root -p
 #
+# pass --resolved-keys to have the generator assign every surrogate key itself, and write literal integer foreign
+# keys instead of the nested SQL SELECT statements (much faster to load, but it expects an empty schema, which is what
+# core.sql creates).
+#
+# pass --batch-size N to group up to N rows of a table into each multi-row INSERT statement, instead of one statement
+# per row; --max-statement-bytes caps the estimated size of each of those statements (keep it below the server's
+# max_allowed_packet).
+#
+# pass --scale TIER (1k, 100k or 10m, roughly the number of grades) to generate synthetic data from
+# filler_generation_scale.py instead of the hand-written templates; the knobs of the tier can be overridden one by one
+# (--students-per-institution, --grades-per-enrollment, ...) and --seed picks a different, but still reproducible,
+# dataset.
+#
+# pass --format tsv --output DIR to write one tab-separated data file per table into DIR, along with a load.sql script
+# which loads them with LOAD DATA LOCAL INFILE (see filler_generation_bulk.py); the keys are always resolved for those.
+#
+# pass --jobs N to generate the tables in N worker processes; the synthetic tables are split into slices for that, and
+# the output is stitched back together in load order (see filler_generation_parallel.py).
+#
+# pass --profile FILE to record the wall time, rows, bytes and peak memory of every table into FILE as JSON, with a
+# summary table on standard error (see filler_generation_profile.py).
+#
+# the output is streamed table by table, statement by statement, so memory use does not grow with the row count.
+# pass --output FILE to write to a file directly instead of standard output.
+#
 # TODO separate all the *_template definitions from the function definitions to ease the reading, but only after the
 # column names/NOT-NULL's are no longer changing
 #
 
+import argparse
 import sys
 from filler_generation_data import *
+from filler_generation_bulk import write_bulk
+from filler_generation_parallel import write_parallel
+from filler_generation_profile import profile_tables, profile_bulk, write_report, print_summary
+from filler_generation_scale import scale_tiers, scale_config, scale_templates, DEFAULT_SEED
+
+OUTPUT_BUFFER_BYTES = 1024 * 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='print the schooldb filler data as SQL')
+    parser.add_argument('--resolved-keys', action='store_true',
+                        help='emit literal integer keys instead of nested SELECT lookups')
+    parser.add_argument('--batch-size', type=int, default=1,
+                        help='rows per INSERT statement (default: 1)')
+    parser.add_argument('--max-statement-bytes', type=int, default=DEFAULT_MAX_STATEMENT_BYTES,
+                        help='estimated size limit of each INSERT statement (default: %(default)s)')
+    parser.add_argument('--format', choices=['sql', 'tsv'], default='sql',
+                        help='INSERT statements, or data files for LOAD DATA (default: %(default)s)')
+    parser.add_argument('--output', metavar='PATH',
+                        help='write the SQL to the file PATH instead of standard output, or the tsv files into the '
+                             'directory PATH')
+    parser.add_argument('--scale', metavar='TIER', choices=sorted(scale_tiers),
+                        help='generate synthetic data of the given tier: ' + ', '.join(scale_tiers))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the synthetic data (default: %(default)s)')
+    for knob in scale_tiers['1k']:
+        parser.add_argument('--' + knob.replace('_', '-'), type=int, metavar='N',
+                            help='override the ' + knob.replace('_', ' ') + ' of the tier')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='generate the tables in N worker processes (default: 1)')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='write the time, rows, bytes and peak memory of every table to FILE as JSON')
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.format == 'tsv' and args.output is None:
+        parser.error('--format tsv needs an --output directory')
+    if args.profile is not None and args.jobs > 1:
+        parser.error('--profile needs --jobs 1')
+
+    # the synthetic templates already hold literal keys, so the registry only has to count them
+    config = None
+    source = templates
+    if args.scale is not None:
+        try:
+            config = scale_config(args.scale, args.seed, **{knob: getattr(args, knob) for knob in scale_tiers['1k']})
+        except ValueError as e:
+            parser.error(str(e))
+        source = scale_templates(config)
+
+    options = {
+        'registry': KeyRegistry(natural_keys=args.scale is None) if args.resolved_keys else None,
+        'batch_size': args.batch_size,
+        'max_statement_bytes': args.max_statement_bytes,
+    }
+
+    if args.profile is not None:
+        if args.format == 'tsv':
+            profile = profile_bulk(args.output, source, KeyRegistry(natural_keys=args.scale is None))
+        elif args.output is None:
+            profile = profile_tables(sys.stdout, source, **options)
+        else:
+            with open(args.output, 'w', buffering=OUTPUT_BUFFER_BYTES) as output:
+                profile = profile_tables(output, source, **options)
+        report = {'kind': 'generation', 'scale': args.scale, 'seed': args.seed, 'format': args.format,
+                  'resolved_keys': args.resolved_keys, 'batch_size': args.batch_size, 'tables': profile}
+        if config is not None:
+            report['config'] = config
+        write_report(report, args.profile)
+        print_summary(report, sys.stderr)
+    elif args.jobs > 1:
+        write_parallel(args.output, args.format, config, args.jobs, args.resolved_keys, args.batch_size,
+                       args.max_statement_bytes)
+    elif args.format == 'tsv':
+        write_bulk(args.output, source, KeyRegistry(natural_keys=args.scale is None))
+    elif args.output is None:
+        write_tables(sys.stdout, source, **options)
+    else:
+        with open(args.output, 'w', buffering=OUTPUT_BUFFER_BYTES) as output:
+            write_tables(output, source, **options)
 
-print('USE `schooldb`')
-print('BEGIN;')
-print('')
-print(generate_nations(nations_template))
-print(generate_states(states_template))
-print(generate_cityzip_pairs(cityzip_pairs_template))
-print(generate_addresses(addresses_template))
-print(generate_institutions(institutions_template))
-print(generate_semesters(semesters_template))
-print(generate_persons(persons_template))
-print(generate_students(students_template))
-print(generate_instructors(instructors_template))
-print(generate_employees(employees_template))
-print(generate_instructor_logins(instructor_logins_template))
-print(generate_student_logins(student_logins_template))
-print(generate_employee_logins(employee_logins_template))
-print(generate_departments(departments_template))
-print(generate_courses(courses_template))
-print(generate_courses_prerequisites(courses_prerequisites_template))
-print(generate_tracks(tracks_template))
-print(generate_tracks_prerequisites(tracks_prerequisites_template))
-print(generate_locations(locations_template))
-print(generate_schedules(schedules_template))
-print(generate_tasks(tasks_template))
-print(generate_courses_tasks(courses_tasks_template))
-print(generate_enrollments(enrollments_template))
-print(generate_grades(grades_template))
-print(generate_services(services_template))
-print('')
-print('COMMIT;')
 
+if __name__ == '__main__':
+    main()
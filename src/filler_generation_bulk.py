@@ -0,0 +1,94 @@
+# bulk-load output for the filler generator
+#
+# even batched INSERT statements are far slower to load than MySQL's bulk loader, so write_bulk writes one
+# tab-separated data file per table (nations.tsv, states.tsv, ... services.tsv) plus a load.sql driver script, which
+# loads those files with LOAD DATA LOCAL INFILE in dependency order (parents before children).
+#
+# the data files use the LOAD DATA defaults: fields terminated by a tab, lines terminated by a newline, backslash
+# escapes for backslashes, tabs, newlines, carriage returns and NUL bytes, and \N for NULL.  booleans are written as
+# 1 and 0.  BLOB columns are written as hex and decoded with UNHEX by the driver script, so arbitrary binary content
+# survives the trip through a text file.  the same files can be read by any other tool which understands this flavor
+# of TSV.
+#
+# the data files always carry literal keys, so the rows are resolved with a KeyRegistry, and the driver script loads
+# them into an empty schema (which is what core.sql creates).  run it from the directory holding the files:
+# $ cd bulk && (cat ../src/core.sql load.sql) | mysql --local-infile=1 -u root -p
+
+import os
+
+from filler_generation_code import tables, dependency_order, KeyRegistry, resolve_row, BOOLEAN, BLOB
+
+TSV_BUFFER_BYTES = 1024 * 1024
+
+tsv_escapes = str.maketrans({'\\': '\\\\', '\t': '\\t', '\n': '\\n', '\r': '\\r', '\0': '\\0'})
+
+
+def tsv_value(kind, value):
+    if value is None:
+        return '\\N'
+    if kind == BOOLEAN:
+        return '1' if value in (True, 'true', 'TRUE', '1', 1) else '0'
+    if kind == BLOB:
+        return value.hex()
+    return str(value).translate(tsv_escapes)
+
+
+# every table gets the same columns in every line: its id (when it has one), then all of its columns.  rows which
+# leave trailing columns out are padded with NULL.
+def tsv_columns(table):
+    spec = tables[table]
+    columns = list(spec['columns'])
+    if spec['id'] is not None:
+        columns.insert(0, (spec['id'], None))
+    return columns
+
+
+def write_tsv(stream, table, t, registry):
+    width = len(tsv_columns(table))
+    for x in t:
+        columns, values = resolve_row(table, x, registry)
+        fields = [tsv_value(kind, value) for (name, kind), value in zip(columns, values)]
+        fields += ['\\N'] * (width - len(fields))
+        stream.write('\t'.join(fields) + '\n')
+
+
+def load_data_statement(table, path):
+    names = []
+    unhex = []
+    for name, kind in tsv_columns(table):
+        if kind == BLOB:
+            names.append('@`' + name + '`')
+            unhex.append('`' + name + '` = UNHEX(@`' + name + '`)')
+        else:
+            names.append('`' + name + '`')
+    statement = ("LOAD DATA LOCAL INFILE '" + path + "' INTO TABLE `" + table + "` CHARACTER SET utf8mb4 ("
+                 + ", ".join(names) + ")")
+    if unhex:
+        statement += " SET " + ", ".join(unhex)
+    return statement + ";\n"
+
+
+def tsv_file_name(table):
+    return table + '.tsv'
+
+
+# writes every table of `tables` (an empty file for tables without a template) and the load.sql driver into
+# `directory`, creating it if needed
+def write_bulk(directory, templates, registry=None):
+    if registry is None:
+        registry = KeyRegistry()
+    os.makedirs(directory, exist_ok=True)
+    for table in dependency_order():
+        with open(os.path.join(directory, tsv_file_name(table)), 'w', encoding='utf-8', newline='\n',
+                  buffering=TSV_BUFFER_BYTES) as stream:
+            write_tsv(stream, table, templates.get(table, []), registry)
+    write_load_script(directory)
+
+
+def write_load_script(directory):
+    with open(os.path.join(directory, 'load.sql'), 'w', encoding='utf-8', newline='\n') as driver:
+        driver.write("-- loads the data files in this directory into an empty `schooldb`, run from this directory\n")
+        driver.write("USE `schooldb`;\nBEGIN;\n\n")
+        for table in dependency_order():
+            driver.write(load_data_statement(table, tsv_file_name(table)))
+        driver.write("\nCOMMIT;\n")
@@ -1,209 +1,575 @@
-# might be nice to order this template in accordance with the dial prefix
-def generate_nations(t):
-    stringResult = ""
+# table definitions for the filler generator
+#
+# every table which receives filler data is described once in `tables`, in the order the tables must be loaded
+# (parents before children).  each entry lists the template columns in the same order as the tuples in
+# filler_generation_data.py, along with the kind of value stored there:
+#
+#   TEXT    -- quoted in the SQL output (names, codes, dates)
+#   NUMBER  -- emitted as-is (decimals, counts)
+#   BOOLEAN -- emitted as-is ('true' / 'false')
+#   KEY     -- a foreign key, usually the result of one of the get_*_id functions below
+#   BLOB    -- binary content (bytes), emitted as a hex literal
+#
+# templates may leave out trailing columns (those are all nullable).  'parents' lists the tables referenced by the
+# foreign keys of the table in core.sql, 'id' is the surrogate key column of the table (None if the table has none),
+# and 'natural_key' lists the template positions the matching get_*_id function filters on.
+
+TEXT = 'text'
+NUMBER = 'number'
+BOOLEAN = 'boolean'
+KEY = 'key'
+BLOB = 'blob'
+
+tables = {
+    # might be nice to order this template in accordance with the dial prefix
+    'nations': {
+        'parents': [],
+        'id': 'nations_id',
+        'columns': [('nations_name', TEXT), ('nations_code', TEXT)],
+        'natural_key': [1],
+    },
+    'states': {
+        'parents': ['nations'],
+        'id': 'states_id',
+        'columns': [('states_name', TEXT), ('states_code', TEXT), ('states_nations_id_fk', KEY)],
+        'natural_key': [1],
+    },
+    'cityzip_pairs': {
+        'parents': ['states'],
+        'id': 'cityzip_pairs_id',
+        'columns': [('cityzip_pairs_city', TEXT), ('cityzip_pairs_zipcore', TEXT), ('cityzip_pairs_states_id_fk', KEY)],
+        'natural_key': [0, 1],
+    },
+    'addresses': {
+        'parents': ['cityzip_pairs'],
+        'id': 'addresses_id',
+        'columns': [('addresses_line_1', TEXT), ('addresses_cityzip_pairs_fk', KEY), ('addresses_is_defunct', BOOLEAN)],
+        'natural_key': [0],
+    },
+    'institutions': {
+        'parents': ['states', 'addresses'],
+        'id': 'institutions_id',
+        'columns': [('institutions_legal_name', TEXT), ('institutions_operating_state_fk', KEY),
+                    ('institutions_alt_name', TEXT), ('institutions_mailing_fk', KEY), ('institutions_web_url', TEXT),
+                    ('institutions_has_undergraduate_programs', BOOLEAN),
+                    ('institutions_has_postgraduate_programs', BOOLEAN), ('institutions_is_defunct', BOOLEAN)],
+        'natural_key': [2],
+    },
+    'semesters': {
+        'parents': ['institutions'],
+        'id': 'semesters_id',
+        'columns': [('semesters_name', TEXT), ('semesters_start', TEXT), ('semesters_finish', TEXT),
+                    ('semesters_institutions_id_fk', KEY)],
+        'natural_key': [0, 3],
+    },
+    'persons': {
+        'parents': ['nations', 'states', 'addresses'],
+        'id': 'persons_id',
+        'columns': [('persons_legal_name', TEXT), ('persons_nations_id_fk', KEY),
+                    ('persons_state-issued_id_states_id_fk', KEY), ('persons_personal_email', TEXT),
+                    ('persons_mailing_address_fk', KEY), ('persons_is_defunct', BOOLEAN)],
+        'natural_key': [0],
+    },
+    'students': {
+        'parents': ['persons', 'institutions'],
+        'id': 'students_id',
+        'columns': [('students_persons_id_fk', KEY), ('students_institutions_id_fk', KEY),
+                    ('students_is_defunct', BOOLEAN)],
+        'natural_key': [0, 1],
+    },
+    'instructors': {
+        'parents': ['persons', 'institutions'],
+        'id': 'instructors_id',
+        'columns': [('instructors_persons_id_fk', KEY), ('instructors_institutions_id_fk', KEY),
+                    ('instructors_is_defunct', BOOLEAN)],
+        'natural_key': [0, 1],
+    },
+    'employees': {
+        'parents': ['persons', 'institutions'],
+        'id': 'employees_id',
+        'columns': [('employees_persons_id_fk', KEY), ('employees_institutions_id_fk', KEY),
+                    ('employees_is_defunct', BOOLEAN)],
+        'natural_key': [0, 1],
+    },
+    'instructor-logins': {
+        'parents': ['instructors', 'institutions'],
+        'id': None,
+        'columns': [('instructor-logins_instructors_id', KEY), ('instructor-logins_institutions_id_fk', KEY),
+                    ('instructor-logins_string', TEXT), ('instructor-logins_is_defunct', BOOLEAN)],
+        'natural_key': None,
+    },
+    'student-logins': {
+        'parents': ['students', 'institutions'],
+        'id': None,
+        'columns': [('student-logins_students_id_fk', KEY), ('student-logins_institutions_id_fk', KEY),
+                    ('student-logins_string', TEXT), ('student-logins_is_defunct', BOOLEAN)],
+        'natural_key': None,
+    },
+    'employee-logins': {
+        'parents': ['employees', 'institutions'],
+        'id': None,
+        'columns': [('employee-logins_employees_id_fk', KEY), ('employee-logins_institutions_id_fk', KEY),
+                    ('employee-logins_string', TEXT), ('employee-logins_is_defunct', BOOLEAN)],
+        'natural_key': None,
+    },
+    'departments': {
+        'parents': ['institutions', 'instructors'],
+        'id': 'depts_id',
+        'columns': [('depts_title', TEXT), ('depts_institutions_id_fk', KEY), ('depts_chairperson_instructors_fk', KEY),
+                    ('depts_is_defunct', BOOLEAN)],
+        'natural_key': [0, 1],
+    },
+    'courses': {
+        'parents': ['departments'],
+        'id': 'courses_id',
+        'columns': [('courses_title', TEXT), ('courses_credit_hours', NUMBER), ('courses_depts_id_fk', KEY),
+                    ('courses_number', TEXT), ('courses_undergraduates_eligible', BOOLEAN),
+                    ('courses_postgraduates_eligible', BOOLEAN), ('courses_is_defunct', BOOLEAN)],
+        'natural_key': [2, 3],
+    },
+    'courses-prerequisites': {
+        'parents': ['courses'],
+        'id': None,
+        'columns': [('courses_id_fk', KEY), ('courses_requires_courses_id_fk', KEY)],
+        'natural_key': None,
+    },
+    'tracks': {
+        'parents': ['institutions'],
+        'id': 'tracks_id',
+        'columns': [('tracks_title', TEXT), ('tracks_institutions_id_fk', KEY),
+                    ('tracks_is_undergraduate_program', BOOLEAN), ('tracks_is_postgraduate_program', BOOLEAN),
+                    ('tracks_is_defunct', BOOLEAN)],
+        'natural_key': [0, 1],
+    },
+    'tracks-prerequisites': {
+        'parents': ['tracks', 'courses'],
+        'id': None,
+        'columns': [('tracks-prerequisites_tracks_id_fk', KEY), ('tracks-prerequisites_requires_courses_id_fk', KEY)],
+        'natural_key': None,
+    },
+    'courses-equivalencies': {
+        'parents': ['courses'],
+        'id': 'courses-equivalencies_id',
+        'columns': [('courses-equivalencies_a', KEY), ('courses-equivalencies_b', KEY)],
+        'natural_key': None,
+    },
+    'locations': {
+        'parents': ['addresses'],
+        'id': 'locations_id',
+        'columns': [('locations_title', TEXT), ('locations_is_defunct', BOOLEAN)],
+        'natural_key': [0],
+    },
+    # note here the boolean is used for whether the meetings are virtual, not the typical is_defunct flag (which is not
+    # available on this table)
+    'schedules': {
+        'parents': ['semesters', 'locations'],
+        'id': 'schedules_id',
+        'columns': [('schedules_start_24hr', TEXT), ('schedules_end_24hr', TEXT), ('schedules_dow', TEXT),
+                    ('schedules_start', TEXT), ('schedules_finish', TEXT), ('schedules_meetings_are_virtual', BOOLEAN),
+                    ('schedules_semesters_id_fk', KEY), ('schedules_locations_id_fk', KEY)],
+        'natural_key': [0, 1],
+    },
+    'tasks': {
+        'parents': [],
+        'id': 'tasks_id',
+        'columns': [('tasks_title', TEXT), ('tasks_max_points_towards_gpa', NUMBER),
+                    ('tasks_points_count_towards_gpa', BOOLEAN)],
+        'natural_key': [0],
+    },
+    # the large contents of tasks and grades are kept in their own tables, keyed by the task or grade
+    'tasks-attachments': {
+        'parents': ['tasks'],
+        'id': None,
+        'columns': [('tasks-attachments_tasks_id_fk', KEY), ('tasks-attachments_summary', TEXT),
+                    ('tasks-attachments_content_blob', BLOB), ('tasks-attachments_content_clob', TEXT)],
+        'natural_key': None,
+    },
+    'courses-tasks': {
+        'parents': ['tasks', 'courses'],
+        'id': 'courses-tasks_id',
+        'columns': [('courses-tasks_tasks_id_fk', KEY), ('courses-tasks_courses_id_fk', KEY),
+                    ('courses-tasks_points_coefficient', NUMBER)],
+        'natural_key': None,
+    },
+    # the template tuple is out of order from the table definition in core.sql, sorry!
+    'enrollments': {
+        'parents': ['schedules', 'instructors', 'students', 'courses'],
+        'id': 'enrollments_id',
+        'columns': [('enrollments_students_id_fk', KEY), ('enrollments_instructors_id_fk', KEY),
+                    ('enrollments_schedules_id_fk', KEY), ('enrollments_courses_id_fk', KEY),
+                    ('enrollments_is_auditing', BOOLEAN)],
+        'natural_key': [2, 0],
+    },
+    'grades': {
+        'parents': ['enrollments', 'tasks'],
+        'id': 'grades_id',
+        'columns': [('grades_enrollments_id_fk', KEY), ('grades_points_towards_gpa', NUMBER),
+                    ('grades_tasks_id_fk', KEY), ('grades_date_created', TEXT), ('grades_date_last_updated', TEXT)],
+        'natural_key': [0, 2],
+    },
+    'grades-attachments': {
+        'parents': ['grades'],
+        'id': None,
+        'columns': [('grades-attachments_grades_id_fk', KEY), ('grades-attachments_instructors_comments', TEXT),
+                    ('grades-attachments_students_comments', TEXT),
+                    ('grades-attachments_instructors_attachment_blob', BLOB),
+                    ('grades-attachments_instructors_attachment_clob', TEXT),
+                    ('grades-attachments_students_attachment_blob', BLOB),
+                    ('grades-attachments_students_attachment_clob', TEXT)],
+        'natural_key': None,
+    },
+    # this has a primary key because financial tables will foreign key link to this later, this is the bridge between
+    # money flowing in/out AND what students/instructors are doing, AND when they are doing it
+    'services': {
+        'parents': ['instructors', 'students', 'schedules'],
+        'id': 'services_id',
+        'columns': [('services_instructors_id_fk', KEY), ('services_students_id_fk', KEY),
+                    ('services_schedules_id_fk', KEY)],
+        'natural_key': None,
+    },
+}
+
+
+# the foreign key graph
+#
+# `parents` makes the tables a DAG.  dependency_order returns the tables in a valid load order, which is the order of
+# `tables` itself wherever that already is one, and raises ValueError if the foreign keys ever form a cycle.
+
+def dependency_order():
+    order = []
+    remaining = list(tables)
+    while remaining:
+        ready = [t for t in remaining if all(p in order for p in tables[t]['parents'])]
+        if not ready:
+            raise ValueError('the foreign keys of ' + ', '.join(remaining) + ' form a cycle')
+        order.append(ready[0])
+        remaining.remove(ready[0])
+    return order
+
+
+def ancestors(table):
+    result = set()
+    for parent in tables[table]['parents']:
+        result.add(parent)
+        result |= ancestors(parent)
+    return result
+
+
+# key resolution
+#
+# by default the foreign keys in the output are nested SQL SELECT statements, which MySQL has to evaluate for every
+# single row.  in 'resolved' mode the generator instead assigns every row its surrogate key in python (1, 2, 3, ...
+# per table, in template order), remembers it in a KeyRegistry, and writes literal integers for the primary key and
+# for every foreign key.  the get_*_id functions work for both modes: they return a KeyReference, which is the same
+# nested SELECT string as always, but which also remembers the table and natural key it is looking up.
+
+class KeyReference(str):
+    def __new__(cls, table, key, subquery):
+        self = str.__new__(cls, subquery)
+        self.table = table
+        self.key = key
+        return self
+
+
+# with natural_keys=False the registry only counts surrogate keys, which is all that is needed when the templates
+# already hold literal integer foreign keys (see filler_generation_scale.py), and keeps memory flat.
+class KeyRegistry:
+    def __init__(self, natural_keys=True):
+        self.natural_keys = natural_keys
+        self.next_ids = {}
+        self.keys = {}
+
+    # hands out the next surrogate key of the table, and remembers it under the natural key (if there is one).
+    # like the LIMIT 1 in the nested SELECT statements, the first row registered with a natural key wins.
+    def assign(self, table, natural_key=None):
+        new_id = self.next_ids.get(table, 1)
+        self.next_ids[table] = new_id + 1
+        if natural_key is not None:
+            self.keys.setdefault(table, {}).setdefault(natural_key, new_id)
+        return new_id
+
+    # for generating a table in slices: the next surrogate key handed out for the table will be first_id
+    def start(self, table, first_id):
+        self.next_ids[table] = first_id
+
+    def resolve(self, value):
+        if not isinstance(value, KeyReference):
+            return value
+        natural_key = tuple(self.resolve(x) for x in value.key)
+        try:
+            return self.keys[value.table][natural_key]
+        except KeyError:
+            raise KeyError('no row in `' + value.table + '` matches ' + repr(natural_key)) from None
+
+
+# backslash escapes understood by MySQL inside quoted strings
+sql_escapes = str.maketrans({'\\': '\\\\', "'": "\\'", '\n': '\\n', '\r': '\\r', '\0': '\\0', '\x1a': '\\Z'})
+
+
+def render_value(kind, value):
+    if value is None:
+        return 'NULL'
+    if kind == TEXT:
+        return "'" + value.translate(sql_escapes) + "'"
+    if kind == BLOB:
+        return "X'" + value.hex() + "'"
+    return str(value)
+
+
+# multi-row INSERT statements
+#
+# by default every row is its own INSERT statement.  with batch_size above 1, consecutive rows of a table are grouped
+# into one `INSERT ... VALUES (...), (...), ...;` statement, which saves MySQL a parse, a plan and a round trip per
+# row.  a statement is closed early once its estimated size would pass max_statement_bytes, so it always fits into
+# the server's max_allowed_packet (which defaults to 4 MB on MySQL 5.7 and 64 MB on 8.0).
+
+DEFAULT_MAX_STATEMENT_BYTES = 1024 * 1024
+
+
+# without a registry, rows are left exactly as they are: no primary key column, nested SELECT foreign keys.
+# with a registry, every row gets its surrogate key assigned and all foreign keys are resolved to integers.
+# returns the (name, kind) columns the row fills, along with its values.
+def resolve_row(table, x, registry=None):
+    spec = tables[table]
+    columns = spec['columns'][:len(x)]
+    if registry is None:
+        return columns, x
+    values = [registry.resolve(value) if kind == KEY else value for (name, kind), value in zip(columns, x)]
+    if spec['id'] is not None:
+        natural_key = None
+        if registry.natural_keys and spec['natural_key'] is not None:
+            natural_key = tuple(values[i] for i in spec['natural_key'])
+        columns = [(spec['id'], KEY)] + columns
+        values.insert(0, registry.assign(table, natural_key))
+    return columns, values
+
+
+# yields the column names of each row along with its rendered "(...)" values
+def render_rows(table, t, registry=None):
     for x in t:
-        stringResult += "INSERT INTO `nations` (`nations_name`, `nations_code`) VALUES ('"+ x[0] +"', '" + x[1] + "');\n"
-    return stringResult
+        columns, values = resolve_row(table, x, registry)
+        yield (tuple(name for name, kind in columns),
+               "(" + ", ".join(render_value(kind, value) for (name, kind), value in zip(columns, values)) + ")")
+
+
+def insert_statement(table, columns, rows):
+    return ("INSERT INTO `" + table + "` (" + ", ".join("`" + c + "`" for c in columns) + ") VALUES "
+            + ", ".join(rows) + ";\n")
+
+
+# streaming
+#
+# iterate_table yields the statements of one table as they are built, and write_tables writes every table straight to
+# an output stream, so the whole dataset never has to be held in memory (the templates themselves may be generators).
+# generate_table and the generate_* wrappers below still return one string per table, for small templates.
+
+# rows only share a statement when they fill the same columns (templates may leave trailing columns out)
+def iterate_table(table, t, registry=None, batch_size=1, max_statement_bytes=DEFAULT_MAX_STATEMENT_BYTES):
+    batch_columns = None
+    batch = []
+    batch_bytes = 0
+    for columns, row in render_rows(table, t, registry):
+        if batch and (columns != batch_columns or len(batch) >= batch_size
+                      or batch_bytes + len(row) + 2 > max_statement_bytes):
+            yield insert_statement(table, batch_columns, batch)
+            batch = []
+        if not batch:
+            batch_columns = columns
+            batch_bytes = len(insert_statement(table, columns, []))
+        batch.append(row)
+        batch_bytes += len(row) + 2
+    if batch:
+        yield insert_statement(table, batch_columns, batch)
+
+
+def generate_table(table, t, **options):
+    return "".join(iterate_table(table, t, **options))
+
+
+# `templates` maps table names to templates; tables are written in dependency order, each followed by a
+# blank line, all inside one transaction.
+SQL_HEADER = "USE `schooldb`\nBEGIN;\n\n"
+SQL_FOOTER = "\nCOMMIT;\n"
+
+
+def write_tables(stream, templates, **options):
+    stream.write(SQL_HEADER)
+    for table in dependency_order():
+        if table in templates:
+            for statement in iterate_table(table, templates[table], **options):
+                stream.write(statement)
+            stream.write("\n")
+    stream.write(SQL_FOOTER)
+
+
+def generate_nations(t, **options):
+    return generate_table('nations', t, **options)
 
 # no newline or semi-colon at the end of the string
 def get_nations_id(nation_code):
-    return "(SELECT nations_id FROM nations WHERE nations_code = '" + nation_code + "' LIMIT 1)"
+    return KeyReference('nations', (nation_code,),
+        "(SELECT nations_id FROM nations WHERE nations_code = '" + nation_code + "' LIMIT 1)")
 
-def generate_states(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `states` (`states_name`, `states_code`, `states_nations_id_fk`) VALUES ('" + x[0] + "', '" + x[1] + "', " + x[2] + ");\n"
-    return stringResult;
+def generate_states(t, **options):
+    return generate_table('states', t, **options)
 
 def get_states_id(states_code):
-    return "(SELECT states_id FROM states WHERE states_code = '" + states_code + "' LIMIT 1)"
+    return KeyReference('states', (states_code,),
+        "(SELECT states_id FROM states WHERE states_code = '" + states_code + "' LIMIT 1)")
 
-def generate_cityzip_pairs(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `cityzip_pairs` (`cityzip_pairs_city`, `cityzip_pairs_zipcore`, `cityzip_pairs_states_id_fk`) VALUES ('" + x[0] + "', '" + x[1] + "', " + x[2] + ");\n"
-    return stringResult;
+def generate_cityzip_pairs(t, **options):
+    return generate_table('cityzip_pairs', t, **options)
 
 def get_cityzip_pairs_id(cityzip_pairs_city, cityzip_pairs_zipcore):
-    return "(SELECT cityzip_pairs_id FROM cityzip_pairs WHERE cityzip_pairs_city = '" + cityzip_pairs_city + "' AND cityzip_pairs_zipcore = '" + cityzip_pairs_zipcore + "' LIMIT 1)"
+    return KeyReference('cityzip_pairs', (cityzip_pairs_city, cityzip_pairs_zipcore),
+        "(SELECT cityzip_pairs_id FROM cityzip_pairs WHERE cityzip_pairs_city = '" + cityzip_pairs_city + "' AND cityzip_pairs_zipcore = '" + cityzip_pairs_zipcore + "' LIMIT 1)")
 
-def generate_addresses(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `addresses` (`addresses_line_1`, `addresses_cityzip_pairs_fk`, `addresses_is_defunct`) VALUES ('" + x[0] + "', " + x[1] + ", " + x[2] + ");\n"
-    return stringResult
+def generate_addresses(t, **options):
+    return generate_table('addresses', t, **options)
 
 def get_addresses_id(addresses_line_1):
-    return "(SELECT addresses_id FROM addresses WHERE addresses_line_1 = '" + addresses_line_1 + "' LIMIT 1)"
+    return KeyReference('addresses', (addresses_line_1,),
+        "(SELECT addresses_id FROM addresses WHERE addresses_line_1 = '" + addresses_line_1 + "' LIMIT 1)")
 
-def generate_institutions(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `institutions` (`institutions_legal_name`, `institutions_operating_state_fk`, `institutions_alt_name`, `institutions_mailing_fk`, `institutions_web_url`, `institutions_has_undergraduate_programs`, `institutions_has_postgraduate_programs`, `institutions_is_defunct`) VALUES ('" + x[0] + "', " + x[1] + ", '" + x[2] + "', " + x[3] + ", '" + x[4] + "', " + x[5] + ", " + x[6] + ", " + x[7] + ");\n"
-    return stringResult
+def generate_institutions(t, **options):
+    return generate_table('institutions', t, **options)
 
 def get_institutions_id(institutions_alt_name):
-    return "(SELECT institutions_id FROM institutions WHERE institutions_alt_name = '" + institutions_alt_name + "' LIMIT 1)"
+    return KeyReference('institutions', (institutions_alt_name,),
+        "(SELECT institutions_id FROM institutions WHERE institutions_alt_name = '" + institutions_alt_name + "' LIMIT 1)")
 
-def generate_semesters(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO semesters (`semesters_name`, `semesters_start`, `semesters_finish`, `semesters_institutions_id_fk`) VALUES ('" + x[0] + "', '" + x[1] + "', '" + x[2] + "', " + x[3] + ");\n"
-    return stringResult
+def generate_semesters(t, **options):
+    return generate_table('semesters', t, **options)
 
 def get_semesters_id(semesters_name, semesters_institutions_id_fk):
-    return "(SELECT semesters_id FROM semesters WHERE semesters_name = '" + semesters_name + "' AND semesters_institutions_id_fk = " + semesters_institutions_id_fk + " LIMIT 1)"
+    return KeyReference('semesters', (semesters_name, semesters_institutions_id_fk),
+        "(SELECT semesters_id FROM semesters WHERE semesters_name = '" + semesters_name + "' AND semesters_institutions_id_fk = " + semesters_institutions_id_fk + " LIMIT 1)")
 
-def generate_persons(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO persons (`persons_legal_name`, `persons_nations_id_fk`, `persons_state-issued_id_states_id_fk`, `persons_personal_email`, `persons_mailing_address_fk`, `persons_is_defunct`) VALUES ('" + x[0] + "', " + x[1] + ", " + x[2] + ", '" + x[3] + "', " + x[4] + ", " + x[5] + ");\n"
-    return stringResult;
+def generate_persons(t, **options):
+    return generate_table('persons', t, **options)
 
 def get_persons_id(persons_legal_name):
-    return "(SELECT persons_id FROM persons WHERE persons_legal_name = '" + persons_legal_name + "' LIMIT 1)"
+    return KeyReference('persons', (persons_legal_name,),
+        "(SELECT persons_id FROM persons WHERE persons_legal_name = '" + persons_legal_name + "' LIMIT 1)")
 
-def generate_students(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO students (`students_persons_id_fk`, `students_institutions_id_fk`, `students_is_defunct`) VALUES (" + x[0] + ", " + x[1] + ", " + x[2] + ");\n"
-    return stringResult
+def generate_students(t, **options):
+    return generate_table('students', t, **options)
 
 def get_students_id(persons_legal_name, institutions_alt_name):
-    return "(SELECT students_id FROM students WHERE students_persons_id_fk = " + get_persons_id(persons_legal_name) + " AND students_institutions_id_fk = " + get_institutions_id(institutions_alt_name) + " LIMIT 1)"
+    persons_id = get_persons_id(persons_legal_name)
+    institutions_id = get_institutions_id(institutions_alt_name)
+    return KeyReference('students', (persons_id, institutions_id),
+        "(SELECT students_id FROM students WHERE students_persons_id_fk = " + persons_id + " AND students_institutions_id_fk = " + institutions_id + " LIMIT 1)")
 
-def generate_instructors(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO instructors (`instructors_persons_id_fk`, `instructors_institutions_id_fk`, `instructors_is_defunct`) VALUES (" + x[0] +", " + x[1] + ", " + x[2] + ");\n"
-    return stringResult
+def generate_instructors(t, **options):
+    return generate_table('instructors', t, **options)
 
 def get_instructors_id(persons_legal_name, institutions_alt_name):
-    return "(SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = " + get_persons_id(persons_legal_name) + " AND instructors_institutions_id_fk = " + get_institutions_id(institutions_alt_name) + " LIMIT 1)"
+    persons_id = get_persons_id(persons_legal_name)
+    institutions_id = get_institutions_id(institutions_alt_name)
+    return KeyReference('instructors', (persons_id, institutions_id),
+        "(SELECT instructors_id FROM instructors WHERE instructors_persons_id_fk = " + persons_id + " AND instructors_institutions_id_fk = " + institutions_id + " LIMIT 1)")
 
-def generate_employees(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO employees (`employees_persons_id_fk`, `employees_institutions_id_fk`, `employees_is_defunct`) VALUES (" + x[0] + ", " + x[1] + ", " + x[2] + ");\n"
-    return stringResult
+def generate_employees(t, **options):
+    return generate_table('employees', t, **options)
 
 def get_employees_id(persons_legal_name, institutions_alt_name):
-    return "(SELECT employees_id FROM employees WHERE employees_persons_id_fk = " + get_persons_id(persons_legal_name) + " AND employees_institutions_id_fk = " + get_institutions_id(institutions_alt_name) + " LIMIT 1)"
+    persons_id = get_persons_id(persons_legal_name)
+    institutions_id = get_institutions_id(institutions_alt_name)
+    return KeyReference('employees', (persons_id, institutions_id),
+        "(SELECT employees_id FROM employees WHERE employees_persons_id_fk = " + persons_id + " AND employees_institutions_id_fk = " + institutions_id + " LIMIT 1)")
 
-def generate_instructor_logins(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `instructor-logins` (`instructor-logins_instructors_id`, `instructor-logins_institutions_id_fk`, `instructor-logins_string`, `instructor-logins_is_defunct`) VALUES (" + x[0] + ", " + x[1] + ", '" + x[2] + "', " + x[3] + ");\n"
-    return stringResult
+def generate_instructor_logins(t, **options):
+    return generate_table('instructor-logins', t, **options)
 
-def generate_student_logins(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `student-logins` (`student-logins_students_id_fk`, `student-logins_institutions_id_fk`, `student-logins_string`, `student-logins_is_defunct`) VALUES (" + x[0] + ", " + x[1] + ", '" + x[2] + "', " + x[3] + ");\n"
-    return stringResult
+def generate_student_logins(t, **options):
+    return generate_table('student-logins', t, **options)
 
-def generate_employee_logins(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `employee-logins` (`employee-logins_employees_id_fk`, `employee-logins_institutions_id_fk`, `employee-logins_string`, `employee-logins_is_defunct`) VALUES (" + x[0] + ", " + x[1] + ", '" + x[2] + "', " + x[3] + ");\n"
-    return stringResult
+def generate_employee_logins(t, **options):
+    return generate_table('employee-logins', t, **options)
 
-def generate_departments(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO departments (`depts_title`, `depts_institutions_id_fk`, `depts_chairperson_instructors_fk`, `depts_is_defunct`) VALUES ('" + x[0] + "', " + x[1] + ", " + x[2] + ", " + x[3] + ");\n"
-    return stringResult
+def generate_departments(t, **options):
+    return generate_table('departments', t, **options)
 
 def get_departments_id(depts_title, institutions_alt_name):
-    return "(SELECT depts_id FROM departments WHERE depts_title = '" + depts_title + "' AND depts_institutions_id_fk = " + get_institutions_id(institutions_alt_name) + " LIMIT 1)"
+    institutions_id = get_institutions_id(institutions_alt_name)
+    return KeyReference('departments', (depts_title, institutions_id),
+        "(SELECT depts_id FROM departments WHERE depts_title = '" + depts_title + "' AND depts_institutions_id_fk = " + institutions_id + " LIMIT 1)")
 
-def generate_courses(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO courses (`courses_title`, `courses_credit_hours`, `courses_depts_id_fk`, `courses_number`, `courses_undergraduates_eligible`, `courses_postgraduates_eligible`, `courses_is_defunct`) VALUES ('" + x[0] + "', " + x[1] + ", " + x[2] + ", '" + x[3] + "', " + x[4] + ", " + x[5] + ", " + x[6] + ");\n"
-    return stringResult
+def generate_courses(t, **options):
+    return generate_table('courses', t, **options)
 
+# courses_number is a VARCHAR, so it is quoted -- compared with a number, MySQL could not use the index on it
 def get_courses_id(courses_dept_name, institutions_alt_name, courses_number):
-    return "(SELECT courses_id FROM courses WHERE courses_depts_id_fk = " + get_departments_id(courses_dept_name, institutions_alt_name) + " AND courses_number = " + courses_number + " LIMIT 1)"
+    depts_id = get_departments_id(courses_dept_name, institutions_alt_name)
+    return KeyReference('courses', (depts_id, courses_number),
+        "(SELECT courses_id FROM courses WHERE courses_depts_id_fk = " + depts_id + " AND courses_number = '" + courses_number + "' LIMIT 1)")
 
-def generate_courses_prerequisites(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `courses-prerequisites` (`courses_id_fk`, `courses_requires_courses_id_fk`) VALUES (" + x[0] + ", " + x[1] + ");\n"
-    return stringResult
+def generate_courses_prerequisites(t, **options):
+    return generate_table('courses-prerequisites', t, **options)
 
-def generate_tracks(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO tracks (`tracks_title`, `tracks_institutions_id_fk`, `tracks_is_undergraduate_program`, `tracks_is_postgraduate_program`, `tracks_is_defunct`) VALUES ('" + x[0] +"', " + x[1] + ", " + x[2] + ", " + x[3] + ", " + x[4] + ");\n"
-    return stringResult
+def generate_tracks(t, **options):
+    return generate_table('tracks', t, **options)
 
 def get_tracks_id(tracks_title, institutions_alt_name):
-    return "(SELECT tracks_id FROM tracks WHERE tracks_title = '" + tracks_title + "' AND tracks_institutions_id_fk = " + get_institutions_id(institutions_alt_name) + " LIMIT 1)"
+    institutions_id = get_institutions_id(institutions_alt_name)
+    return KeyReference('tracks', (tracks_title, institutions_id),
+        "(SELECT tracks_id FROM tracks WHERE tracks_title = '" + tracks_title + "' AND tracks_institutions_id_fk = " + institutions_id + " LIMIT 1)")
 
-def generate_tracks_prerequisites(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `tracks-prerequisites` (`tracks-prerequisites_tracks_id_fk`, `tracks-prerequisites_requires_courses_id_fk`) VALUES (" + x[0] + ", " + x[1] + ");\n"
-    return stringResult
+def generate_tracks_prerequisites(t, **options):
+    return generate_table('tracks-prerequisites', t, **options)
 
-def generate_course_equivalencies(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `courses-equivalencies` (`courses-equivalencies_a`, `courses-equivalencies_b`) VALUES (" + x[0] + ", " + x[1] + ");\n"
-    return stringResult
+def generate_course_equivalencies(t, **options):
+    return generate_table('courses-equivalencies', t, **options)
 
-def generate_locations(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO locations (`locations_title`, `locations_is_defunct`) VALUES ('" + x[0] + "', " + x[1] + ");\n"
-    return stringResult
+def generate_locations(t, **options):
+    return generate_table('locations', t, **options)
 
 def get_locations_id(locations_title):
-    return "(SELECT locations_id FROM locations WHERE locations_title = '" + locations_title + "' LIMIT 1)"
+    return KeyReference('locations', (locations_title,),
+        "(SELECT locations_id FROM locations WHERE locations_title = '" + locations_title + "' LIMIT 1)")
 
-def generate_schedules(t):
-    stringResult = ""
-    for x in t: # note here the boolean is used for whether the meetings are virtual, not the typical is_defunct flag (which is not available on this table)
-        stringResult += "INSERT INTO schedules (`schedules_start_24hr`, `schedules_end_24hr`, `schedules_dow`, `schedules_start`, `schedules_finish`, `schedules_meetings_are_virtual`, `schedules_semesters_id_fk`) VALUES ('" + x[0] + "', '" + x[1] + "', '" + x[2] + "', '" + x[3] + "', '" + x[4] + "', " + x[5] + ", " + x[6] + ");\n"
-    return stringResult
+def generate_schedules(t, **options):
+    return generate_table('schedules', t, **options)
 
 def get_schedules_id(schedules_start_24hr, schedules_end_24hr):
-    return "(SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '" + schedules_start_24hr + "' AND schedules_end_24hr = '" + schedules_end_24hr + "' LIMIT 1)"
+    return KeyReference('schedules', (schedules_start_24hr, schedules_end_24hr),
+        "(SELECT schedules_id FROM schedules WHERE schedules_start_24hr = '" + schedules_start_24hr + "' AND schedules_end_24hr = '" + schedules_end_24hr + "' LIMIT 1)")
 
-def generate_tasks(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO tasks (`tasks_title`, `tasks_max_points_towards_gpa`, `tasks_points_count_towards_gpa`) VALUES ('" + x[0] + "', " + x[1] + ", " + x[2] + ");\n"
-    return stringResult
+def generate_tasks(t, **options):
+    return generate_table('tasks', t, **options)
 
 def get_tasks_id(tasks_title):
-    return "(SELECT tasks_id FROM tasks WHERE tasks_title = '" + tasks_title + "' LIMIT 1)"
+    return KeyReference('tasks', (tasks_title,),
+        "(SELECT tasks_id FROM tasks WHERE tasks_title = '" + tasks_title + "' LIMIT 1)")
 
-def generate_courses_tasks(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO `courses-tasks` (`courses-tasks_tasks_id_fk`, `courses-tasks_courses_id_fk`, `courses-tasks_points_coefficient`) VALUES (" + x[0] + ", " + x[1] + ", " + x[2] + ");\n"
-    return stringResult
+def generate_tasks_attachments(t, **options):
+    return generate_table('tasks-attachments', t, **options)
 
-def generate_enrollments(t):
-    stringResult = ""
-    for x in t: # the tuple will be out of order from the demo, sorry!
-        stringResult += "INSERT INTO enrollments (`enrollments_schedules_id_fk`, `enrollments_instructors_id_fk`, `enrollments_students_id_fk`, `enrollments_courses_id_fk`, `enrollments_is_auditing`) VALUES (" + x[2] + ", " + x[1] + ", " + x[0] + ", " + x[3] + ", " + x[4] + ");\n" 
-    return stringResult
+def generate_courses_tasks(t, **options):
+    return generate_table('courses-tasks', t, **options)
 
-def get_enrollments_id(persons_legal_name, institutions_alt_name, schedules_start_24hr, schedules_end_24hr):
-    return "(SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = " + get_schedules_id(schedules_start_24hr, schedules_end_24hr) + " AND enrollments_students_id_fk = " + get_students_id(persons_legal_name, institutions_alt_name) + " LIMIT 1)"
+def generate_enrollments(t, **options):
+    return generate_table('enrollments', t, **options)
 
-def generate_grades(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO grades (`grades_enrollments_id_fk`, `grades_points_towards_gpa`, `grades_tasks_id_fk`, `grades_date_created`, `grades_date_last_updated`) VALUES (" + x[0] + ", " + x[1] + ", " + x[2] + ", '" + x[3] + "', '" + x[4] + "');\n"
-    return stringResult
-
-# this has a primary key because financial tables will foreign key link to this later, this is the bridge between money flowing in/out AND what students/instructors are doing, AND when they are doing it
-def generate_services(t):
-    stringResult = ""
-    for x in t:
-        stringResult += "INSERT INTO services (`services_instructors_id_fk`, `services_students_id_fk`, `services_schedules_id_fk`, `services_semesters_id_fk`) VALUES (" + x[0] + ", " + x[1] + ", " + x[2] + ", " + x[3] +");\n"
-    return stringResult
+def get_enrollments_id(persons_legal_name, institutions_alt_name, schedules_start_24hr, schedules_end_24hr):
+    schedules_id = get_schedules_id(schedules_start_24hr, schedules_end_24hr)
+    students_id = get_students_id(persons_legal_name, institutions_alt_name)
+    return KeyReference('enrollments', (schedules_id, students_id),
+        "(SELECT enrollments_id FROM enrollments WHERE enrollments_schedules_id_fk = " + schedules_id + " AND enrollments_students_id_fk = " + students_id + " LIMIT 1)")
+
+def generate_grades(t, **options):
+    return generate_table('grades', t, **options)
+
+def get_grades_id(persons_legal_name, institutions_alt_name, schedules_start_24hr, schedules_end_24hr, tasks_title):
+    enrollments_id = get_enrollments_id(persons_legal_name, institutions_alt_name, schedules_start_24hr,
+                                        schedules_end_24hr)
+    tasks_id = get_tasks_id(tasks_title)
+    return KeyReference('grades', (enrollments_id, tasks_id),
+        "(SELECT grades_id FROM grades WHERE grades_enrollments_id_fk = " + enrollments_id + " AND grades_tasks_id_fk = " + tasks_id + " LIMIT 1)")
+
+def generate_grades_attachments(t, **options):
+    return generate_table('grades-attachments', t, **options)
+
+def generate_services(t, **options):
+    return generate_table('services', t, **options)
@@ -128,6 +128,9 @@ tasks_template = [
     ('HRM 201 QUIZ 1', '100', 'true'),
     ('COMPSCI 101 QUIZ 1', '100', 'true')
 ]
+tasks_attachments_template = [
+    (get_tasks_id('COMPSCI 101 QUIZ 1'), 'Variables, types and your first class.')
+]
 courses_tasks_template = [
     (get_tasks_id('HRM 101 QUIZ 1'), get_courses_id('HRM', 'BU', '101'), '1.0'),
     (get_tasks_id('HRM 201 QUIZ 1'), get_courses_id('HRM', 'BU', '101'), '1.0'),
@@ -166,4 +169,39 @@ grades_template = [
     (get_enrollments_id('Luis Rico', 'BU', '1000', '1150'), '100.00', get_tasks_id('COMPSCI 101 QUIZ 1'), '2021-09-05 10:00:00', '2021-09-08 21:09:38'),
     (get_enrollments_id('Selina Sikorsky', 'BU', '1000', '1150'), '100.00', get_tasks_id('COMPSCI 101 QUIZ 1'), '2021-09-05 10:00:00', '2021-09-08 21:09:35')
 ]
+grades_attachments_template = [
+    (get_grades_id('James Capozzoli', 'BU', '1000', '1150', 'COMPSCI 101 QUIZ 1'), 'Great work!', 'Thanks!')
+]
 services_template = []
+
+# every template above, keyed by the table it fills (see `tables` in filler_generation_code.py for the load order)
+templates = {
+    'nations': nations_template,
+    'states': states_template,
+    'cityzip_pairs': cityzip_pairs_template,
+    'addresses': addresses_template,
+    'institutions': institutions_template,
+    'semesters': semesters_template,
+    'persons': persons_template,
+    'students': students_template,
+    'instructors': instructors_template,
+    'employees': employees_template,
+    'instructor-logins': instructor_logins_template,
+    'student-logins': student_logins_template,
+    'employee-logins': employee_logins_template,
+    'departments': departments_template,
+    'courses': courses_template,
+    'courses-prerequisites': courses_prerequisites_template,
+    'tracks': tracks_template,
+    'tracks-prerequisites': tracks_prerequisites_template,
+    'courses-equivalencies': course_equivalencies_template,
+    'locations': locations_template,
+    'schedules': schedules_template,
+    'tasks': tasks_template,
+    'tasks-attachments': tasks_attachments_template,
+    'courses-tasks': courses_tasks_template,
+    'enrollments': enrollments_template,
+    'grades': grades_template,
+    'grades-attachments': grades_attachments_template,
+    'services': services_template,
+}
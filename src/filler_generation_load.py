@@ -0,0 +1,246 @@
+# direct loading over DB-API
+#
+# instead of printing SQL for the mysql client, load_tables inserts the rows of the templates straight into a database
+# through any DB-API 2.0 driver: PyMySQL for MySQL (see database.py), or sqlite3 as a stand-in for tests.  every value
+# is passed as a query parameter, so nothing gets quoted or escaped into the SQL text (a name like O'Brien needs no
+# care at all), and every batch of rows is one executemany call of the same INSERT statement, which PyMySQL sends as a
+# single multi-row INSERT.
+#
+# the rows are resolved with a KeyRegistry, like for the tsv output, so the target has to be an empty schema (which is
+# what core.sql creates).  the tables are loaded over a small pool of connections: a table starts once every table it
+# looks up keys in is loaded (the foreign keys need their rows committed), along with the tables its triggers read
+# (see TRIGGER_DEPENDENCIES), is inserted on one connection, and is committed on its own, so the tables which do not
+# depend on each other load at the same time.  load_tables returns the rows, seconds and rows per second of every
+# table.
+#
+# from the source directory, to install core.sql and load the demo data, or a scale tier:
+# $ python3 filler_generation_load.py --install
+# $ python3 filler_generation_load.py --install --scale 100k --jobs 4
+#
+# or into a new SQLite file, with plain tables made from the `tables` spec (no constraints, triggers or views):
+# $ python3 filler_generation_load.py --sqlite /tmp/schooldb.sqlite --scale 1k
+
+import argparse
+import concurrent.futures
+import os
+import queue
+import sqlite3
+import sys
+import time
+
+from filler_generation_code import (tables, dependency_order, ancestors, KeyRegistry, resolve_row, TEXT, NUMBER,
+                                    BOOLEAN, KEY, BLOB)
+from filler_generation_data import templates
+from filler_generation_scale import scale_tiers, scale_config, scale_templates, DEFAULT_SEED
+
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_JOBS = 4
+
+# the tables which the triggers of core.sql read on top of the parents of their table: each table here waits for the
+# ones listed, since a trigger on another connection only sees committed rows.  the closure triggers of the
+# prerequisites read the equivalents and each other's closures, and the gpa triggers of the grades read the
+# coefficients of `courses-tasks` (whose own triggers only rescale the grades already loaded).
+TRIGGER_DEPENDENCIES = {
+    'courses-prerequisites': ['courses-equivalencies'],
+    'tracks-prerequisites': ['courses-prerequisites', 'courses-equivalencies'],
+    'grades': ['courses-tasks'],
+}
+
+# the placeholder of each DB-API paramstyle which takes positional parameters
+placeholders = {'qmark': '?', 'format': '%s', 'pyformat': '%s'}
+
+
+def parameter_value(kind, value):
+    if value is not None and kind == BOOLEAN:
+        return 1 if value in (True, 'true', 'TRUE', '1', 1) else 0
+    return value
+
+
+def parameterized_insert(table, columns, paramstyle):
+    return ("INSERT INTO `" + table + "` (" + ", ".join("`" + name + "`" for name, kind in columns) + ") VALUES ("
+            + ", ".join([placeholders[paramstyle]] * len(columns)) + ")")
+
+
+# yields (statement, rows) batches of up to batch_size rows.  like in iterate_table, rows only share a batch when
+# they fill the same columns.
+def iterate_batches(table, t, registry, paramstyle, batch_size=DEFAULT_BATCH_SIZE):
+    batch_columns = None
+    batch = []
+    for x in t:
+        columns, values = resolve_row(table, x, registry)
+        if batch and (columns != batch_columns or len(batch) >= batch_size):
+            yield parameterized_insert(table, batch_columns, paramstyle), batch
+            batch = []
+        batch_columns = columns
+        batch.append(tuple(parameter_value(kind, value) for (name, kind), value in zip(columns, values)))
+    if batch:
+        yield parameterized_insert(table, batch_columns, paramstyle), batch
+
+
+# `connect` opens one DB-API connection.  all the connections are opened up front, from the calling thread, so that
+# a password prompt (see database.connect) happens once; sqlite3 connections have to be opened with
+# check_same_thread=False, since they are handed from one worker thread to the next.
+class ConnectionPool:
+    def __init__(self, connect, size):
+        self.connections = [connect() for _ in range(size)]
+        self.idle = queue.Queue()
+        for connection in self.connections:
+            self.idle.put(connection)
+
+    def acquire(self):
+        return self.idle.get()
+
+    def release(self, connection):
+        self.idle.put(connection)
+
+    def close(self):
+        for connection in self.connections:
+            connection.close()
+
+
+# the tables which have to be loaded before the table: its ancestors, and the tables its triggers read along with
+# what those have to wait for
+def load_after(table):
+    result = ancestors(table)
+    for t in TRIGGER_DEPENDENCIES.get(table, []):
+        result |= {t} | load_after(t)
+    return result
+
+
+# one table, in one transaction on one connection of the pool
+def load_table(pool, table, t, registry, paramstyle, batch_size):
+    connection = pool.acquire()
+    try:
+        started = time.perf_counter()
+        rows = 0
+        if hasattr(connection, 'begin'):
+            connection.begin()
+        try:
+            cursor = connection.cursor()
+            for statement, batch in iterate_batches(table, t, registry, paramstyle, batch_size):
+                cursor.executemany(statement, batch)
+                rows += len(batch)
+            cursor.close()
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        seconds = time.perf_counter() - started
+    finally:
+        pool.release(connection)
+    return {'rows': rows, 'seconds': round(seconds, 3), 'rows_per_second': round(rows / seconds) if seconds else None}
+
+
+# loads the tables of `source` (the hand-written templates, or scale_templates(config)) into an empty schema, with
+# `jobs` connections, and returns {table: {'rows': ..., 'seconds': ..., 'rows_per_second': ...}} in load order.  a
+# failing table stops the tables which have not started yet, and its error is raised once the others are done.
+def load_tables(connect, source, paramstyle, jobs=DEFAULT_JOBS, batch_size=DEFAULT_BATCH_SIZE, natural_keys=True):
+    registry = KeyRegistry(natural_keys=natural_keys)
+    order = [table for table in dependency_order() if table in source]
+    waiting = list(order)
+    finished = set()
+    results = {}
+    running = {}
+    pool = ConnectionPool(connect, jobs)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+            while waiting or running:
+                for table in list(waiting):
+                    if any(t in source and t not in finished for t in load_after(table)):
+                        continue
+                    future = executor.submit(load_table, pool, table, source[table], registry, paramstyle, batch_size)
+                    running[future] = table
+                    waiting.remove(table)
+                done, not_done = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    table = running.pop(future)
+                    if future.exception() is not None:
+                        waiting = []
+                        concurrent.futures.wait(running)
+                        raise future.exception()
+                    results[table] = future.result()
+                    finished.add(table)
+    finally:
+        pool.close()
+    return {table: results[table] for table in order}
+
+
+# the SQLite stand-in: one plain table per entry of `tables`, with the same names and columns
+sqlite_types = {TEXT: 'TEXT', NUMBER: 'NUMERIC', BOOLEAN: 'INTEGER', KEY: 'INTEGER', BLOB: 'BLOB'}
+
+
+def create_sqlite_tables(connection):
+    for table in dependency_order():
+        spec = tables[table]
+        columns = ["`" + name + "` " + sqlite_types[kind] for name, kind in spec['columns']]
+        if spec['id'] is not None:
+            columns.insert(0, "`" + spec['id'] + "` INTEGER PRIMARY KEY")
+        connection.execute("CREATE TABLE `" + table + "` (" + ", ".join(columns) + ")")
+    connection.commit()
+
+
+def print_results(results, stream):
+    width = max(len(table) for table in results)
+    for table, result in results.items():
+        print(table.ljust(width), str(result['rows']).rjust(10), 'rows', str(result['seconds']).rjust(9), 's',
+              str(result['rows_per_second']).rjust(10), 'rows/s', file=stream)
+    rows = sum(result['rows'] for result in results.values())
+    print('total'.ljust(width), str(rows).rjust(10), 'rows', file=stream)
+
+
+def main():
+    # the connection arguments are only needed for MySQL, and PyMySQL only then
+    from database import add_connection_arguments, connect, install_schema
+
+    parser = argparse.ArgumentParser(description='load the schooldb filler data over DB-API')
+    parser.add_argument('--scale', metavar='TIER', choices=sorted(scale_tiers),
+                        help='load synthetic data of the given tier: ' + ', '.join(scale_tiers))
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the synthetic data (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help='rows per executemany call (default: %(default)s)')
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, metavar='N',
+                        help='connections loading tables at the same time (default: %(default)s)')
+    parser.add_argument('--install', action='store_true',
+                        help='drop and recreate the schema from core.sql first')
+    parser.add_argument('--sqlite', metavar='FILE',
+                        help='load into a new SQLite file instead of MySQL (FILE must not exist yet)')
+    add_connection_arguments(parser)
+    args = parser.parse_args()
+    if args.batch_size < 1:
+        parser.error('--batch-size must be at least 1')
+    if args.jobs < 1:
+        parser.error('--jobs must be at least 1')
+    if args.sqlite is not None and os.path.exists(args.sqlite):
+        parser.error('--sqlite ' + args.sqlite + ' already exists, remove it or pick a new file')
+
+    source = templates
+    if args.scale is not None:
+        source = scale_templates(scale_config(args.scale, args.seed))
+
+    if args.sqlite is not None:
+        with sqlite3.connect(args.sqlite) as connection:
+            create_sqlite_tables(connection)
+        connection.close()
+        connect_once = lambda: sqlite3.connect(args.sqlite, timeout=600, check_same_thread=False)
+        paramstyle = sqlite3.paramstyle
+    else:
+        if args.install:
+            connection = connect(args, database=None)
+            try:
+                install_schema(connection)
+            finally:
+                connection.close()
+        connect_once = lambda: connect(args)
+        paramstyle = 'format'
+
+    try:
+        results = load_tables(connect_once, source, paramstyle, args.jobs, args.batch_size, args.scale is None)
+    except Exception as e:
+        print('loading failed:', e, file=sys.stderr)
+        sys.exit(1)
+    print_results(results, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# parallel, dependency-aware generation
+#
+# write_parallel splits the generation into shards -- one per table, or for the synthetic data, one per slice of a
+# table (see `slices` in filler_generation_scale.py) -- and generates them in a pool of worker processes.  every shard
+# is written to its own file in a scratch directory, and once they are all done the shards are stitched back together
+# in dependency order, so the output holds the same rows in the same order as the serial output (only multi-row
+# INSERT statements may be split differently, at the slice boundaries).
+#
+# a shard only has to wait for other tables when its rows look up natural keys, which is the case for the
+# hand-written templates in resolved-key mode: it then starts once every ancestor of its table in the foreign key
+# graph is finished, and gets their keys handed over from the parent process.  in every other case no shard depends
+# on another one, and all of them are queued at once.
+
+import concurrent.futures
+import os
+import shutil
+import sys
+import tempfile
+
+from filler_generation_code import (dependency_order, ancestors, iterate_table, KeyRegistry, SQL_HEADER, SQL_FOOTER,
+                                    DEFAULT_MAX_STATEMENT_BYTES)
+from filler_generation_bulk import write_tsv, write_load_script, tsv_file_name, TSV_BUFFER_BYTES
+import filler_generation_data
+import filler_generation_scale
+
+
+# (table, units, first_id) for every shard, in dependency order.  `config` is None for the hand-written templates,
+# which are never split.  like write_tables, this leaves out the tables without a template.
+def plan_shards(config, jobs):
+    source = filler_generation_data.templates
+    table_slices = {}
+    if config is not None:
+        source = filler_generation_scale.generators
+        table_slices = filler_generation_scale.slices(config)
+    shards = []
+    for table in dependency_order():
+        if table not in source:
+            continue
+        if table not in table_slices:
+            shards.append((table, None, None))
+            continue
+        count, rows_per_unit = table_slices[table]
+        size = max(1, -(-count // jobs))
+        for start in range(0, count, size):
+            first_id = None
+            if rows_per_unit is not None:
+                first_id = start * rows_per_unit + 1
+            shards.append((table, range(start, min(count, start + size)), first_id))
+    return shards
+
+
+def shard_template(config, table, units):
+    if config is None:
+        return filler_generation_data.templates[table]
+    if units is None:
+        return filler_generation_scale.generators[table](config)
+    return filler_generation_scale.generators[table](config, units)
+
+
+# runs in a worker process, and returns the natural keys registered by the shard (for the tables waiting on it)
+def generate_shard(path, output_format, config, table, units, first_id, resolved, known_keys, batch_size,
+                   max_statement_bytes):
+    registry = None
+    if resolved:
+        registry = KeyRegistry(natural_keys=config is None)
+        registry.keys.update(known_keys)
+        if first_id is not None:
+            registry.start(table, first_id)
+    t = shard_template(config, table, units)
+    with open(path, 'w', encoding='utf-8', newline='\n', buffering=TSV_BUFFER_BYTES) as stream:
+        if output_format == 'tsv':
+            write_tsv(stream, table, t, registry)
+        else:
+            for statement in iterate_table(table, t, registry, batch_size, max_statement_bytes):
+                stream.write(statement)
+    if registry is None:
+        return {}
+    return registry.keys.get(table, {})
+
+
+def shard_path(scratch, index):
+    return os.path.join(scratch, str(index))
+
+
+def run_shards(scratch, shards, jobs, output_format, config, resolved, batch_size, max_statement_bytes):
+    natural_keys = resolved and config is None
+    keys = {}
+    unfinished = {}
+    for table, units, first_id in shards:
+        unfinished[table] = unfinished.get(table, 0) + 1
+    waiting = list(enumerate(shards))
+    running = {}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        while waiting or running:
+            for index, (table, units, first_id) in list(waiting):
+                known_keys = {}
+                if natural_keys:
+                    if any(unfinished[t] for t in ancestors(table)):
+                        continue
+                    known_keys = {t: keys[t] for t in ancestors(table) if t in keys}
+                future = pool.submit(generate_shard, shard_path(scratch, index), output_format, config, table, units,
+                                     first_id, resolved, known_keys, batch_size, max_statement_bytes)
+                running[future] = table
+                waiting.remove((index, (table, units, first_id)))
+            done, not_done = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                table = running.pop(future)
+                keys.setdefault(table, {}).update(future.result())
+                unfinished[table] -= 1
+
+
+# `output` is a file (None for standard output) for the sql format, and a directory for the tsv format
+def write_parallel(output, output_format, config, jobs, resolved=False, batch_size=1,
+                   max_statement_bytes=DEFAULT_MAX_STATEMENT_BYTES):
+    shards = plan_shards(config, jobs)
+    scratch = tempfile.mkdtemp(prefix='schooldb-shards-')
+    try:
+        run_shards(scratch, shards, jobs, output_format, config, resolved or output_format == 'tsv', batch_size,
+                   max_statement_bytes)
+        if output_format == 'tsv':
+            os.makedirs(output, exist_ok=True)
+            for table in dependency_order():
+                with open(os.path.join(output, tsv_file_name(table)), 'wb') as stream:
+                    for index, shard in enumerate(shards):
+                        if shard[0] == table:
+                            with open(shard_path(scratch, index), 'rb') as part:
+                                shutil.copyfileobj(part, stream)
+            write_load_script(output)
+        elif output is None:
+            stitch_sql(sys.stdout, scratch, shards)
+        else:
+            with open(output, 'w', encoding='utf-8', buffering=TSV_BUFFER_BYTES) as stream:
+                stitch_sql(stream, scratch, shards)
+    finally:
+        shutil.rmtree(scratch)
+
+
+def stitch_sql(stream, scratch, shards):
+    stream.write(SQL_HEADER)
+    for table in dependency_order():
+        parts = [index for index, shard in enumerate(shards) if shard[0] == table]
+        if not parts:
+            continue
+        for index in parts:
+            with open(shard_path(scratch, index), encoding='utf-8') as part:
+                shutil.copyfileobj(part, stream)
+        stream.write("\n")
+    stream.write(SQL_FOOTER)
@@ -0,0 +1,260 @@
+# profiling the generation and the load of the filler data
+#
+# generation side: filler_generation.py --profile FILE writes the output as usual, but table by table it records the
+# wall time, the rows and bytes emitted and the peak of the memory allocated by python (with tracemalloc, which slows
+# the generation down, so only compare the wall times of profiled runs with each other).  every table comes from the
+# generate_* function of the same name (in filler_generation_scale.py for the synthetic data), so a slow table points
+# at its generator.  the report goes to FILE as JSON, and a summary table to standard error.
+# $ python3 filler_generation.py --scale 100k --resolved-keys --batch-size 1000 --output /dev/null --profile gen.json
+#
+# load side: run on its own, this installs core.sql, loads a dataset like benchmark_reports.py does (and with the same
+# warning: this drops the `schooldb` schema), and reads the per-table timings from MySQL's statement digests
+# (performance_schema.events_statements_summary_by_digest, which is reset first): the INSERT or LOAD DATA statements
+# of every table, their time (which includes the triggers they fire, and the nested SELECT lookups of the demo data),
+# their lock time and their affected rows.  the report is written as JSON too, with its summary table.
+# $ python3 filler_generation_profile.py --dataset 100k --output load.json
+#
+# both reports have sorted keys and can be compared between runs, which prints their summary tables side by side with
+# the change of every number:
+# $ python3 filler_generation_profile.py --compare old.json new.json
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+import tracemalloc
+
+from database import add_connection_arguments, connect, install_schema
+from benchmark_reports import load_dataset, DATASETS
+from filler_generation_code import dependency_order, iterate_table, SQL_HEADER, SQL_FOOTER
+from filler_generation_bulk import write_tsv, write_load_script, tsv_file_name, TSV_BUFFER_BYTES
+from filler_generation_scale import DEFAULT_SEED
+
+# the table of an INSERT or LOAD DATA statement, as the digest text spells it
+DIGEST_TABLE = re.compile(r'^(?:INSERT INTO|LOAD DATA .* INTO TABLE) `([^`]+)`')
+
+# the timers of performance_schema count picoseconds
+PICOSECONDS = 10 ** 12
+
+
+# counts the UTF-8 bytes written through it
+class CountingStream:
+    def __init__(self, stream):
+        self.stream = stream
+        self.bytes = 0
+
+    def write(self, text):
+        self.bytes += len(text.encode('utf-8'))
+        return self.stream.write(text)
+
+
+class TableProfiler:
+    def __init__(self):
+        self.tables = {}
+
+    def __enter__(self):
+        self.tracing = not tracemalloc.is_tracing()
+        if self.tracing:
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exception):
+        if self.tracing:
+            tracemalloc.stop()
+
+    # runs write(stream, t) for the table, with the stream and the rows of the template counted
+    def table(self, table, stream, t, write):
+        rows = 0
+
+        def counted():
+            nonlocal rows
+            for x in t:
+                rows += 1
+                yield x
+
+        counting = CountingStream(stream)
+        tracemalloc.reset_peak()
+        started = time.perf_counter()
+        write(counting, counted())
+        seconds = time.perf_counter() - started
+        self.tables[table] = {
+            'seconds': round(seconds, 3),
+            'rows': rows,
+            'bytes': counting.bytes,
+            'peak_memory_bytes': tracemalloc.get_traced_memory()[1],
+        }
+
+
+# write_tables of filler_generation_code.py, profiled; returns {table: {...}}
+def profile_tables(stream, templates, **options):
+    with TableProfiler() as profiler:
+        stream.write(SQL_HEADER)
+        for table in dependency_order():
+            if table in templates:
+                def write(counting, t):
+                    for statement in iterate_table(table, t, **options):
+                        counting.write(statement)
+                    counting.write("\n")
+                profiler.table(table, stream, templates[table], write)
+        stream.write(SQL_FOOTER)
+    return profiler.tables
+
+
+# write_bulk of filler_generation_bulk.py, profiled; returns {table: {...}}
+def profile_bulk(directory, templates, registry):
+    os.makedirs(directory, exist_ok=True)
+    with TableProfiler() as profiler:
+        for table in dependency_order():
+            with open(os.path.join(directory, tsv_file_name(table)), 'w', encoding='utf-8', newline='\n',
+                      buffering=TSV_BUFFER_BYTES) as stream:
+                profiler.table(table, stream, templates.get(table, []),
+                               lambda counting, t: write_tsv(counting, table, t, registry))
+        write_load_script(directory)
+    return profiler.tables
+
+
+def reset_statement_digests(cursor):
+    cursor.execute('TRUNCATE TABLE performance_schema.events_statements_summary_by_digest')
+
+
+# {table: {...}} from the statement digests of the schema, summed over the INSERT and LOAD DATA statements of every
+# table.  the statement text of a digest is truncated, but never before the table name.
+def statement_digests(cursor, schema='schooldb'):
+    cursor.execute('SELECT digest_text, count_star, sum_timer_wait, sum_lock_time, sum_rows_affected, sum_errors '
+                   'FROM performance_schema.events_statements_summary_by_digest WHERE schema_name = %s',
+                   (schema,))
+    tables = {}
+    for digest_text, statements, timer_wait, lock_time, rows, errors in cursor.fetchall():
+        match = DIGEST_TABLE.match(digest_text or '')
+        if match is None:
+            continue
+        profile = tables.setdefault(match.group(1), {'statements': 0, 'seconds': 0, 'lock_seconds': 0, 'rows': 0,
+                                                     'errors': 0})
+        profile['statements'] += int(statements)
+        profile['seconds'] += int(timer_wait)
+        profile['lock_seconds'] += int(lock_time)
+        profile['rows'] += int(rows)
+        profile['errors'] += int(errors)
+    for profile in tables.values():
+        profile['seconds'] = round(profile['seconds'] / PICOSECONDS, 3)
+        profile['lock_seconds'] = round(profile['lock_seconds'] / PICOSECONDS, 3)
+    return {table: tables[table] for table in dependency_order() if table in tables}
+
+
+# the totals of the numbers of every table: peaks are the largest, the rest are summed
+def totals(tables):
+    total = {}
+    for profile in tables.values():
+        for name, value in profile.items():
+            if name.startswith('peak_'):
+                total[name] = max(total.get(name, 0), value)
+            else:
+                total[name] = round(total.get(name, 0) + value, 3)
+    return total
+
+
+def write_report(report, path):
+    with open(path, 'w', encoding='utf-8') as output:
+        json.dump(report, output, indent=2, sort_keys=True)
+        output.write('\n')
+
+
+def change(old, new):
+    if old == new:
+        return ''
+    if old is None:
+        return '(new)'
+    if not old:
+        return '(was 0)'
+    return '({:+.0%})'.format((new - old) / old)
+
+
+# a summary table of the `tables` of a report, with the change from the `baseline` report next to every number
+def print_summary(report, stream, baseline=None):
+    # the JSON files hold the tables sorted by name, they are printed in load order
+    order = dependency_order()
+    tables = {table: report['tables'][table]
+              for table in sorted(report['tables'], key=lambda table: (table not in order, order.index(table)
+                                                                        if table in order else 0, table))}
+    tables['total'] = totals(report['tables'])
+    old_tables = {}
+    if baseline is not None:
+        old_tables = dict(baseline['tables'])
+        old_tables['total'] = totals(baseline['tables'])
+    columns = []
+    for profile in tables.values():
+        columns += [name for name in profile if name not in columns]
+    rows = [['table'] + columns]
+    for table, profile in tables.items():
+        row = [table]
+        for name in columns:
+            value = profile.get(name)
+            cell = '' if value is None else str(value)
+            if baseline is not None and value is not None:
+                cell = (cell + ' ' + change(old_tables.get(table, {}).get(name), value)).rstrip()
+            row.append(cell)
+        rows.append(row)
+    widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+    for row in rows:
+        print(row[0].ljust(widths[0]), *(cell.rjust(width) for cell, width in zip(row[1:], widths[1:])),
+              file=stream)
+
+
+def profile_load(args):
+    connection = connect(args, database=None, local_infile=args.bulk)
+    try:
+        install_schema(connection)
+        with connection.cursor() as cursor:
+            reset_statement_digests(cursor)
+        load_seconds = load_dataset(connection, args.dataset, args.seed, args.batch_size, args.bulk)
+        with connection.cursor() as cursor:
+            tables = statement_digests(cursor)
+    finally:
+        connection.close()
+    return {'kind': 'load', 'dataset': args.dataset, 'seed': args.seed, 'batch_size': args.batch_size,
+            'bulk': args.bulk, 'load_seconds': round(load_seconds, 3), 'tables': tables}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='profile the load of the filler data per table, or compare two '
+                                                 'profiles')
+    parser.add_argument('--dataset', choices=DATASETS, default='1k',
+                        help='dataset to load: ' + ', '.join(DATASETS) + ' (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED,
+                        help='seed of the synthetic data (default: %(default)s)')
+    parser.add_argument('--batch-size', type=int, default=1000,
+                        help='rows per INSERT statement for the synthetic data (default: %(default)s)')
+    parser.add_argument('--bulk', action='store_true',
+                        help='load the data with LOAD DATA LOCAL INFILE')
+    parser.add_argument('--output', metavar='FILE',
+                        help='write the JSON report to FILE instead of standard output')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'REPORT'),
+                        help='print the summary of the REPORT file next to the BASELINE file, and load nothing')
+    add_connection_arguments(parser)
+    args = parser.parse_args()
+
+    if args.compare is not None:
+        reports = []
+        for path in args.compare:
+            with open(path, encoding='utf-8') as report:
+                reports.append(json.load(report))
+        if reports[0].get('kind') != reports[1].get('kind'):
+            print('cannot compare a', reports[0].get('kind'), 'profile with a', reports[1].get('kind'), 'profile',
+                  file=sys.stderr)
+            sys.exit(1)
+        print_summary(reports[1], sys.stdout, reports[0])
+        return
+
+    report = profile_load(args)
+    if args.output is None:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        sys.stdout.write('\n')
+    else:
+        write_report(report, args.output)
+    print_summary(report, sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,564 @@
+# synthetic scale data for schooldb
+#
+# the hand-written templates in filler_generation_data.py are far too small to judge the performance of anything in
+# core.sql, so this module produces templates of any size, in the same tuple shapes, from a handful of knobs.
+#
+# every foreign key is written as a literal integer.  the surrogate keys are not looked up, they are computed: each
+# table numbers its rows 1, 2, 3, ... in the order they are generated (which is the order AUTO_INCREMENT, or the
+# generator in resolved-key mode, will hand them out), and the layout below is arranged so that the key of any row can
+# be calculated from the knobs alone.  that way every table can be generated on its own, by a generator, without
+# holding the rows of any other table in memory.
+#
+# all randomness comes from random.Random instances seeded from the seed knob plus the table and entity at hand, so
+# the same knobs always produce the same data.
+#
+# the data is skewed on purpose: a few courses of each institution are far more popular than the rest, a few
+# instructors teach most of the sections, and every course has its own difficulty.
+
+import itertools
+import random
+
+# the named scale tiers, each roughly producing the number of grades in its name
+scale_tiers = {
+    '1k': {
+        'institutions': 1,
+        'students_per_institution': 50,
+        'instructors_per_institution': 8,
+        'departments_per_institution': 4,
+        'courses_per_department': 6,
+        'semesters_per_institution': 2,
+        'schedules_per_semester': 24,
+        'enrollments_per_student': 4,
+        'grades_per_enrollment': 5,
+    },
+    '100k': {
+        'institutions': 2,
+        'students_per_institution': 1250,
+        'instructors_per_institution': 60,
+        'departments_per_institution': 8,
+        'courses_per_department': 12,
+        'semesters_per_institution': 4,
+        'schedules_per_semester': 96,
+        'enrollments_per_student': 8,
+        'grades_per_enrollment': 5,
+    },
+    '10m': {
+        'institutions': 10,
+        'students_per_institution': 25000,
+        'instructors_per_institution': 800,
+        'departments_per_institution': 20,
+        'courses_per_department': 25,
+        'semesters_per_institution': 8,
+        'schedules_per_semester': 500,
+        'enrollments_per_student': 8,
+        'grades_per_enrollment': 5,
+    },
+}
+
+DEFAULT_SEED = 2021
+
+nations = [('United States', 'US'), ('Mexico', 'MX'), ('Canada', 'CA'), ('United Kingdom', 'UK'), ('Japan', 'JP'),
+           ('Peru', 'PE')]
+# every state belongs to the first nation
+states = [('Pennsylvania', 'PA'), ('New Jersey', 'NJ'), ('Florida', 'FL'), ('New York', 'NY'), ('Texas', 'TX')]
+first_names = ['James', 'Mike', 'Cindy', 'Adam', 'Casey', 'Margret', 'Cassidy', 'Yennifer', 'Luis', 'Selina', 'Diana',
+               'Amy', 'Jordan', 'Priya', 'Kenji', 'Olga', 'Tomas', 'Grace', 'Omar', 'Hana']
+last_names = ['Capozzoli', 'Mol', 'Carma', 'Appletosh', 'Bro', 'Clever', 'Yaboozle', 'Rico', 'Sikorsky', 'Deerbourne',
+              'Ante', 'Nakamura', 'Novak', 'Okafor', 'Silva', 'Brennan', 'Haddad', 'Lindqvist', 'Moreau', 'Patel']
+department_titles = ['HRM', 'COMPSCI', 'CHEM', 'MATH', 'PHYS', 'BIO', 'HIST', 'ENGL', 'ECON', 'PSYCH', 'ART', 'MUSIC',
+                     'PHIL', 'SOC', 'GEOG', 'NURS', 'ACCT', 'MKTG', 'STAT', 'LING']
+credit_hours = ['3.0', '3.0', '3.0', '4.0', '1.0']
+max_points = ['100', '100', '50', '20', '10']
+# the weight of a task in the gpa of its course, mostly 1
+points_coefficients = ['1.0', '1.0', '1.0', '0.5', '1.5', '2.0']
+# (start, end, days) -- every slot is 150 or 165 minutes a week
+time_slots = [('0800', '0850', '-M-W-F-'), ('0900', '0950', '-M-W-F-'), ('1000', '1050', '-M-W-F-'),
+              ('1100', '1150', '-M-W-F-'), ('1300', '1350', '-M-W-F-'), ('1400', '1450', '-M-W-F-'),
+              ('0800', '0915', '--T-T--'), ('0930', '1045', '--T-T--'), ('1100', '1215', '--T-T--'),
+              ('1300', '1415', '--T-T--'), ('1430', '1545', '--T-T--'), ('1800', '2045', '---W---')]
+CITYZIP_PAIRS = 50
+# persons beyond this many share their mailing addresses
+ADDRESS_POOL = 10000
+AUDITING_RATE = 0.03
+# share of the grades with instructor comments
+COMMENTED_RATE = 0.1
+instructors_comments = ['Great work!', "See me after class, we'll go over it.", 'Late:\n-10%',
+                        'Check the rubric:\n\t1. format\n\t2. sources']
+
+
+def scale_config(tier='1k', seed=DEFAULT_SEED, **overrides):
+    config = dict(scale_tiers[tier])
+    for knob, value in overrides.items():
+        if knob not in config:
+            raise KeyError('unknown scale knob: ' + knob)
+        if value is not None:
+            config[knob] = value
+    config['seed'] = seed
+    check_config(config)
+    return config
+
+
+# the knobs have to leave room for a timetable without double bookings: every course has its own section each
+# semester, no student takes a course twice or two courses in the same time slot of a semester, and no instructor
+# teaches two sections in the same time slot.  the enrollments are picked one at a time (see student_enrollments), and
+# the second check is what guarantees each pick has a course left to take.
+def check_config(c):
+    courses = courses_per_institution(c)
+    if courses > c['schedules_per_semester']:
+        raise ValueError('every course needs its own schedule each semester, but there are ' + str(courses)
+                         + ' courses per institution (departments_per_institution * courses_per_department) and '
+                         + str(c['schedules_per_semester']) + ' schedules_per_semester')
+    per_semester = -(-c['enrollments_per_student'] // c['semesters_per_institution'])
+    per_slot = -(-courses // len(time_slots))
+    if c['enrollments_per_student'] + (per_semester - 1) * (per_slot - 1) > courses:
+        raise ValueError('enrollments_per_student (' + str(c['enrollments_per_student']) + ') is too many for '
+                         + str(courses) + ' courses in ' + str(len(time_slots)) + ' time slots over '
+                         + str(c['semesters_per_institution']) + ' semesters_per_institution')
+    if per_slot >= c['instructors_per_institution']:
+        raise ValueError('instructors_per_institution (' + str(c['instructors_per_institution'])
+                         + ') is too few to teach the ' + str(per_slot) + ' sections of a time slot and the '
+                         'tutoring sessions')
+
+
+def rng(config, *path):
+    return random.Random('-'.join(str(x) for x in (config['seed'],) + path))
+
+
+# the row counts and key layout derived from the knobs
+
+def employees_per_institution(c):
+    return max(1, c['instructors_per_institution'] // 4)
+
+def persons_per_institution(c):
+    return c['students_per_institution'] + c['instructors_per_institution'] + employees_per_institution(c)
+
+def courses_per_institution(c):
+    return c['departments_per_institution'] * c['courses_per_department']
+
+def locations_per_institution(c):
+    return max(1, -(-c['schedules_per_semester'] // len(time_slots)))
+
+def address_pool(c):
+    return min(ADDRESS_POOL, c['institutions'] * persons_per_institution(c))
+
+def semesters_id(c, i, s):
+    return i * c['semesters_per_institution'] + s + 1
+
+def students_persons_id(c, i, k):
+    return i * persons_per_institution(c) + k + 1
+
+def instructors_persons_id(c, i, k):
+    return i * persons_per_institution(c) + c['students_per_institution'] + k + 1
+
+def employees_persons_id(c, i, k):
+    return (i * persons_per_institution(c) + c['students_per_institution'] + c['instructors_per_institution']
+            + k + 1)
+
+def students_id(c, i, k):
+    return i * c['students_per_institution'] + k + 1
+
+def instructors_id(c, i, k):
+    return i * c['instructors_per_institution'] + k + 1
+
+def employees_id(c, i, k):
+    return i * employees_per_institution(c) + k + 1
+
+def departments_id(c, i, d):
+    return i * c['departments_per_institution'] + d + 1
+
+# `n` is the number of the course within its institution
+def courses_id(c, i, n):
+    return i * courses_per_institution(c) + n + 1
+
+def locations_id(c, i, l):
+    return i * locations_per_institution(c) + l + 1
+
+def schedules_id(c, i, s, k):
+    return (semesters_id(c, i, s) - 1) * c['schedules_per_semester'] + k + 1
+
+def tasks_id(c, courses_id, t):
+    return (courses_id - 1) * c['grades_per_enrollment'] + t + 1
+
+def enrollments_id(c, i, k, e):
+    return (students_id(c, i, k) - 1) * c['enrollments_per_student'] + e + 1
+
+def grades_id(c, i, k, e, t):
+    return (enrollments_id(c, i, k, e) - 1) * c['grades_per_enrollment'] + t + 1
+
+
+def semester_dates(s):
+    year = 2021 + (s + 1) // 2
+    if s % 2 == 0:
+        return 'Fall ' + str(year), str(year) + '-09-01 08:00:00', str(year) + '-12-23 21:00:00'
+    return 'Spring ' + str(year), str(year) + '-01-15 08:00:00', str(year) + '-05-10 21:00:00'
+
+
+def course_number(c, n):
+    return str(100 + (n % c['courses_per_department']) + 1)
+
+
+def course_difficulty(c, i, n):
+    return rng(c, 'difficulty', i, n).uniform(0.55, 0.95)
+
+
+# every course of an institution gets a popularity rank, shuffled once per institution; weight 1/rank gives a handful
+# of courses most of the enrollments.  returned as cumulative weights, for random.choices.
+def course_weights(c, i):
+    ranks = list(range(courses_per_institution(c)))
+    rng(c, 'popularity', i).shuffle(ranks)
+    return list(itertools.accumulate(1.0 / (rank + 1) for rank in ranks))
+
+
+# the instructor teaching each course of an institution, with a few prolific instructors teaching most of them, but
+# never two courses in the same time slot
+def course_instructors(c, i):
+    r = rng(c, 'teaching', i)
+    instructors = range(c['instructors_per_institution'])
+    weights = [1.0 / (k + 1) for k in instructors]
+    busy = set()
+    teachers = []
+    for n in range(courses_per_institution(c)):
+        slot = course_slot(c, n)
+        k = r.choices(instructors, weights=[0 if (k, slot) in busy else w for k, w in zip(instructors, weights)])[0]
+        busy.add((k, slot))
+        teachers.append(k)
+    return teachers
+
+
+# the section a course is taught in, in any semester: every course has its own (see check_config)
+def course_schedule(c, n):
+    return n
+
+
+# the time slot of a schedule, in any semester
+def schedule_slot(c, k):
+    return k % len(time_slots)
+
+
+def course_slot(c, n):
+    return schedule_slot(c, course_schedule(c, n))
+
+
+# the enrollments of one student as (semester, course number within the institution, is_auditing) tuples: distinct
+# courses, and within a semester, distinct time slots.  enrollments and grades both call this, so both tables agree
+# without sharing any state.
+def student_enrollments(c, i, k, cum_weights):
+    r = rng(c, 'enrollments', i, k)
+    courses = range(len(cum_weights))
+    chosen = []
+    taken = set()
+    while len(chosen) < c['enrollments_per_student']:
+        n = r.choices(courses, cum_weights=cum_weights)[0]
+        s = len(chosen) % c['semesters_per_institution']
+        if n not in chosen and (s, course_slot(c, n)) not in taken:
+            chosen.append(n)
+            taken.add((s, course_slot(c, n)))
+    return [(e % c['semesters_per_institution'], n, r.random() < AUDITING_RATE) for e, n in enumerate(chosen)]
+
+
+def person_name(c, persons_id):
+    r = rng(c, 'persons', persons_id)
+    return r.choice(first_names) + ' ' + r.choice(last_names) + ' ' + str(persons_id)
+
+
+def boolean(value):
+    return 'true' if value else 'false'
+
+
+# one generator per table, in the same tuple shapes as filler_generation_data.py.
+#
+# most of them can also produce just a slice of their table: `units` is then a range of institutions, or for the
+# tables driven by the students, a range of students (counted across all institutions).  see `slices` below.
+
+def institution_units(c, units):
+    return range(c['institutions']) if units is None else units
+
+def student_units(c, units):
+    return range(c['institutions'] * c['students_per_institution']) if units is None else units
+
+
+def generate_nations(c):
+    for x in nations:
+        yield x
+
+def generate_states(c):
+    for name, code in states:
+        yield (name, code, 1)
+
+def generate_cityzip_pairs(c):
+    for n in range(CITYZIP_PAIRS):
+        yield ('City ' + str(n + 1), str(10000 + n), n % len(states) + 1)
+
+# the first addresses belong to the institutions, the rest are shared by the persons
+def generate_addresses(c):
+    for n in range(c['institutions'] + address_pool(c)):
+        yield (str(n + 1) + ' University Dr', n % CITYZIP_PAIRS + 1, 'false')
+
+def generate_institutions(c, units=None):
+    for i in institution_units(c, units):
+        r = rng(c, 'institutions', i)
+        yield ('Synthetic University ' + str(i + 1), r.randrange(len(states)) + 1, 'SU' + str(i + 1), i + 1,
+               'https://su' + str(i + 1) + '.notreal', 'true', boolean(i % 2 == 0), 'false')
+
+def generate_semesters(c, units=None):
+    for i in institution_units(c, units):
+        for s in range(c['semesters_per_institution']):
+            name, start, finish = semester_dates(s)
+            yield (name, start, finish, i + 1)
+
+def generate_persons(c, units=None):
+    pool = address_pool(c)
+    for i in institution_units(c, units):
+        for persons_id in range(i * persons_per_institution(c) + 1, (i + 1) * persons_per_institution(c) + 1):
+            yield (person_name(c, persons_id), 1, (persons_id % len(states)) + 1,
+                   'person' + str(persons_id) + '@localhost', c['institutions'] + (persons_id - 1) % pool + 1,
+                   'false')
+
+def generate_students(c, units=None):
+    for u in student_units(c, units):
+        i, k = divmod(u, c['students_per_institution'])
+        yield (students_persons_id(c, i, k), i + 1, 'false')
+
+def generate_instructors(c, units=None):
+    for i in institution_units(c, units):
+        for k in range(c['instructors_per_institution']):
+            yield (instructors_persons_id(c, i, k), i + 1, 'false')
+
+def generate_employees(c, units=None):
+    for i in institution_units(c, units):
+        for k in range(employees_per_institution(c)):
+            yield (employees_persons_id(c, i, k), i + 1, 'false')
+
+def generate_instructor_logins(c, units=None):
+    for i in institution_units(c, units):
+        for k in range(c['instructors_per_institution']):
+            yield (instructors_id(c, i, k), i + 1, 'i' + str(instructors_id(c, i, k)) + '@su.notreal', 'false')
+
+def generate_student_logins(c, units=None):
+    for u in student_units(c, units):
+        i, k = divmod(u, c['students_per_institution'])
+        yield (students_id(c, i, k), i + 1, 's' + str(students_id(c, i, k)) + '@su.notreal', 'false')
+
+def generate_employee_logins(c, units=None):
+    for i in institution_units(c, units):
+        for k in range(employees_per_institution(c)):
+            yield (employees_id(c, i, k), i + 1, 'e' + str(employees_id(c, i, k)) + '@su.notreal', 'false')
+
+def generate_departments(c, units=None):
+    for i in institution_units(c, units):
+        for d in range(c['departments_per_institution']):
+            title = department_titles[d % len(department_titles)]
+            if d >= len(department_titles):
+                title += ' ' + str(d // len(department_titles) + 1)
+            chairperson = instructors_id(c, i, d % c['instructors_per_institution'])
+            yield (title, i + 1, chairperson, 'false')
+
+def generate_courses(c, units=None):
+    for i in institution_units(c, units):
+        r = rng(c, 'courses', i)
+        for n in range(courses_per_institution(c)):
+            d = n // c['courses_per_department']
+            yield ('Course ' + str(courses_id(c, i, n)), r.choice(credit_hours), departments_id(c, i, d),
+                   course_number(c, n), 'true', boolean(r.random() < 0.5), 'false')
+
+# some courses require the course numbered just before them in the same department, which can never form a cycle
+def generate_courses_prerequisites(c, units=None):
+    for i in institution_units(c, units):
+        r = rng(c, 'courses-prerequisites', i)
+        for n in range(courses_per_institution(c)):
+            if n % c['courses_per_department'] > 0 and r.random() < 0.3:
+                yield (courses_id(c, i, n), courses_id(c, i, n - 1))
+
+# one track per department
+def generate_tracks(c, units=None):
+    for i in institution_units(c, units):
+        for d in range(c['departments_per_institution']):
+            yield ('Track ' + str(departments_id(c, i, d)), i + 1, 'true', boolean(d % 3 == 0), 'false')
+
+# every track requires the first two courses of its department
+def generate_tracks_prerequisites(c, units=None):
+    for i in institution_units(c, units):
+        for d in range(c['departments_per_institution']):
+            for n in range(min(2, c['courses_per_department'])):
+                yield (departments_id(c, i, d), courses_id(c, i, d * c['courses_per_department'] + n))
+
+# the introductory course of each department is equivalent to the same one at the next institution
+def generate_course_equivalencies(c):
+    for i in range(c['institutions'] - 1):
+        for d in range(c['departments_per_institution']):
+            n = d * c['courses_per_department']
+            yield (courses_id(c, i, n), courses_id(c, i + 1, n))
+
+def generate_locations(c, units=None):
+    for i in institution_units(c, units):
+        for l in range(locations_per_institution(c)):
+            yield ('SU' + str(i + 1) + ' Room ' + str(101 + l), 'false')
+
+# each room holds one section per time slot, so rooms never clash
+def generate_schedules(c, units=None):
+    for i in institution_units(c, units):
+        for s in range(c['semesters_per_institution']):
+            name, start, finish = semester_dates(s)
+            for k in range(c['schedules_per_semester']):
+                start_24hr, end_24hr, dow = time_slots[k % len(time_slots)]
+                yield (start_24hr, end_24hr, dow, start[:10] + ' ' + start_24hr[:2] + ':' + start_24hr[2:] + ':00',
+                       finish[:10] + ' ' + end_24hr[:2] + ':' + end_24hr[2:] + ':00', 'false',
+                       semesters_id(c, i, s), locations_id(c, i, (k // len(time_slots)) % locations_per_institution(c)))
+
+# one task per grade of an enrollment, for every course
+def task_title(c, i, n, t):
+    return 'Course ' + str(courses_id(c, i, n)) + ' TASK ' + str(t + 1)
+
+def generate_tasks(c, units=None):
+    for i in institution_units(c, units):
+        for n in range(courses_per_institution(c)):
+            r = rng(c, 'tasks', i, n)
+            for t in range(c['grades_per_enrollment']):
+                yield (task_title(c, i, n, t), r.choice(max_points), 'true')
+
+# every task has a multi-line summary
+def generate_tasks_attachments(c, units=None):
+    for i in institution_units(c, units):
+        for n in range(courses_per_institution(c)):
+            for t in range(c['grades_per_enrollment']):
+                yield (tasks_id(c, courses_id(c, i, n), t),
+                       task_title(c, i, n, t) + "\nAnswer every question.\tShow your work, it's worth partial credit.")
+
+def generate_courses_tasks(c, units=None):
+    for i in institution_units(c, units):
+        for n in range(courses_per_institution(c)):
+            r = rng(c, 'courses-tasks', i, n)
+            for t in range(c['grades_per_enrollment']):
+                yield (tasks_id(c, courses_id(c, i, n), t), courses_id(c, i, n), r.choice(points_coefficients))
+
+def generate_enrollments(c, units=None):
+    institution = None
+    for u in student_units(c, units):
+        i, k = divmod(u, c['students_per_institution'])
+        if i != institution:
+            institution = i
+            cum_weights = course_weights(c, i)
+            teachers = course_instructors(c, i)
+        for s, n, auditing in student_enrollments(c, i, k, cum_weights):
+            yield (students_id(c, i, k), instructors_id(c, i, teachers[n]),
+                   schedules_id(c, i, s, course_schedule(c, n)), courses_id(c, i, n), boolean(auditing))
+
+# (grades_id, grade row, instructor comments or None) of every grade of the students
+def student_grades(c, units):
+    institution = None
+    for u in student_units(c, units):
+        i, k = divmod(u, c['students_per_institution'])
+        if i != institution:
+            institution = i
+            cum_weights = course_weights(c, i)
+            difficulty = [course_difficulty(c, i, n) for n in range(courses_per_institution(c))]
+            task_points = []
+            for n in range(courses_per_institution(c)):
+                r = rng(c, 'tasks', i, n)
+                task_points.append([int(r.choice(max_points)) for t in range(c['grades_per_enrollment'])])
+        r = rng(c, 'grades', i, k)
+        for e, (s, n, auditing) in enumerate(student_enrollments(c, i, k, cum_weights)):
+            name, start, finish = semester_dates(s)
+            for t in range(c['grades_per_enrollment']):
+                score = min(1.0, r.betavariate(8 * difficulty[n], 8 * (1 - difficulty[n]) + 1))
+                created = start[:8] + '%02d' % (int(start[8:10]) + t % 4 * 3 + 2) + ' 08:00:00'
+                comments = None
+                if r.random() < COMMENTED_RATE:
+                    comments = r.choice(instructors_comments)
+                yield (grades_id(c, i, k, e, t),
+                       (enrollments_id(c, i, k, e), '%.2f' % (score * task_points[n][t]),
+                        tasks_id(c, courses_id(c, i, n), t), created, created[:11] + '21:00:00'),
+                       comments)
+
+def generate_grades(c, units=None):
+    for grade_id, row, comments in student_grades(c, units):
+        yield row
+
+# only the commented grades have attachments
+def generate_grades_attachments(c, units=None):
+    for grade_id, row, comments in student_grades(c, units):
+        if comments is not None:
+            yield (grade_id, comments)
+
+# a tutoring session per semester, in the first schedule, with the first instructor who teaches nothing at that time
+def services_instructor(c, i):
+    teachers = course_instructors(c, i)
+    busy = {teachers[n] for n in range(courses_per_institution(c)) if course_slot(c, n) == schedule_slot(c, 0)}
+    return min(set(range(c['instructors_per_institution'])) - busy)
+
+def generate_services(c, units=None):
+    for i in institution_units(c, units):
+        instructor = services_instructor(c, i)
+        for s in range(c['semesters_per_institution']):
+            yield (instructors_id(c, i, instructor), None, schedules_id(c, i, s, 0))
+
+
+generators = {
+    'nations': generate_nations,
+    'states': generate_states,
+    'cityzip_pairs': generate_cityzip_pairs,
+    'addresses': generate_addresses,
+    'institutions': generate_institutions,
+    'semesters': generate_semesters,
+    'persons': generate_persons,
+    'students': generate_students,
+    'instructors': generate_instructors,
+    'employees': generate_employees,
+    'instructor-logins': generate_instructor_logins,
+    'student-logins': generate_student_logins,
+    'employee-logins': generate_employee_logins,
+    'departments': generate_departments,
+    'courses': generate_courses,
+    'courses-prerequisites': generate_courses_prerequisites,
+    'tracks': generate_tracks,
+    'tracks-prerequisites': generate_tracks_prerequisites,
+    'courses-equivalencies': generate_course_equivalencies,
+    'locations': generate_locations,
+    'schedules': generate_schedules,
+    'tasks': generate_tasks,
+    'tasks-attachments': generate_tasks_attachments,
+    'courses-tasks': generate_courses_tasks,
+    'enrollments': generate_enrollments,
+    'grades': generate_grades,
+    'grades-attachments': generate_grades_attachments,
+    'services': generate_services,
+}
+
+
+# the tables which can be generated a slice at a time, as (number of units, rows per unit): a slice starting at unit u
+# starts at surrogate key u * (rows per unit) + 1.  the tables without a surrogate key have None for rows per unit.
+def slices(c):
+    institutions = c['institutions']
+    students = c['institutions'] * c['students_per_institution']
+    semesters = c['semesters_per_institution']
+    courses = courses_per_institution(c)
+    return {
+        'institutions': (institutions, 1),
+        'semesters': (institutions, semesters),
+        'persons': (institutions, persons_per_institution(c)),
+        'students': (students, 1),
+        'instructors': (institutions, c['instructors_per_institution']),
+        'employees': (institutions, employees_per_institution(c)),
+        'instructor-logins': (institutions, None),
+        'student-logins': (students, None),
+        'employee-logins': (institutions, None),
+        'departments': (institutions, c['departments_per_institution']),
+        'courses': (institutions, courses),
+        'courses-prerequisites': (institutions, None),
+        'tracks': (institutions, c['departments_per_institution']),
+        'tracks-prerequisites': (institutions, None),
+        'locations': (institutions, locations_per_institution(c)),
+        'schedules': (institutions, semesters * c['schedules_per_semester']),
+        'tasks': (institutions, courses * c['grades_per_enrollment']),
+        'tasks-attachments': (institutions, None),
+        'courses-tasks': (institutions, courses * c['grades_per_enrollment']),
+        'enrollments': (students, c['enrollments_per_student']),
+        'grades': (students, c['enrollments_per_student'] * c['grades_per_enrollment']),
+        'grades-attachments': (students, None),
+        'services': (institutions, semesters),
+    }
+
+
+# the same shape as filler_generation_data.templates, but every template is a generator
+def scale_templates(config):
+    return {table: generate(config) for table, generate in generators.items()}
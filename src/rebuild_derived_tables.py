@@ -0,0 +1,103 @@
+# rebuilding the tables which the triggers keep current
+#
+# core.sql keeps a few tables current with triggers, and has a procedure recomputing each group of them from scratch:
+#
+# - grades-sums: `instructors-grades-sums` and `courses-grades-sums`, with rebuild_grades_sums()
+# - prerequisites-closure: `courses-equivalents`, `courses-closure` and `tracks-closure`, with
+#   rebuild_prerequisites_closure()
+# - gpa-ledger: `enrollments-gpa-sums` and `students-gpa-ledger`, with rebuild_gpa_ledger()
+#
+# this runs them for backfills -- after loading rows with the triggers dropped, or after the changes the triggers do
+# not follow (the credit hours of a course, the semester of a schedule) -- each in its own transaction, and prints
+# how long each one took and how many rows it corrected, which is also a way to check the triggers did not drift:
+# $ python3 rebuild_derived_tables.py gpa-ledger
+
+import argparse
+import sys
+import time
+
+from database import add_connection_arguments, connect
+
+# {name: (procedure, [table, ...])}, in the order they are rebuilt
+REBUILDS = {
+    'grades-sums': ('rebuild_grades_sums', ['instructors-grades-sums', 'courses-grades-sums']),
+    'prerequisites-closure': ('rebuild_prerequisites_closure',
+                              ['courses-equivalents', 'courses-closure', 'tracks-closure']),
+    'gpa-ledger': ('rebuild_gpa_ledger', ['enrollments-gpa-sums', 'students-gpa-ledger']),
+}
+
+
+# the rows before the rebuild are copied on the server, into a temporary table with the same primary key, so that
+# comparing them with the rows after it takes one index lookup per row and nothing is sent over the connection
+def snapshot_name(table):
+    return '`' + table + '-before`'
+
+
+def take_snapshot(cursor, table):
+    cursor.execute('DROP TEMPORARY TABLE IF EXISTS ' + snapshot_name(table))
+    cursor.execute('CREATE TEMPORARY TABLE ' + snapshot_name(table) + ' LIKE `' + table + '`')
+    cursor.execute('INSERT INTO ' + snapshot_name(table) + ' SELECT * FROM `' + table + '`')
+
+
+# (rows, rows which were missing or different in the snapshot) of the table
+def compare_snapshot(cursor, table):
+    cursor.execute('SELECT * FROM `' + table + '` LIMIT 0')
+    columns = [column[0] for column in cursor.description]
+    cursor.execute('SELECT count(*) FROM `' + table + '`')
+    rows, = cursor.fetchone()
+    cursor.execute('SELECT count(*) FROM `' + table + '` AS rebuilt WHERE NOT EXISTS (SELECT * FROM '
+                   + snapshot_name(table) + ' AS snapshot WHERE '
+                   + ' AND '.join('snapshot.`' + c + '` <=> rebuilt.`' + c + '`' for c in columns) + ')')
+    corrected, = cursor.fetchone()
+    cursor.execute('DROP TEMPORARY TABLE ' + snapshot_name(table))
+    return rows, corrected
+
+
+# returns {table: (rows, rows which were missing or different before)} and the seconds the procedure took
+def rebuild(connection, name):
+    procedure, tables = REBUILDS[name]
+    connection.begin()
+    try:
+        with connection.cursor() as cursor:
+            for table in tables:
+                take_snapshot(cursor, table)
+            started = time.perf_counter()
+            cursor.execute('CALL ' + procedure + '()')
+            seconds = time.perf_counter() - started
+            counts = {table: compare_snapshot(cursor, table) for table in tables}
+        connection.commit()
+    except Exception:
+        connection.rollback()
+        raise
+    return counts, seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description='recompute the tables which the triggers keep current')
+    parser.add_argument('rebuilds', nargs='*', metavar='TABLES',
+                        help='what to rebuild, out of ' + ', '.join(REBUILDS) + ' (default: all of them)')
+    add_connection_arguments(parser)
+    args = parser.parse_args()
+    for name in args.rebuilds:
+        if name not in REBUILDS:
+            parser.error('unknown tables: ' + name + ' (choose from ' + ', '.join(REBUILDS) + ')')
+
+    connection = connect(args)
+    try:
+        for name in REBUILDS:
+            if args.rebuilds and name not in args.rebuilds:
+                continue
+            try:
+                counts, seconds = rebuild(connection, name)
+            except Exception as e:
+                print(name, 'failed:', e, file=sys.stderr)
+                sys.exit(1)
+            print(name, 'rebuilt in', round(seconds, 3), 's')
+            for table, (rows, corrected) in counts.items():
+                print('   ', table + ':', rows, 'rows,', corrected, 'of them corrected')
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    main()
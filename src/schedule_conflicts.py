@@ -0,0 +1,119 @@
+# schedule conflict detection
+#
+# a schedule meets on the days of its `schedules_dow` pattern (SMTWTFS, with '-' for the days off), from
+# `schedules_start_24hr` until `schedules_end_24hr`.  core.sql keeps the same as a day bitmask (schedules_dow_mask,
+# 1 for Sunday up to 64 for Saturday) and minutes since midnight (schedules_start_minute, schedules_end_minute), and
+# its *_schedule_conflicts views list the double bookings of students, instructors and locations.
+#
+# find_conflicts does the same in python, for checking a batch of bookings before they are inserted (for example the
+# enrollments of a registration window, along with the existing ones).  like the views, it sorts the meetings of
+# every student, instructor or location by their start, per semester and day of the week, and sweeps over them, so n
+# meetings cost O(n log n) plus the conflicts found, instead of comparing all pairs.
+#
+# run on its own, it checks the whole database (see database.py), and exits with 1 if there are conflicts:
+# $ python3 schedule_conflicts.py
+
+import argparse
+import heapq
+import sys
+
+from database import add_connection_arguments, connect
+
+# the days of the week in the order of `schedules_dow`, which are also the bits of the mask
+DAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday']
+
+
+def dow_mask(dow):
+    mask = 0
+    for day, c in enumerate((dow or '')[:len(DAYS)]):
+        if c != '-':
+            mask |= 1 << day
+    return mask
+
+
+def minutes(hhmm):
+    return int(hhmm[:2]) * 60 + int(hhmm[2:4])
+
+
+# `bookings` are (owner, semester, schedule, dow, start_24hr, end_24hr) tuples, the owner being whoever or whatever
+# can be double-booked (a student, an instructor, a location).  an owner booked twice on the same schedule (an
+# instructor teaching two courses there) conflicts with itself.  yields (owner, day, earlier schedule, later schedule),
+# the day being 0 for Sunday up to 6 for Saturday like in the views, for every pair of meetings of the same owner which
+# overlap on the same day of the same semester; meetings which only touch (one ends at 0950, the next starts at 0950)
+# do not overlap.
+def find_conflicts(bookings):
+    meetings = []
+    for owner, semester, schedule, dow, start_24hr, end_24hr in bookings:
+        mask = dow_mask(dow)
+        start, end = minutes(start_24hr), minutes(end_24hr)
+        for day in range(len(DAYS)):
+            if mask >> day & 1:
+                meetings.append(((owner, semester, day), start, end, schedule))
+    meetings.sort(key=lambda meeting: (repr(meeting[0]), meeting[1]))
+
+    group = None
+    active = []
+    for key, start, end, schedule in meetings:
+        if key != group:
+            group = key
+            active = []
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for other_end, other_start, other in sorted(active, key=lambda meeting: meeting[1]):
+            yield key[0], key[2], other, schedule
+        heapq.heappush(active, (end, start, schedule))
+
+
+# the bookings of the database, as find_conflicts takes them
+BOOKINGS = {
+    'student': """
+        SELECT bookings.students_id, schedules_semesters_id_fk, schedules_id, schedules_dow, schedules_start_24hr,
+        schedules_end_24hr
+        FROM (SELECT enrollments_students_id_fk AS students_id, enrollments_schedules_id_fk AS schedules_id_fk
+              FROM enrollments
+              UNION
+              SELECT services_students_id_fk, services_schedules_id_fk FROM services
+              WHERE services_students_id_fk IS NOT NULL) AS bookings, schedules
+        WHERE bookings.schedules_id_fk = schedules.schedules_id""",
+    'instructor': """
+        SELECT bookings.instructors_id, schedules_semesters_id_fk, schedules_id, schedules_dow, schedules_start_24hr,
+        schedules_end_24hr
+        FROM (SELECT enrollments_instructors_id_fk AS instructors_id, enrollments_schedules_id_fk AS schedules_id_fk,
+              enrollments_courses_id_fk AS courses_id
+              FROM enrollments
+              UNION
+              SELECT services_instructors_id_fk, services_schedules_id_fk, NULL FROM services
+              WHERE services_instructors_id_fk IS NOT NULL) AS bookings, schedules
+        WHERE bookings.schedules_id_fk = schedules.schedules_id""",
+    'location': """
+        SELECT schedules_locations_id_fk, schedules_semesters_id_fk, schedules_id, schedules_dow, schedules_start_24hr,
+        schedules_end_24hr
+        FROM schedules
+        WHERE schedules_locations_id_fk IS NOT NULL""",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='list the double-booked students, instructors and locations')
+    add_connection_arguments(parser)
+    args = parser.parse_args()
+
+    connection = connect(args)
+    conflicts = 0
+    try:
+        with connection.cursor() as cursor:
+            for kind, query in BOOKINGS.items():
+                cursor.execute(query)
+                for owner, day, earlier, later in find_conflicts(cursor.fetchall()):
+                    conflicts += 1
+                    print(kind, owner, DAYS[day], 'schedules', earlier, 'and', later)
+    finally:
+        connection.close()
+
+    if conflicts:
+        print(conflicts, 'conflicts', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+# tests of the tsv output of filler_generation_bulk.py:
+# $ python3 -m unittest test_filler_generation_bulk
+# the files are read back the way LOAD DATA reads them with its defaults, and have to give back every value as it was.
+
+import io
+import os
+import tempfile
+import unittest
+
+from filler_generation_bulk import write_tsv, write_bulk, tsv_columns, tsv_file_name
+from filler_generation_code import KeyRegistry, dependency_order, BLOB
+
+# the escapes LOAD DATA undoes; a backslash before any other character stands for that character, and a field of
+# just \N is NULL
+tsv_unescapes = {'0': '\0', 'b': '\b', 'n': '\n', 'r': '\r', 't': '\t', 'Z': '\x1a'}
+
+
+def read_field(field):
+    if field == '\\N':
+        return None
+    value = []
+    characters = iter(field)
+    for c in characters:
+        if c == '\\':
+            c = next(characters)
+            c = tsv_unescapes.get(c, c)
+        value.append(c)
+    return ''.join(value)
+
+
+# the rows of a tsv file as LOAD DATA sees them, with the BLOB columns decoded like UNHEX does
+def read_tsv(text, table):
+    kinds = [kind for name, kind in tsv_columns(table)]
+    assert text.endswith('\n') or not text, 'the last line is not terminated'
+    rows = []
+    for line in text.split('\n')[:-1]:
+        fields = [read_field(field) for field in line.split('\t')]
+        assert len(fields) == len(kinds), line
+        rows.append([bytes.fromhex(value) if kind == BLOB and value is not None else value
+                     for kind, value in zip(kinds, fields)])
+    return rows
+
+
+def write(table, t):
+    stream = io.StringIO()
+    write_tsv(stream, table, t, KeyRegistry(natural_keys=False))
+    return stream.getvalue()
+
+
+class TsvTest(unittest.TestCase):
+    def test_text_round_trips(self):
+        texts = ['back\\slash', 'a\ttab', 'a\nnewline', 'a\r\ncarriage return', 'a\0nul', '\\N', 'looks \\N like',
+                 '\\\\N', 'trailing backslash\\', 'O\'Brien "quoted"', '', 'ünïcødé']
+        output = write('tasks-attachments', [(1, text, None, text) for text in texts])
+        # one line per row, and nothing but the separators left raw
+        self.assertEqual(output.count('\n'), len(texts))
+        self.assertEqual(output.count('\t'), 3 * len(texts))
+        self.assertNotIn('\r', output)
+        self.assertNotIn('\0', output)
+        rows = read_tsv(output, 'tasks-attachments')
+        self.assertEqual([(row[1], row[3]) for row in rows], [(text, text) for text in texts])
+        self.assertEqual([row[2] for row in rows], [None] * len(texts))
+
+    def test_blobs_round_trip(self):
+        blobs = [b'', b'\x00\x01\t\n\r\\N', bytes(range(256))]
+        rows = read_tsv(write('tasks-attachments', [(1, 'summary', blob) for blob in blobs]), 'tasks-attachments')
+        self.assertEqual([row[2] for row in rows], blobs)
+
+    def test_short_rows_are_padded_with_null(self):
+        text = write('grades-attachments', [(3,), (4, 'comment'), (5, None, None, b'\xff')])
+        rows = read_tsv(text, 'grades-attachments')
+        self.assertEqual(rows, [['3', None, None, None, None, None, None],
+                                ['4', 'comment', None, None, None, None, None],
+                                ['5', None, None, b'\xff', None, None, None]])
+
+    def test_ids_and_booleans(self):
+        rows = read_tsv(write('courses', [('Intro', '3.0', 7, '101', 'true', 'false', True),
+                                          ('Next', '3.0', 7, '102', False, 1, '0')]), 'courses')
+        self.assertEqual(rows, [['1', 'Intro', '3.0', '7', '101', '1', '0', '1'],
+                                ['2', 'Next', '3.0', '7', '102', '0', '1', '0']])
+
+    def test_write_bulk(self):
+        with tempfile.TemporaryDirectory() as directory:
+            write_bulk(directory, {'tasks-attachments': [(1, 'a\tb', b'\x00')]})
+            for table in dependency_order():
+                self.assertTrue(os.path.exists(os.path.join(directory, tsv_file_name(table))), table)
+            with open(os.path.join(directory, tsv_file_name('tasks-attachments')), encoding='utf-8') as data:
+                self.assertEqual(read_tsv(data.read(), 'tasks-attachments'), [['1', 'a\tb', b'\x00', None]])
+            with open(os.path.join(directory, 'load.sql'), encoding='utf-8') as driver:
+                script = driver.read()
+            self.assertIn('`tasks-attachments_content_blob` = UNHEX(@`tasks-attachments_content_blob`)', script)
+            loads = [line.split("'")[1] for line in script.splitlines() if line.startswith('LOAD DATA')]
+            self.assertEqual(loads, [tsv_file_name(table) for table in dependency_order()])
+
+
+if __name__ == '__main__':
+    unittest.main()
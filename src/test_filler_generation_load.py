@@ -0,0 +1,188 @@
+# tests of filler_generation_load.py against its SQLite stand-in, so they need no MySQL server:
+# $ python3 -m unittest test_filler_generation_load
+# the demo templates and the 1k tier are loaded into a temporary SQLite file, and then every table has to hold the
+# rows of its template, text has to come back exactly as written (no quotes or escapes, which only the SQL text
+# output needs), and every foreign key has to point at an existing row.
+
+import collections
+import os
+import re
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+
+from filler_generation_code import tables, dependency_order, KeyReference, TEXT, KEY
+from filler_generation_data import templates
+from filler_generation_load import load_tables, create_sqlite_tables, load_after
+from filler_generation_scale import scale_config, scale_templates, DEFAULT_SEED
+
+
+# {(table, column): referenced table} of every KEY column.  the demo templates look their keys up with KeyReference
+# values, which know their table; the columns they leave NULL reference their only parent, or the parent they name.
+def referenced_tables():
+    references = {}
+    for table, t in templates.items():
+        for x in t:
+            for (name, kind), value in zip(tables[table]['columns'], x):
+                if isinstance(value, KeyReference):
+                    references[(table, name)] = value.table
+    for table in dependency_order():
+        parents = tables[table]['parents']
+        for name, kind in tables[table]['columns']:
+            if kind == KEY and (table, name) not in references:
+                named = [parent for parent in parents if len(parents) == 1 or parent in name]
+                if len(named) == 1:
+                    references[(table, name)] = named[0]
+    return references
+
+
+# a DB-API connection which only records when each table starts to be inserted and when it is committed.  the
+# commits of the `slow` tables take long enough for a table started too early to overlap them.
+class RecordingConnection:
+    def __init__(self, events, lock, slow):
+        self.events = events
+        self.lock = lock
+        self.slow = slow
+        self.table = None
+
+    def record(self, event):
+        with self.lock:
+            self.events.append((event, self.table))
+
+    def cursor(self):
+        return self
+
+    def executemany(self, statement, rows):
+        table = re.match(r'INSERT INTO `([^`]+)`', statement).group(1)
+        if table != self.table:
+            self.table = table
+            self.record('start')
+
+    def commit(self):
+        if self.table in self.slow:
+            time.sleep(0.05)
+        self.record('commit')
+        self.table = None
+
+    def rollback(self):
+        self.table = None
+
+    def close(self):
+        pass
+
+
+class LoadOrderTest(unittest.TestCase):
+    def test_trigger_dependencies(self):
+        self.assertIn('courses-prerequisites', load_after('tracks-prerequisites'))
+        self.assertIn('courses-equivalencies', load_after('tracks-prerequisites'))
+        self.assertIn('courses-equivalencies', load_after('courses-prerequisites'))
+        self.assertIn('courses-tasks', load_after('grades'))
+
+    def test_tables_start_once_what_they_need_is_committed(self):
+        for name, source in [('demo', templates), ('1k', scale_templates(scale_config('1k', DEFAULT_SEED)))]:
+            source = {table: list(t) for table, t in source.items()}
+            # the empty tables are committed without inserting anything, and so are not recorded
+            loaded = {table for table, t in source.items() if t}
+            events = []
+            lock = threading.Lock()
+            slow = {'courses-equivalencies', 'courses-prerequisites', 'courses-tasks'}
+            load_tables(lambda: RecordingConnection(events, lock, slow), source, 'qmark', jobs=8,
+                        natural_keys=name == 'demo')
+            committed = set()
+            for event, table in events:
+                if event == 'start':
+                    with self.subTest(source=name, table=table):
+                        self.assertEqual((load_after(table) & loaded) - committed, set())
+                elif table is not None:
+                    committed.add(table)
+            self.assertEqual(committed, loaded)
+
+
+class LoadIntoSQLiteTest(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'schooldb.sqlite')
+        connection = sqlite3.connect(self.path)
+        create_sqlite_tables(connection)
+        connection.close()
+        self.connection = sqlite3.connect(self.path)
+        self.addCleanup(self.connection.close)
+
+    def load(self, source, natural_keys):
+        connect = lambda: sqlite3.connect(self.path, timeout=60, check_same_thread=False)
+        return load_tables(connect, source, sqlite3.paramstyle, jobs=3, batch_size=50, natural_keys=natural_keys)
+
+    def count(self, table):
+        return self.connection.execute('SELECT count(*) FROM `' + table + '`').fetchone()[0]
+
+    # like assertCountEqual, without diffing thousands of values when they differ
+    def assertSameValues(self, stored, expected):
+        missing = collections.Counter(expected) - collections.Counter(stored)
+        unexpected = collections.Counter(stored) - collections.Counter(expected)
+        self.assertFalse(missing or unexpected, 'missing {}, unexpected {}'.format(list(missing)[:5],
+                                                                                  list(unexpected)[:5]))
+
+    def check_loaded(self, source, results):
+        self.assertEqual(list(results), [table for table in dependency_order() if table in source])
+        for table, t in source.items():
+            with self.subTest(table=table):
+                self.assertEqual(self.count(table), len(t))
+                self.assertEqual(results[table]['rows'], len(t))
+
+    def check_text(self, source):
+        for table, t in source.items():
+            spec = tables[table]
+            for i, (name, kind) in enumerate(spec['columns']):
+                if kind != TEXT:
+                    continue
+                expected = [x[i] for x in t if len(x) > i and x[i] is not None]
+                stored = [value for value, in self.connection.execute(
+                    'SELECT `' + name + '` FROM `' + table + '` WHERE `' + name + '` IS NOT NULL')]
+                with self.subTest(table=table, column=name):
+                    self.assertSameValues(stored, expected)
+
+    def check_foreign_keys(self, source):
+        references = referenced_tables()
+        for table in source:
+            for name, kind in tables[table]['columns']:
+                if kind != KEY:
+                    continue
+                parent = references[(table, name)]
+                dangling = self.connection.execute(
+                    'SELECT count(*) FROM `' + table + '` WHERE `' + name + '` IS NOT NULL AND `' + name
+                    + '` NOT IN (SELECT `' + tables[parent]['id'] + '` FROM `' + parent + '`)').fetchone()[0]
+                with self.subTest(table=table, column=name, parent=parent):
+                    self.assertEqual(dangling, 0)
+
+    def test_demo_templates(self):
+        source = {table: list(t) for table, t in templates.items()}
+        results = self.load(source, natural_keys=True)
+        self.check_loaded(source, results)
+        self.check_text(source)
+        self.check_foreign_keys(source)
+        names = [name for name, in self.connection.execute('SELECT persons_legal_name FROM persons')]
+        self.assertTrue(names)
+        for name in names:
+            self.assertFalse(name.startswith("'") or name.endswith("'") or "\\'" in name, name)
+
+    def test_scale_1k(self):
+        source = {table: list(t) for table, t in scale_templates(scale_config('1k', DEFAULT_SEED)).items()}
+        results = self.load(source, natural_keys=False)
+        self.check_loaded(source, results)
+        self.check_text(source)
+        self.check_foreign_keys(source)
+        # the resolved keys are surrogate keys, and the stored ones are exactly the ones of the template
+        for table, t in source.items():
+            for i, (name, kind) in enumerate(tables[table]['columns']):
+                if kind == KEY:
+                    stored = [value for value, in self.connection.execute(
+                        'SELECT `' + name + '` FROM `' + table + '` WHERE `' + name + '` IS NOT NULL')]
+                    with self.subTest(table=table, column=name):
+                        self.assertSameValues(stored, [x[i] for x in t if len(x) > i and x[i] is not None])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+# tests of filler_generation_parallel.py:
+# $ python3 -m unittest test_filler_generation_parallel
+# write_parallel has to give the same rows in the same order as the serial write_tables and write_bulk, for the demo
+# templates and for the 1k tier: byte for byte with one row per statement and for the tsv files, and row for row with
+# multi-row statements (which may be split differently at the slice boundaries).
+
+import io
+import os
+import tempfile
+import unittest
+
+from filler_generation_bulk import write_bulk, tsv_file_name
+from filler_generation_code import write_tables, dependency_order, KeyRegistry
+from filler_generation_data import templates
+from filler_generation_parallel import write_parallel
+from filler_generation_scale import scale_config, scale_templates, DEFAULT_SEED
+
+
+# [(INSERT INTO ... VALUES, rows)] with the consecutive statements of the same table and columns joined into one
+# entry, so that two outputs holding the same rows in the same order compare equal however they are batched
+def statement_rows(sql):
+    runs = []
+    for line in sql.splitlines():
+        if not line.startswith('INSERT INTO '):
+            continue
+        prefix, rows = line.split(' VALUES ', 1)
+        if runs and runs[-1][0] == prefix:
+            runs[-1][1].append(rows[:-1])
+        else:
+            runs.append((prefix, [rows[:-1]]))
+    return [(prefix, ', '.join(rows)) for prefix, rows in runs]
+
+
+class WriteParallelTest(unittest.TestCase):
+    def serial_sql(self, config, resolved, batch_size):
+        source = templates if config is None else scale_templates(config)
+        stream = io.StringIO()
+        registry = KeyRegistry(natural_keys=config is None) if resolved else None
+        write_tables(stream, source, registry=registry, batch_size=batch_size)
+        return stream.getvalue()
+
+    def parallel_sql(self, config, jobs, resolved, batch_size):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'filler.sql')
+            write_parallel(path, 'sql', config, jobs, resolved, batch_size)
+            with open(path, encoding='utf-8') as output:
+                return output.read()
+
+    def assertSameTsv(self, config, jobs):
+        source = templates if config is None else scale_templates(config)
+        with tempfile.TemporaryDirectory() as directory:
+            serial, parallel = os.path.join(directory, 'serial'), os.path.join(directory, 'parallel')
+            write_bulk(serial, source, KeyRegistry(natural_keys=config is None))
+            write_parallel(parallel, 'tsv', config, jobs)
+            for name in [tsv_file_name(table) for table in dependency_order()] + ['load.sql']:
+                with open(os.path.join(serial, name), 'rb') as a, open(os.path.join(parallel, name), 'rb') as b:
+                    with self.subTest(file=name):
+                        self.assertTrue(a.read() == b.read())
+
+    def test_demo_sql(self):
+        for resolved in (False, True):
+            with self.subTest(resolved=resolved):
+                self.assertEqual(self.parallel_sql(None, 3, resolved, 1), self.serial_sql(None, resolved, 1))
+
+    def test_demo_tsv(self):
+        self.assertSameTsv(None, 3)
+
+    def test_scale_sql(self):
+        config = scale_config('1k', DEFAULT_SEED)
+        serial = self.serial_sql(config, True, 1)
+        self.assertTrue(self.parallel_sql(config, 4, True, 1) == serial)
+        batched = statement_rows(self.parallel_sql(config, 4, True, 100))
+        self.assertTrue(batched == statement_rows(self.serial_sql(config, True, 100)))
+        self.assertTrue(batched == statement_rows(serial))
+
+    def test_scale_tsv(self):
+        self.assertSameTsv(scale_config('1k', DEFAULT_SEED), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
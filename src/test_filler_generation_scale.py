@@ -0,0 +1,73 @@
+# tests of the synthetic data of filler_generation_scale.py, on its SQLite stand-in (see test_filler_generation_load):
+# $ python3 -m unittest test_filler_generation_scale
+# the 1k tier is loaded into a temporary SQLite file, and has to satisfy every UNIQUE KEY of core.sql, and to book no
+# student, instructor or location twice at the same time, as schedule_conflicts.py finds them.
+
+import os
+import re
+import sqlite3
+import tempfile
+import unittest
+
+from database import CORE_SQL
+from filler_generation_load import load_tables, create_sqlite_tables
+from filler_generation_scale import scale_config, scale_templates, DEFAULT_SEED
+from schedule_conflicts import BOOKINGS, find_conflicts
+
+CREATE_TABLE = re.compile(r'^CREATE TABLE `([^`]+)` \((.*?)^\);', re.MULTILINE | re.DOTALL)
+UNIQUE_KEY = re.compile(r'UNIQUE KEY `([^`]+)`\s*\(([^)]*)\)')
+
+
+# [(table, key name, [columns])] of the UNIQUE KEY clauses in core.sql
+def unique_keys():
+    with open(CORE_SQL, encoding='utf-8') as core:
+        script = core.read()
+    keys = []
+    for table in CREATE_TABLE.finditer(script):
+        for key in UNIQUE_KEY.finditer(table.group(2)):
+            keys.append((table.group(1), key.group(1), [column.strip() for column in key.group(2).split(',')]))
+    return keys
+
+
+class ScaleTierTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.directory = tempfile.TemporaryDirectory()
+        path = os.path.join(cls.directory.name, 'schooldb.sqlite')
+        connection = sqlite3.connect(path)
+        create_sqlite_tables(connection)
+        connection.close()
+        load_tables(lambda: sqlite3.connect(path, timeout=60, check_same_thread=False),
+                    scale_templates(scale_config('1k', DEFAULT_SEED)), sqlite3.paramstyle, natural_keys=False)
+        cls.connection = sqlite3.connect(path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.close()
+        cls.directory.cleanup()
+
+    def test_unique_keys(self):
+        keys = unique_keys()
+        names = [name for table, name, columns in keys]
+        for name in ['enrollments_schedules_unique', 'grades_tasks_unique', 'courses_number_unique',
+                     'semesters_name_unique']:
+            self.assertIn(name, names)
+        for table, name, columns in keys:
+            # like MySQL, rows with a NULL in the key never collide
+            duplicates = self.connection.execute(
+                'SELECT ' + ', '.join(columns) + ', count(*) FROM `' + table + '` WHERE '
+                + ' AND '.join(column + ' IS NOT NULL' for column in columns)
+                + ' GROUP BY ' + ', '.join(columns) + ' HAVING count(*) > 1 LIMIT 5').fetchall()
+            with self.subTest(table=table, key=name):
+                self.assertEqual(duplicates, [])
+
+    def test_no_double_bookings(self):
+        for owner, query in BOOKINGS.items():
+            bookings = self.connection.execute(query).fetchall()
+            with self.subTest(owner=owner):
+                self.assertTrue(bookings)
+                self.assertEqual(list(find_conflicts(bookings))[:5], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+# tests of find_conflicts in schedule_conflicts.py:
+# $ python3 -m unittest test_schedule_conflicts
+
+import unittest
+
+from schedule_conflicts import find_conflicts, dow_mask, minutes
+
+MONDAY = 1
+WEDNESDAY = 3
+
+
+def conflicts(bookings):
+    return sorted(find_conflicts(bookings))
+
+
+class FindConflictsTest(unittest.TestCase):
+    def test_dow_mask_and_minutes(self):
+        self.assertEqual(dow_mask('-M-W---'), 1 << MONDAY | 1 << WEDNESDAY)
+        self.assertEqual(dow_mask('SMTWTFS'), 127)
+        self.assertEqual(dow_mask(None), 0)
+        self.assertEqual(minutes('0950'), 9 * 60 + 50)
+
+    def test_touching_meetings_do_not_conflict(self):
+        self.assertEqual(conflicts([('ann', 1, 'a', '-M-----', '0900', '0950'),
+                                    ('ann', 1, 'b', '-M-----', '0950', '1040')]), [])
+
+    def test_overlapping_meetings_conflict_on_every_shared_day(self):
+        self.assertEqual(conflicts([('ann', 1, 'a', '-M-W---', '0900', '0950'),
+                                    ('ann', 1, 'b', '-M-W-F-', '0949', '1040')]),
+                         [('ann', MONDAY, 'a', 'b'), ('ann', WEDNESDAY, 'a', 'b')])
+
+    def test_same_schedule_twice_conflicts_with_itself(self):
+        self.assertEqual(conflicts([('bob', 1, 'a', '-M-----', '0900', '0950'),
+                                    ('bob', 1, 'a', '-M-----', '0900', '0950')]), [('bob', MONDAY, 'a', 'a')])
+
+    def test_other_semesters_days_and_owners_do_not_conflict(self):
+        self.assertEqual(conflicts([('ann', 1, 'a', '-M-----', '0900', '0950'),
+                                    ('ann', 2, 'b', '-M-----', '0900', '0950'),
+                                    ('ann', 1, 'c', '--T----', '0900', '0950'),
+                                    ('bob', 1, 'd', '-M-----', '0900', '0950'),
+                                    ('ann', 1, 'e', '-------', '0900', '0950')]), [])
+
+    def test_every_overlapping_pair_is_reported(self):
+        # a overlaps all the others, c overlaps b and d, but b ends before d starts
+        bookings = [('ann', 1, 'c', '-M-----', '0900', '1100'),
+                    ('ann', 1, 'a', '-M-----', '0800', '1000'),
+                    ('ann', 1, 'd', '-M-----', '0945', '1015'),
+                    ('ann', 1, 'b', '-M-----', '0830', '0930')]
+        self.assertEqual(list(find_conflicts(bookings)),
+                         [('ann', MONDAY, 'a', 'b'), ('ann', MONDAY, 'a', 'c'), ('ann', MONDAY, 'b', 'c'),
+                          ('ann', MONDAY, 'a', 'd'), ('ann', MONDAY, 'c', 'd')])
+
+    def test_many_meetings_of_one_owner(self):
+        # 50 meetings of the same length, each starting 10 minutes after the previous one, overlap the next 4
+        bookings = [('ann', 1, k, '-M-----', '{:02}{:02}'.format(8 + k * 10 // 60, k * 10 % 60),
+                     '{:02}{:02}'.format(8 + (k * 10 + 50) // 60, (k * 10 + 50) % 60)) for k in range(50)]
+        found = conflicts(bookings)
+        self.assertEqual(found, sorted(('ann', MONDAY, k, k + d) for k in range(50) for d in range(1, 5)
+                                       if k + d < 50))
+
+
+if __name__ == '__main__':
+    unittest.main()